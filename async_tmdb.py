@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+try:
+    import aiohttp
+except Exception:
+    aiohttp = None
+
+from enrichment import RETRYABLE_STATUS
+
+
+class AsyncTMDBService:
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.themoviedb.org/3",
+        per_host_limit: int = 8,
+        total_limit: int = 32,
+        timeout: float = 10.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+    ) -> None:
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is required for AsyncTMDBService")
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.image_base_url = "https://image.tmdb.org/t/p/w300"
+        self.per_host_limit = per_host_limit
+        self.total_limit = total_limit
+        self._timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._session: "aiohttp.ClientSession | None" = None
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def _get_session(self) -> "aiohttp.ClientSession":
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.total_limit, limit_per_host=self.per_host_limit)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self._timeout, connect=4),
+            )
+        return self._session
+
+    async def _coalesce(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _t: self._in_flight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _get(self, url: str, read: Callable[[Any], Awaitable[Any]], params: Dict[str, str] | None = None) -> Any:
+        attempt = 0
+        while True:
+            session = await self._get_session()
+            retry_after = None
+            try:
+                async with session.get(url, params=params) as response:
+                    if response.status not in RETRYABLE_STATUS or attempt >= self.retries:
+                        response.raise_for_status()
+                        return await read(response)
+                    retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= self.retries:
+                    raise
+            delay = self.backoff * (2 ** attempt) * (1 + random.random())
+            if retry_after:
+                try:
+                    delay = max(delay, float(retry_after))
+                except ValueError:
+                    pass
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _request_json(self, path: str, **params: Any) -> Dict[str, Any]:
+        key: Tuple = ("json", path, tuple(sorted(params.items())))
+
+        async def fetch() -> Dict[str, Any]:
+            all_params = {"api_key": self.api_key, **{k: str(v) for k, v in params.items()}}
+            payload = await self._get(
+                f"{self.base_url}/{path.lstrip('/')}",
+                lambda response: response.json(content_type=None),
+                all_params,
+            )
+            if not isinstance(payload, dict):
+                raise ValueError("Unexpected API response format")
+            return payload
+
+        return await self._coalesce(key, fetch)
+
+    async def search_movie(self, query: str, year: str = "") -> Dict[str, Any]:
+        query = query.strip()
+        if not query:
+            return {}
+        params: Dict[str, Any] = {"query": query}
+        if year:
+            params["primary_release_year"] = year
+        data = await self._request_json("search/movie", **params)
+        results = data.get("results") or []
+        if not results and year:
+            data = await self._request_json("search/movie", query=query)
+        return data
+
+    async def get_credits(self, tmdb_id: int) -> Dict[str, Any]:
+        return await self._request_json(f"movie/{tmdb_id}/credits")
+
+    async def fetch_poster_bytes(self, poster_path: str) -> bytes:
+        if not poster_path:
+            return b""
+
+        async def fetch() -> bytes:
+            return await self._get(f"{self.image_base_url}{poster_path}", lambda response: response.read())
+
+        return await self._coalesce(("poster", poster_path), fetch)
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+class LoopBridge:
+    def __init__(self, name: str = "asyncio-bridge") -> None:
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Awaitable[Any]) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, coro: Awaitable[Any], timeout: float | None = None) -> Any:
+        return self.submit(coro).result(timeout)
+
+    def call_in_tk(
+        self,
+        root,
+        coro: Awaitable[Any],
+        on_done: Callable[[Any], None],
+        on_error: Callable[[BaseException], None] | None = None,
+    ) -> Future:
+        future = self.submit(coro)
+
+        def deliver(done: Future) -> None:
+            if done.cancelled():
+                return
+            exc = done.exception()
+            if exc is None:
+                result = done.result()
+                root.after(0, lambda: on_done(result))
+            elif on_error is not None:
+                root.after(0, lambda: on_error(exc))
+
+        future.add_done_callback(deliver)
+        return future
+
+    def stop(self, cleanup: Awaitable[Any] | None = None, timeout: float = 2.0) -> None:
+        if cleanup is not None and self.loop.is_running():
+            try:
+                self.call(cleanup, timeout)
+            except Exception:
+                pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
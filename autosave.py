@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Set
+
+from models import Movie
+
+
+class SaveDeferred(Exception):
+    pass
+
+
+class AutosaveWriter:
+    PENDING = "pending"
+    SAVING = "saving"
+    SAVED = "saved"
+    DEFERRED = "deferred"
+    ERROR = "error"
+
+    def __init__(
+        self,
+        save: Callable[[List[Movie], Set[str] | None], None],
+        quiet_period: float = 1.5,
+        on_state: Callable[[str, str], None] | None = None,
+        lookup: Callable[[str], Movie | None] | None = None,
+    ) -> None:
+        self._save = save
+        self.quiet_period = quiet_period
+        self._on_state = on_state
+        self._lookup = lookup
+        self._cond = threading.Condition()
+        self._order: List[Movie] | None = None
+        self._captured: Dict[str, dict] = {}
+        self._records: Dict[str, dict] = {}
+        self._stale: Set[str] = set()
+        self._on_saved: List[Callable[[], None]] = []
+        self._dirty: Set[str] | None = set()
+        self._last_change = 0.0
+        self._immediate = False
+        self._writing = False
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="autosave-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def has_pending(self) -> bool:
+        with self._cond:
+            return self._order is not None or self._writing
+
+    def pending_dirty(self) -> Set[str] | None:
+        # uids with edits not yet handed to the save callback; None means a
+        # full save is pending, so every movie counts as edited.
+        with self._cond:
+            if self._order is None:
+                return set()
+            return None if self._dirty is None else set(self._dirty)
+
+    def invalidate(self, uids: Iterable[str]) -> None:
+        # For movies changed without being marked dirty (merged from another
+        # writer), so the next save serializes them again.
+        with self._cond:
+            for uid in uids:
+                self._records.pop(uid, None)
+                self._stale.add(uid)
+
+    def schedule(
+        self,
+        movies: List[Movie],
+        dirty: Iterable[str] | None = None,
+        immediate: bool = False,
+        on_saved: Callable[[], None] | None = None,
+    ) -> None:
+        dirty = None if dirty is None else set(dirty)
+        # This runs on the caller's (UI) thread, so it only copies the list
+        # and serializes the movies marked dirty, which the caller keeps
+        # editing. Everything else is unchanged since the last save and is
+        # serialized by the writer thread.
+        order = list(movies)
+        captured: Dict[str, dict] = {}
+        if dirty:
+            if self._lookup is not None:
+                found: Iterable[Movie | None] = (self._lookup(uid) for uid in dirty)
+            else:
+                found = (movie for movie in order if movie.uid in dirty)
+            for movie in found:
+                if movie is not None:
+                    captured[movie.uid] = movie.to_dict()
+        with self._cond:
+            self._order = order
+            self._captured.update(captured)
+            if on_saved is not None:
+                self._on_saved.append(on_saved)
+            if dirty is None or self._dirty is None:
+                self._dirty = None
+            else:
+                self._dirty.update(dirty)
+            self._last_change = time.monotonic()
+            self._immediate = self._immediate or immediate
+            self._cond.notify_all()
+        self._emit(self.PENDING, "")
+
+    def flush(self, timeout: float | None = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._immediate = True
+            self._cond.notify_all()
+            while self._order is not None or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout: float | None = 10.0) -> bool:
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        return flushed
+
+    def _build(self, order: List[Movie], captured: Dict[str, dict], full: bool) -> List[dict]:
+        # A full save does not trust dirty tracking, so only records captured
+        # for dirty movies are reused; otherwise unchanged movies come from
+        # the records written last time.
+        with self._cond:
+            cached = {} if full else self._records
+            self._stale = set()
+        records = []
+        for movie in order:
+            record = captured.get(movie.uid) or cached.get(movie.uid)
+            records.append(record if record is not None else movie.to_dict())
+        with self._cond:
+            built = {record["uid"]: record for record in records}
+            for uid in self._stale:
+                built.pop(uid, None)
+            self._records = built
+        return records
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._order is None and not self._stopped:
+                    self._cond.wait()
+                if self._order is None and self._stopped:
+                    return
+                while not self._immediate:
+                    remaining = self._last_change + self.quiet_period - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                order, captured, dirty, callbacks = self._order, self._captured, self._dirty, self._on_saved
+                self._order, self._captured, self._dirty, self._on_saved = None, {}, set(), []
+                self._immediate = False
+                self._writing = True
+
+            self._emit(self.SAVING, "")
+            try:
+                records = self._build(order, captured, dirty is None)
+                self._save([Movie.from_dict(record, trusted=True) for record in records], dirty)
+                state, detail = self.SAVED, ""
+                for callback in callbacks:
+                    try:
+                        callback()
+                    except Exception:
+                        pass
+            except SaveDeferred as exc:
+                # The save callback took over rescheduling (e.g. after merging
+                # another writer's changes); nothing was written yet.
+                state, detail = self.DEFERRED, str(exc)
+                with self._cond:
+                    self._on_saved[:0] = callbacks
+            except Exception as exc:
+                state, detail = self.ERROR, str(exc)
+                with self._cond:
+                    self._on_saved[:0] = callbacks
+                    self._captured = {**captured, **self._captured}
+                    self._dirty = None
+                    if self._order is None:
+                        self._order = order
+                        self._last_change = time.monotonic()
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+            self._emit(state, detail)
+            if state == self.ERROR:
+                with self._cond:
+                    self._cond.wait(self.quiet_period * 4)
+
+    def _emit(self, state: str, detail: str) -> None:
+        if self._on_state is not None:
+            try:
+                self._on_state(state, detail)
+            except Exception:
+                pass
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_library, make_poster_jpegs, parse_size  # noqa: E402
+from data_store import JournalMovieRepository, MovieRepository  # noqa: E402
+from facet_index import FacetIndex  # noqa: E402
+from models import Movie  # noqa: E402
+from movie_table import MovieTable  # noqa: E402
+from poster_cache import PosterCache  # noqa: E402
+from recommender import SimilarityIndex  # noqa: E402
+from search_index import MovieSearchIndex, filter_and_sort  # noqa: E402
+
+QUERIES = (("", "All", "Title"), ("star", "All", "Rating"), ("the ni", "Watchlist", "Year"), ("", "Watched", "Rating"))
+FACET_QUERIES = (
+    ("", "All", "Rating", {"genre": ["Drama"]}),
+    ("the", "Unwatched", "Title", {"decade": ["1990s"], "rating": ["7-8"]}),
+)
+
+
+class Skipped(Exception):
+    pass
+
+
+def measure(func: Callable[[], object], repeat: int, setup: Callable[[], object] | None = None) -> Dict[str, float]:
+    samples: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return {"median": statistics.median(samples), "min": min(samples), "runs": len(samples)}
+
+
+def bench_models(movies: List[Movie], repeat: int) -> Dict[str, Dict[str, float]]:
+    payloads = [movie.to_dict() for movie in movies]
+    return {
+        "movie.to_dict": measure(lambda: [movie.to_dict() for movie in movies], repeat),
+        "movie.from_dict": measure(lambda: [Movie.from_dict(payload) for payload in payloads], repeat),
+        "movie.from_dict_trusted": measure(
+            lambda: [Movie.from_dict(payload, trusted=True) for payload in payloads], repeat
+        ),
+    }
+
+
+def bench_repository(movies: List[Movie], repeat: int, workdir: str) -> Dict[str, Dict[str, float]]:
+    data_file = os.path.join(workdir, "movies.json")
+    settings_file = os.path.join(workdir, "settings.json")
+    repo = MovieRepository(data_file, settings_file)
+    results = {"repo.save_movies": measure(lambda: repo.save_movies(movies), repeat)}
+    results["repo.save_with_snapshot"] = measure(lambda: repo.save_movies(movies) or repo.flush_snapshot(), repeat)
+    results["repo.load_movies_snapshot"] = measure(repo.load_movies, repeat)
+    os.remove(repo.snapshot_file)
+    results["repo.load_movies_json"] = measure(repo.load_movies, repeat)
+    results["repo.iter_movies_json"] = measure(lambda: sum(len(chunk) for chunk in repo.iter_movies()), repeat)
+    repo.close()
+
+    journal = JournalMovieRepository(
+        os.path.join(workdir, "journal.json"), settings_file, compact_threshold=1 << 62
+    )
+    journal.save_movies(movies)
+    changed = movies[len(movies) // 2]
+
+    def touch() -> None:
+        changed.rating = round((changed.rating + 0.1) % 10, 1)
+
+    results["journal.save_one_dirty"] = measure(
+        lambda: journal.save_movies(movies, dirty=[changed.uid]), repeat, setup=touch
+    )
+    results["journal.load_movies"] = measure(journal.load_movies, repeat)
+    journal.close()
+    return results
+
+
+def bench_filtering(movies: List[Movie], repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {
+        "filter.index_build": measure(lambda: MovieSearchIndex(movies), max(1, repeat // 2)),
+        "filter.facet_build": measure(lambda: FacetIndex(movies), max(1, repeat // 2)),
+        "filter.table_build": measure(lambda: MovieTable(movies), max(1, repeat // 2)),
+    }
+    # The same call refresh_movie_list makes on its query worker.
+    index, facets = MovieSearchIndex(movies), FacetIndex(movies)
+    filter_and_sort(index, facets, *QUERIES[0])
+    results["filter.query"] = measure(lambda: [filter_and_sort(index, facets, *q) for q in QUERIES], repeat)
+    results["filter.query_facets"] = measure(
+        lambda: [filter_and_sort(index, facets, *q) for q in FACET_QUERIES], repeat
+    )
+    table = MovieTable(movies)
+    results["filter.table_query"] = measure(lambda: [table.query(*q) for q in QUERIES], repeat)
+    return results
+
+
+def bench_similarity(movies: List[Movie], repeat: int) -> Dict[str, Dict[str, float]]:
+    cast = [(index * 7919 % 5000, index * 104729 % 5000, index % 5000) for index in range(len(movies))]
+    credits = {index: (people, (index % 800,)) for index, people in enumerate(cast)}
+    original = [movie.tmdb_id for movie in movies]
+    for index, movie in enumerate(movies):
+        movie.tmdb_id = index
+    results = {"similar.build": measure(lambda: SimilarityIndex(movies, credits=credits.get), 1)}
+    index = SimilarityIndex(movies, credits=credits.get)
+    probes = [movie.uid for movie in movies[:: max(1, len(movies) // 20)]]
+    liked = probes[:10]
+    candidates = [movie.uid for movie in movies if movie.watchlist][:2000]
+    results["similar.more_like"] = measure(lambda: [index.more_like(uid) for uid in probes], repeat)
+    results["similar.watch_next"] = measure(lambda: index.watch_next(liked, candidates), repeat)
+    for movie, tmdb_id in zip(movies, original):
+        movie.tmdb_id = tmdb_id
+    return results
+
+
+def bench_poster_cache(threads: int, operations: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    payload = b"x" * 4096
+    keys = [("poster", i) for i in range(2048)]
+
+    def run() -> None:
+        cache = PosterCache(max_bytes=1024 * len(payload))
+        barrier = threading.Barrier(threads)
+
+        def worker(offset: int) -> None:
+            barrier.wait()
+            for i in range(operations):
+                key = keys[(i * 7 + offset) % len(keys)]
+                if cache.get(key) is None:
+                    cache.put(key, payload, len(payload))
+
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+    return {f"poster_cache.get_put_{threads}threads": measure(run, repeat)}
+
+
+def bench_poster_decode(count: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    try:
+        from poster_decode import decode_batch, decode_poster
+    except ImportError as exc:
+        raise Skipped(f"poster decode needs Pillow ({exc})")
+    posters = make_poster_jpegs(count)
+    size = (140, 200)
+    return {
+        "poster.decode_thumbnail": measure(lambda: [decode_poster("raw", data, size) for data in posters], repeat),
+        "poster.decode_batch": measure(lambda: decode_batch([("raw", data) for data in posters], size), repeat),
+    }
+
+
+def bench_startup_import(repeat: int) -> Dict[str, Dict[str, float]]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, "-c", "import movie_collection_manager"]
+
+    def run() -> None:
+        completed = subprocess.run(command, cwd=root, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise Skipped(f"manager import failed: {completed.stderr.strip().splitlines()[-1:]}")
+
+    return {"startup.import_manager": measure(run, repeat)}
+
+
+def run_suite(sizes: List[str], repeat: int, threads: int) -> Dict[str, object]:
+    results: Dict[str, Dict[str, float]] = {}
+    skipped: Dict[str, str] = {}
+    with tempfile.TemporaryDirectory(prefix="movie-bench-") as workdir:
+        for label in sizes:
+            count = parse_size(label)
+            movies = make_library(count)
+            runs = repeat if count <= 100_000 else 1
+            print(f"[{label}] {count} movies", file=sys.stderr)
+            for group in (
+                bench_models(movies, runs),
+                bench_repository(movies, runs, workdir),
+                bench_filtering(movies, runs),
+                bench_similarity(movies, runs),
+            ):
+                for name, stats in group.items():
+                    results[f"{name}@{label}"] = stats
+    for name, stats in bench_poster_cache(threads, 20_000, repeat).items():
+        results[name] = stats
+    try:
+        results.update(bench_poster_decode(24, repeat))
+    except Skipped as exc:
+        skipped["poster.decode"] = str(exc)
+    try:
+        results.update(bench_startup_import(repeat))
+    except Skipped as exc:
+        skipped["startup.import"] = str(exc)
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "sizes": sizes,
+            "repeat": repeat,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(current: Dict[str, object], baseline: Dict[str, object], threshold: float) -> List[Tuple[str, float, float, float]]:
+    rows = []
+    old_results = baseline.get("results", {})
+    for name, stats in current["results"].items():
+        old = old_results.get(name)
+        if not old or not old.get("median"):
+            continue
+        ratio = stats["median"] / old["median"]
+        rows.append((name, old["median"], stats["median"], ratio))
+    regressions = [row for row in rows if row[3] > 1 + threshold]
+    for name, old, new, ratio in rows:
+        marker = "REGRESSION" if ratio > 1 + threshold else ("faster" if ratio < 1 - threshold else "")
+        print(f"{name:48} {old * 1000:10.2f}ms {new * 1000:10.2f}ms {ratio:6.2f}x {marker}")
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Headless benchmarks for the movie collection hot paths.")
+    parser.add_argument("--sizes", default="1k,10k,100k", help="comma separated library sizes (1k,10k,100k,1m)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=8, help="threads for the poster cache contention run")
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--baseline", help="compare against a previous results JSON")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before flagging")
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    report = run_suite(sizes, max(1, args.repeat), max(1, args.threads))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    for name, reason in report["skipped"].items():
+        print(f"skipped {name}: {reason}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        if compare(report, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
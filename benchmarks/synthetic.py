@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import random
+from typing import List
+
+from models import Movie
+
+_WORDS = (
+    "the", "star", "war", "night", "dark", "return", "king", "love", "last", "city", "river", "ghost",
+    "empire", "shadow", "blade", "runner", "storm", "silent", "planet", "summer", "winter", "secret",
+    "garden", "machine", "island", "golden", "broken", "wild", "lost", "black", "red", "iron",
+)
+_GENRES = ("Action", "Drama", "Comedy", "Horror", "Sci-Fi", "Romance", "Thriller", "Animation")
+
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def parse_size(label: str) -> int:
+    label = label.strip().lower()
+    if label in SIZES:
+        return SIZES[label]
+    return int(label)
+
+
+def make_library(count: int, seed: int = 1234) -> List[Movie]:
+    rng = random.Random(seed)
+    movies: List[Movie] = []
+    for i in range(count):
+        words = rng.sample(_WORDS, rng.randint(1, 4))
+        movies.append(
+            Movie(
+                name=" ".join(words).title(),
+                year=str(rng.randint(1920, 2025)) if rng.random() > 0.05 else "",
+                genre=", ".join(rng.sample(_GENRES, rng.randint(1, 3))),
+                rating=round(rng.random() * 10, 1),
+                watched=rng.random() < 0.4,
+                favorite=rng.random() < 0.1,
+                watchlist=rng.random() < 0.2,
+                poster_path=f"/poster{i}.jpg" if rng.random() > 0.1 else "",
+                file_path=f"/media/movies/{i}.mkv" if rng.random() > 0.5 else "",
+                tmdb_id=rng.randint(1, 1_000_000) if rng.random() > 0.3 else None,
+                uid=f"{seed:08x}{i:024x}",
+            )
+        )
+    return movies
+
+
+def make_poster_jpegs(count: int, size=(300, 450), seed: int = 99) -> List[bytes]:
+    from io import BytesIO
+
+    from PIL import Image
+
+    rng = random.Random(seed)
+    posters: List[bytes] = []
+    for _ in range(count):
+        image = Image.new("RGB", size, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        for _band in range(12):
+            x0, y0 = rng.randrange(size[0]), rng.randrange(size[1])
+            color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+            image.paste(color, (x0, y0, min(size[0], x0 + 60), min(size[1], y0 + 40)))
+        encoded = BytesIO()
+        image.save(encoded, format="JPEG", quality=85)
+        posters.append(encoded.getvalue())
+    return posters
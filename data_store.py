@@ -1,19 +1,317 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import mmap
 import os
+import struct
 import tempfile
-from typing import List
+import threading
+import zlib
+from typing import Dict, Iterable, Iterator, List, Set, TextIO, Tuple
 
+import metrics
+from library_sync import FileLock, file_signature
 from models import Movie
 
+SNAPSHOT_MAGIC = b"MCMS"
+SNAPSHOT_VERSION = 2
+_HEADER = struct.Struct("<4sHHIIQIQq")
+_RECORD = struct.Struct("<6IdBq")
+_OFFSET = struct.Struct("<I")
+_FLAG_WATCHED = 1
+_FLAG_FAVORITE = 2
+_FLAG_WATCHLIST = 4
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def source_signature(path: str) -> Tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def write_snapshot(path: str, movies: Iterable[Movie], source: Tuple[int, int]) -> None:
+    strings: Dict[str, int] = {}
+    table: List[bytes] = []
+
+    def intern(value: str) -> int:
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(table)
+            table.append(value.encode("utf-8"))
+        return index
+
+    records = bytearray()
+    count = 0
+    for movie in movies:
+        flags = (
+            (_FLAG_WATCHED if movie.watched else 0)
+            | (_FLAG_FAVORITE if movie.favorite else 0)
+            | (_FLAG_WATCHLIST if movie.watchlist else 0)
+        )
+        records += _RECORD.pack(
+            intern(movie.name),
+            intern(movie.year),
+            intern(movie.genre),
+            intern(movie.poster_path),
+            intern(movie.file_path),
+            intern(movie.uid),
+            float(movie.rating),
+            flags,
+            -1 if movie.tmdb_id is None else int(movie.tmdb_id),
+        )
+        count += 1
+
+    offsets = bytearray()
+    position = 0
+    for encoded in table:
+        offsets += _OFFSET.pack(position)
+        position += len(encoded)
+    offsets += _OFFSET.pack(position)
+    payload = bytes(records) + bytes(offsets) + b"".join(table)
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        0,
+        count,
+        len(table),
+        _HEADER.size + len(records),
+        zlib.crc32(payload),
+        source[0],
+        source[1],
+    )
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as temp:
+            temp.write(header)
+            temp.write(payload)
+            temp.flush()
+            os.fsync(temp.fileno())
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class SnapshotReader:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as handle:
+            try:
+                self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as exc:
+                raise SnapshotError("Empty snapshot") from exc
+        try:
+            self._validate()
+        except SnapshotError:
+            self.close()
+            raise
+        self._strings: Dict[int, str] = {}
+
+    def _validate(self) -> None:
+        if len(self._map) < _HEADER.size:
+            raise SnapshotError("Truncated snapshot header")
+        magic, version, _reserved, count, string_count, strings_offset, checksum, size, mtime_ns = _HEADER.unpack_from(
+            self._map, 0
+        )
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise SnapshotError("Unsupported snapshot format")
+        if strings_offset != _HEADER.size + count * _RECORD.size:
+            raise SnapshotError("Corrupt snapshot layout")
+        if zlib.crc32(self._map[_HEADER.size:]) != checksum:
+            raise SnapshotError("Snapshot checksum mismatch")
+        self.source = (size, mtime_ns)
+        self._count = count
+        self._string_count = string_count
+        self._strings_offset = strings_offset
+        self._blob_offset = strings_offset + (string_count + 1) * _OFFSET.size
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Movie:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("snapshot index out of range")
+        name, year, genre, poster, file_path, uid, rating, flags, tmdb_id = _RECORD.unpack_from(
+            self._map, _HEADER.size + index * _RECORD.size
+        )
+        string = self._string
+        return Movie(
+            string(name),
+            string(year),
+            string(genre),
+            rating,
+            bool(flags & _FLAG_WATCHED),
+            bool(flags & _FLAG_FAVORITE),
+            bool(flags & _FLAG_WATCHLIST),
+            string(poster),
+            string(file_path),
+            None if tmdb_id < 0 else tmdb_id,
+            string(uid),
+        )
+
+    def __iter__(self) -> Iterator[Movie]:
+        return (self[i] for i in range(self._count))
+
+    def iter_chunks(self, chunk_size: int = 500) -> Iterator[List[Movie]]:
+        for start in range(0, self._count, chunk_size):
+            yield [self[i] for i in range(start, min(start + chunk_size, self._count))]
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _string(self, index: int) -> str:
+        value = self._strings.get(index)
+        if value is None:
+            if index >= self._string_count:
+                raise SnapshotError("String index out of range")
+            base = self._strings_offset + index * _OFFSET.size
+            start = _OFFSET.unpack_from(self._map, base)[0]
+            end = _OFFSET.unpack_from(self._map, base + _OFFSET.size)[0]
+            value = self._map[self._blob_offset + start:self._blob_offset + end].decode("utf-8")
+            self._strings[index] = value
+        return value
+
+
+def with_stable_uids(records: Iterable[object]) -> Iterator[object]:
+    # Records from files written before uids existed get one derived from their
+    # content (plus an occurrence counter for exact duplicates), so every load
+    # of the same file agrees and journal entries keyed on them still apply.
+    seen: Dict[str, int] = {}
+    for record in records:
+        if isinstance(record, dict) and not str(record.get("uid") or "").strip():
+            digest = hashlib.sha1(json.dumps(record, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+            occurrence = seen.get(digest, 0)
+            seen[digest] = occurrence + 1
+            record = {**record, "uid": hashlib.sha1(f"{digest}:{occurrence}".encode("ascii")).hexdigest()[:32]}
+        yield record
+
+
+def iter_json_records(handle: TextIO, block_size: int = 64 * 1024) -> Iterator[dict]:
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+    while True:
+        while pos < len(buffer) and (buffer[pos].isspace() or (started and buffer[pos] == ",")):
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                return
+            buffer = handle.read(block_size)
+            pos = 0
+            eof = not buffer
+            continue
+        if not started:
+            if buffer[pos] != "[":
+                return
+            started = True
+            pos += 1
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                return
+            more = handle.read(block_size)
+            eof = not more
+            buffer = buffer[pos:] + more
+            pos = 0
+            continue
+        pos = end
+        if isinstance(item, dict):
+            yield item
+
 
 class MovieRepository:
-    def __init__(self, data_file: str = "movies_data.json", settings_file: str = "settings.json") -> None:
+    def __init__(
+        self,
+        data_file: str = "movies_data.json",
+        settings_file: str = "settings.json",
+        snapshot_file: str | None = None,
+    ) -> None:
         self.data_file = data_file
         self.settings_file = settings_file
+        self.snapshot_file = snapshot_file or f"{data_file}.snap"
+        self.lock = FileLock(f"{data_file}.lock")
+        self._known_files: Tuple | None = None
+        self._unsnapshotted: Tuple[List[Movie], Tuple[int, int]] | None = None
+
+    def watched_files(self) -> List[str]:
+        return [self.data_file]
+
+    def has_external_changes(self) -> bool:
+        return self._known_files is not None and file_signature(self.watched_files()) != self._known_files
+
+    def remember_files(self) -> None:
+        self._known_files = file_signature(self.watched_files())
+
+    def read_external(self) -> Tuple[List[Movie], Tuple]:
+        with self.lock:
+            signature = file_signature(self.watched_files())
+            return self._read_movies(), signature
+
+    def accept_external(self, signature: Tuple, changed: Iterable[Movie] = (), removed: Iterable[str] = ()) -> None:
+        self._known_files = signature
+
+    def open_snapshot(self) -> SnapshotReader | None:
+        # The snapshot names the exact JSON file it mirrors; a replaced file
+        # with an older or equal mtime must not resurrect stale data.
+        source = source_signature(self.data_file)
+        if source is None:
+            return None
+        try:
+            reader = SnapshotReader(self.snapshot_file)
+        except (OSError, SnapshotError, struct.error):
+            return None
+        if reader.source != source:
+            reader.close()
+            return None
+        return reader
+
+    def flush_snapshot(self) -> None:
+        with self.lock:
+            pending, self._unsnapshotted = self._unsnapshotted, None
+            if pending is None:
+                return
+            movies, source = pending
+            if source_signature(self.data_file) == source:
+                write_snapshot(self.snapshot_file, movies, source)
 
+    @metrics.timed("storage.json.load_movies")
     def load_movies(self) -> List[Movie]:
+        with self.lock:
+            self.remember_files()
+            return self._read_movies()
+
+    def _read_movies(self) -> List[Movie]:
+        snapshot = self.open_snapshot()
+        if snapshot is not None:
+            try:
+                with snapshot:
+                    return list(snapshot)
+            except (SnapshotError, struct.error, UnicodeDecodeError):
+                pass
         if not os.path.exists(self.data_file):
             return []
         try:
@@ -24,7 +322,7 @@ class MovieRepository:
 
         movies: List[Movie] = []
         if isinstance(payload, list):
-            for item in payload:
+            for item in with_stable_uids(payload):
                 if not isinstance(item, dict):
                     continue
                 try:
@@ -33,33 +331,399 @@ class MovieRepository:
                     continue
         return movies
 
-    def save_movies(self, movies: List[Movie]) -> None:
+    def iter_movies(self, chunk_size: int = 500) -> Iterator[List[Movie]]:
+        self.remember_files()
+        return self._iter_stored(chunk_size)
+
+    def stream_movies(self, chunk_size: int = 500) -> Iterator[List[Movie]]:
+        # Read-only pass for callers that never call save_movies (the CLI):
+        # nothing is kept for diffing later saves, so memory stays per chunk.
+        return self._iter_stored(chunk_size)
+
+    def _iter_stored(self, chunk_size: int) -> Iterator[List[Movie]]:
+        delivered: Set[str] = set()
+        snapshot = self.open_snapshot()
+        if snapshot is not None:
+            try:
+                with snapshot:
+                    for snapshot_chunk in snapshot.iter_chunks(chunk_size):
+                        yield snapshot_chunk
+                        delivered.update(movie.uid for movie in snapshot_chunk)
+                return
+            except (SnapshotError, struct.error, UnicodeDecodeError):
+                pass
+
+        # A snapshot that fails part-way is resumed from the JSON file. Invalid
+        # records are missing from the snapshot, so a count of delivered
+        # movies does not line up with raw records; uids do.
+        chunk: List[Movie] = []
+        for item in self._iter_records():
+            try:
+                movie = Movie.from_dict(item)
+            except ValueError:
+                continue
+            if movie.uid in delivered:
+                continue
+            chunk.append(movie)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _iter_records(self, block_size: int = 64 * 1024) -> Iterator[dict]:
+        if not os.path.exists(self.data_file):
+            return
+        try:
+            with open(self.data_file, "r", encoding="utf-8") as handle:
+                yield from with_stable_uids(iter_json_records(handle, block_size))
+        except OSError:
+            return
+
+    @metrics.timed("storage.json.save_movies")
+    def save_movies(self, movies: List[Movie], dirty: Iterable[str] | None = None) -> None:
         payload = [movie.to_dict() for movie in movies]
         directory = os.path.dirname(self.data_file) or "."
         os.makedirs(directory, exist_ok=True)
-        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
-        try:
-            with os.fdopen(fd, "w", encoding="utf-8") as temp:
-                json.dump(payload, temp, indent=2)
-            os.replace(temp_path, self.data_file)
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        with self.lock:
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as temp:
+                    json.dump(payload, temp, indent=2)
+                os.replace(temp_path, self.data_file)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            # Writing the snapshot on every save doubled the save cost; it only
+            # speeds up the next cold start, so it is written on close.
+            source = source_signature(self.data_file)
+            self._unsnapshotted = (movies, source) if source is not None else None
+            self.remember_files()
+
+    @metrics.timed("storage.json.save_stream")
+    def save_stream(self, movies: Iterable[Movie]) -> int:
+        directory = os.path.dirname(self.data_file) or "."
+        os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            count = 0
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as temp:
+                    temp.write("[")
+                    for movie in movies:
+                        temp.write(",\n  " if count else "\n  ")
+                        temp.write(json.dumps(movie.to_dict()))
+                        count += 1
+                    temp.write("\n]" if count else "]")
+                os.replace(temp_path, self.data_file)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            # The snapshot needs the whole table in memory, so a streamed save
+            # drops it and the next load falls back to the JSON file.
+            self._unsnapshotted = None
+            try:
+                os.remove(self.snapshot_file)
+            except OSError:
+                pass
+            self.remember_files()
+        return count
+
+    def close(self) -> None:
+        self.flush_snapshot()
 
     def load_settings(self) -> dict:
+        defaults = {"dark_mode": True, "storage": "journal", "poster_cache_mb": 200, "library_dirs": []}
         if not os.path.exists(self.settings_file):
-            return {"dark_mode": True}
+            return defaults
         try:
             with open(self.settings_file, "r", encoding="utf-8") as handle:
                 payload = json.load(handle)
             if not isinstance(payload, dict):
-                return {"dark_mode": True}
-            return {"dark_mode": bool(payload.get("dark_mode", True))}
-        except (OSError, json.JSONDecodeError):
-            return {"dark_mode": True}
+                return defaults
+            storage = str(payload.get("storage", "journal"))
+            return {
+                "dark_mode": bool(payload.get("dark_mode", True)),
+                "storage": storage if storage in ("json", "journal", "sqlite") else "journal",
+                "poster_cache_mb": max(1, int(payload.get("poster_cache_mb", 200))),
+                "library_dirs": [str(path) for path in payload.get("library_dirs") or [] if str(path).strip()],
+            }
+        except (OSError, TypeError, ValueError):
+            return defaults
 
     def save_settings(self, settings: dict) -> None:
         directory = os.path.dirname(self.settings_file) or "."
         os.makedirs(directory, exist_ok=True)
         with open(self.settings_file, "w", encoding="utf-8") as handle:
             json.dump(settings, handle, indent=2)
+
+
+class JournalMovieRepository(MovieRepository):
+    def __init__(
+        self,
+        data_file: str = "movies_data.json",
+        settings_file: str = "settings.json",
+        journal_file: str | None = None,
+        compact_threshold: int = 4 * 1024 * 1024,
+    ) -> None:
+        super().__init__(data_file, settings_file)
+        self.journal_file = journal_file or f"{data_file}.journal"
+        self.compact_threshold = compact_threshold
+        self._records: Dict[str, dict] = {}
+        # Compaction rewrites the JSON file from _records, so it only runs
+        # once they hold the whole library, not after a partial read.
+        self._complete = False
+        self._lock = threading.Lock()
+        self._compacting = False
+        self._compactor: threading.Thread | None = None
+
+    def watched_files(self) -> List[str]:
+        return [self.data_file, self.journal_file]
+
+    def accept_external(self, signature: Tuple, changed: Iterable[Movie] = (), removed: Iterable[str] = ()) -> None:
+        with self._lock:
+            for movie in changed:
+                self._records[movie.uid] = movie.to_dict()
+            for uid in removed:
+                self._records.pop(uid, None)
+        super().accept_external(signature)
+
+    @metrics.timed("storage.journal.load_movies")
+    def load_movies(self) -> List[Movie]:
+        with self.lock:
+            self.remember_files()
+            movies = self._read_movies()
+        with self._lock:
+            self._records = {movie.uid: movie.to_dict() for movie in movies}
+            self._complete = True
+        return movies
+
+    def _read_movies(self) -> List[Movie]:
+        state: Dict[str, dict] = {}
+        for movie in super()._read_movies():
+            state[movie.uid] = movie.to_dict()
+        for op, uid, record in self._read_journal():
+            if op == "upsert" and record is not None:
+                state[uid] = record
+            elif op == "delete":
+                state.pop(uid, None)
+
+        movies: List[Movie] = []
+        for uid, record in list(state.items()):
+            try:
+                movies.append(Movie.from_dict(record))
+            except ValueError:
+                state.pop(uid, None)
+        return movies
+
+    def iter_movies(self, chunk_size: int = 500) -> Iterator[List[Movie]]:
+        self.remember_files()
+        return self._iter_replayed(chunk_size, track=True)
+
+    def stream_movies(self, chunk_size: int = 500) -> Iterator[List[Movie]]:
+        return self._iter_replayed(chunk_size, track=False)
+
+    def _iter_replayed(self, chunk_size: int, track: bool) -> Iterator[List[Movie]]:
+        pending: Dict[str, dict | None] = {}
+        for op, uid, record in self._read_journal():
+            if op == "upsert" and record is not None:
+                pending[uid] = record
+            elif op == "delete":
+                pending[uid] = None
+        if track:
+            with self._lock:
+                self._records = {}
+                self._complete = False
+
+        def keep(movie: Movie) -> None:
+            if track:
+                with self._lock:
+                    self._records[movie.uid] = movie.to_dict()
+
+        def accept(record: dict) -> Movie | None:
+            try:
+                movie = Movie.from_dict(record)
+            except ValueError:
+                return None
+            keep(movie)
+            return movie
+
+        chunk: List[Movie] = []
+        for base_chunk in self._iter_stored(chunk_size):
+            for movie in base_chunk:
+                if movie.uid in pending:
+                    record = pending.pop(movie.uid)
+                    if record is None:
+                        continue
+                    replaced = accept(record)
+                    if replaced is None:
+                        continue
+                    movie = replaced
+                else:
+                    keep(movie)
+                chunk.append(movie)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        for record in pending.values():
+            if record is not None:
+                movie = accept(record)
+                if movie is not None:
+                    chunk.append(movie)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+        if track:
+            with self._lock:
+                self._complete = True
+
+    @metrics.timed("storage.journal.save_movies")
+    def save_movies(self, movies: List[Movie], dirty: Iterable[str] | None = None) -> None:
+        by_uid = {movie.uid: movie for movie in movies}
+        with self.lock, self._lock:
+            records = self._records if dirty is not None else {}
+            deleted = [uid for uid in self._records if uid not in by_uid]
+            if dirty is None:
+                candidates: Iterable[str] = by_uid
+            else:
+                # Kept in list order so new movies land in _records, and so
+                # in the compacted file, where they sit in the library.
+                dirty = set(dirty)
+                candidates = [uid for uid in by_uid if uid in dirty or uid not in self._records]
+                for uid in deleted:
+                    records.pop(uid, None)
+
+            lines = [json.dumps({"op": "delete", "uid": uid}) for uid in deleted]
+            for uid in candidates:
+                record = by_uid[uid].to_dict()
+                if self._records.get(uid) != record:
+                    lines.append(json.dumps({"op": "upsert", "uid": uid, "movie": record}, ensure_ascii=False))
+                records[uid] = record
+            if lines:
+                self._append_journal(lines)
+            self._records = records
+            if dirty is None:
+                self._complete = True
+            journal_size = self._journal_size()
+            self.remember_files()
+        if journal_size >= self.compact_threshold:
+            self.compact(background=True)
+
+    def save_stream(self, movies: Iterable[Movie]) -> int:
+        self.wait_for_compaction()
+        with self.lock:
+            count = super().save_stream(movies)
+            with self._lock:
+                self._truncate_journal(self._journal_size())
+                self._records = {}
+                self._complete = False
+            self.remember_files()
+        return count
+
+    def compact(self, background: bool = False) -> None:
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        if background:
+            self._compactor = threading.Thread(target=self._compact, name="journal-compactor", daemon=True)
+            self._compactor.start()
+        else:
+            self._compact()
+
+    def wait_for_compaction(self, timeout: float | None = None) -> None:
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join(timeout)
+
+    def close(self) -> None:
+        # movies_data.json is also the export file and what other windows
+        # reconcile against, so a session never ends with edits only in
+        # the journal.
+        self.wait_for_compaction()
+        if self._journal_size() > 0:
+            self.compact()
+        super().close()
+
+    def _compact(self) -> None:
+        try:
+            with self.lock:
+                # Records appended by another writer are not in self._records;
+                # folding the journal now would drop them.
+                if not self._complete or self.has_external_changes():
+                    return
+                with self._lock:
+                    records = list(self._records.values())
+                    offset = self._journal_size()
+                snapshot = [Movie.from_dict(record, trusted=True) for record in records]
+                super().save_movies(snapshot)
+                with self._lock:
+                    self._truncate_journal(offset)
+                self.remember_files()
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def _read_journal(self):
+        if not os.path.exists(self.journal_file):
+            return
+        try:
+            with open(self.journal_file, "r", encoding="utf-8", newline="") as handle:
+                for line in handle:
+                    if not line.endswith("\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if not isinstance(entry, dict):
+                        continue
+                    uid = str(entry.get("uid") or "")
+                    if not uid:
+                        continue
+                    record = entry.get("movie")
+                    yield entry.get("op"), uid, record if isinstance(record, dict) else None
+        except OSError:
+            return
+
+    def _append_journal(self, lines: List[str]) -> None:
+        directory = os.path.dirname(self.journal_file) or "."
+        os.makedirs(directory, exist_ok=True)
+        payload = ("\n".join(lines) + "\n").encode("utf-8")
+        with open(self.journal_file, "ab+") as handle:
+            if handle.tell() > 0:
+                handle.seek(-1, os.SEEK_END)
+                if handle.read(1) != b"\n":
+                    payload = b"\n" + payload
+            handle.write(payload)
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def _journal_size(self) -> int:
+        try:
+            return os.path.getsize(self.journal_file)
+        except OSError:
+            return 0
+
+    def _truncate_journal(self, offset: int) -> None:
+        # Records appended while the snapshot was written are carried over;
+        # replaying anything already in the snapshot is idempotent.
+        try:
+            with open(self.journal_file, "rb") as handle:
+                handle.seek(offset)
+                tail = handle.read()
+        except OSError:
+            return
+        directory = os.path.dirname(self.journal_file) or "."
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as temp:
+                temp.write(tail)
+                temp.flush()
+                os.fsync(temp.fileno())
+            os.replace(temp_path, self.journal_file)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
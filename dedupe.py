@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+import math
+import os
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Set, Tuple
+
+from models import Movie
+
+_ARTICLES = ("the ", "a ", "an ")
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+_TRAILING_ARTICLE = re.compile(r"^(.+?),\s*(the|a|an)\b(.*)$")
+_ROMAN = re.compile(r"^(x{0,3})(ix|iv|v?i{0,3})$")
+_ROMAN_VALUES = {"i": 1, "v": 5, "x": 10}
+
+
+def _words(name: str) -> List[str]:
+    text = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").lower()
+    text = text.replace("&", " and ")
+    # Library-style titles ("Matrix, The") sort on the noun; put the article
+    # back in front so they compare equal to "The Matrix".
+    moved = _TRAILING_ARTICLE.match(text.strip())
+    if moved is not None:
+        text = f"{moved.group(2)} {moved.group(1)}{moved.group(3)}"
+    words = _NON_WORD.sub(" ", text).split()
+    if len(words) > 1 and f"{words[0]} " in _ARTICLES:
+        words = words[1:]
+    return words
+
+
+def normalize_title(name: str) -> str:
+    return "".join(_words(name))
+
+
+def sequel_number(name: str) -> str:
+    words = _words(name)
+    if len(words) < 2:
+        return ""
+    last = words[-1]
+    if last.isdigit():
+        return str(int(last))
+    if _ROMAN.match(last):
+        total = 0
+        for char, following in zip(last, [*last[1:], ""]):
+            value = _ROMAN_VALUES[char]
+            total += -value if following and _ROMAN_VALUES[following] > value else value
+        return str(total)
+    return ""
+
+
+def title_grams(compact: str, size: int = 3) -> frozenset:
+    padded = f"^{compact}$"
+    if len(padded) <= size:
+        return frozenset((padded,))
+    return frozenset(padded[i:i + size] for i in range(len(padded) - size + 1))
+
+
+def dice(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return 2.0 * len(a & b) / (len(a) + len(b))
+
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    uid: str
+    reason: str
+    score: float
+
+
+@dataclass
+class MergeGroup:
+    merged: Movie
+    members: List[Movie]
+    reasons: Set[str] = field(default_factory=set)
+
+    @property
+    def removed(self) -> List[str]:
+        return [movie.uid for movie in self.members if movie.uid != self.merged.uid]
+
+
+@dataclass
+class _Entry:
+    uid: str
+    compact: str
+    year: int | None
+    tmdb_id: int | None
+    file_key: str
+    grams: frozenset
+    seq: int
+    sequel: str = ""
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self.parent: Dict[str, str] = {}
+        self.tmdb: Dict[str, int | None] = {}
+        self.reasons: Dict[str, Set[str]] = {}
+
+    def add(self, uid: str, tmdb_id: int | None) -> None:
+        self.parent.setdefault(uid, uid)
+        self.tmdb.setdefault(uid, tmdb_id)
+
+    def find(self, uid: str) -> str:
+        parent = self.parent
+        while parent[uid] != uid:
+            parent[uid] = parent[parent[uid]]
+            uid = parent[uid]
+        return uid
+
+    def union(self, a: str, b: str, reason: str) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            tmdb_a, tmdb_b = self.tmdb[root_a], self.tmdb[root_b]
+            # Fuzzy chains must not glue together two different TMDB films.
+            if tmdb_a is not None and tmdb_b is not None and tmdb_a != tmdb_b:
+                return
+            self.parent[root_b] = root_a
+            self.tmdb[root_a] = tmdb_a if tmdb_a is not None else tmdb_b
+            self.reasons.setdefault(root_a, set()).update(self.reasons.pop(root_b, ()))
+        self.reasons.setdefault(root_a, set()).add(reason)
+
+    def groups(self) -> List[Tuple[List[str], Set[str]]]:
+        members: Dict[str, List[str]] = {}
+        for uid in self.parent:
+            members.setdefault(self.find(uid), []).append(uid)
+        return [(uids, self.reasons.get(root, set())) for root, uids in members.items()]
+
+
+class DuplicateIndex:
+    def __init__(
+        self,
+        movies: Iterable[Movie] = (),
+        fuzzy_threshold: float = 0.85,
+        year_tolerance: int = 1,
+        max_bucket: int = 5000,
+    ) -> None:
+        self.fuzzy_threshold = fuzzy_threshold
+        self.year_tolerance = year_tolerance
+        self.max_bucket = max_bucket
+        self._entries: Dict[str, _Entry] = {}
+        self._by_tmdb: Dict[int, Set[str]] = {}
+        self._by_file: Dict[str, Set[str]] = {}
+        self._by_title: Dict[str, Set[str]] = {}
+        self._by_gram: Dict[str, Set[str]] = {}
+        self._next_seq = 0
+        self._lock = threading.RLock()
+        for movie in movies:
+            self.add(movie)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self._entries
+
+    def add(self, movie: Movie) -> None:
+        with self._lock:
+            previous = self._entries.get(movie.uid)
+            if previous is not None:
+                self._remove(movie.uid)
+            entry = self._entry(movie, previous.seq if previous is not None else None)
+            self._entries[entry.uid] = entry
+            if entry.tmdb_id is not None:
+                self._by_tmdb.setdefault(entry.tmdb_id, set()).add(entry.uid)
+            if entry.file_key:
+                self._by_file.setdefault(entry.file_key, set()).add(entry.uid)
+            if entry.compact:
+                self._by_title.setdefault(entry.compact, set()).add(entry.uid)
+            for gram in entry.grams:
+                self._by_gram.setdefault(gram, set()).add(entry.uid)
+
+    def remove(self, uid: str) -> None:
+        with self._lock:
+            self._remove(uid)
+
+    def matches(self, movie: Movie, limit: int = 5) -> List[DuplicateMatch]:
+        with self._lock:
+            entry = self._entry(movie, -1)
+            found = [match for match in self._matches(entry) if match.uid != movie.uid]
+            found.sort(key=lambda match: (-match.score, self._entries[match.uid].seq))
+        return found[:limit]
+
+    def groups(self) -> List[Tuple[List[str], Set[str]]]:
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: entry.seq)
+            links = _UnionFind()
+            for entry in entries:
+                links.add(entry.uid, entry.tmdb_id)
+            for index, reason in ((self._by_tmdb, "tmdb_id"), (self._by_file, "file")):
+                for bucket in index.values():
+                    first, *rest = bucket
+                    for uid in rest:
+                        links.union(first, uid, reason)
+            for bucket in self._by_title.values():
+                if len(bucket) > 1:
+                    same = [self._entries[uid] for uid in bucket]
+                    for i, entry in enumerate(same):
+                        for other in same[i + 1:]:
+                            if self._compatible(entry, other):
+                                links.union(entry.uid, other.uid, "title")
+
+            # Prefix filtering: with a shared rarest-first gram order, two
+            # titles above the threshold must share a gram from both prefixes,
+            # so only prefixes are indexed, further split by year so a probe
+            # only meets titles inside the year tolerance.
+            by_gram: Dict[str, List[int]] = {}
+            by_gram_year: Dict[Tuple[str, int | None], List[int]] = {}
+            offsets = range(-self.year_tolerance, self.year_tolerance + 1)
+            sizes = {gram: len(bucket) for gram, bucket in self._by_gram.items()}
+            for position, entry in enumerate(entries):
+                if not entry.compact:
+                    continue
+                prefix = self._prefix(entry.grams, sizes)
+                candidates: Set[int] = set()
+                for gram in prefix:
+                    if entry.year is None:
+                        candidates.update(by_gram.get(gram, ()))
+                        continue
+                    candidates.update(by_gram_year.get((gram, None), ()))
+                    for offset in offsets:
+                        candidates.update(by_gram_year.get((gram, entry.year + offset), ()))
+                for candidate in candidates:
+                    match = self._compare(entry, entries[candidate])
+                    if match is not None:
+                        links.union(entry.uid, match.uid, match.reason)
+                for gram in prefix:
+                    by_gram.setdefault(gram, []).append(position)
+                    by_gram_year.setdefault((gram, entry.year), []).append(position)
+            seq = {uid: entry.seq for uid, entry in self._entries.items()}
+
+        result = []
+        for members, reasons in links.groups():
+            if len(members) > 1:
+                result.append((sorted(members, key=seq.__getitem__), reasons))
+        result.sort(key=lambda group: seq[group[0][0]])
+        return result
+
+    def _entry(self, movie: Movie, seq: int | None) -> _Entry:
+        if seq is None:
+            seq = self._next_seq
+            self._next_seq += 1
+        compact = normalize_title(movie.name)
+        try:
+            year = int(str(movie.year)[:4]) if movie.year else None
+        except ValueError:
+            year = None
+        file_key = os.path.normcase(os.path.normpath(movie.file_path)) if movie.file_path else ""
+        grams = title_grams(compact) if compact else frozenset()
+        return _Entry(movie.uid, compact, year, movie.tmdb_id, file_key, grams, seq, sequel_number(movie.name))
+
+    def _remove(self, uid: str) -> None:
+        entry = self._entries.pop(uid, None)
+        if entry is None:
+            return
+        buckets = [(self._by_tmdb, entry.tmdb_id), (self._by_file, entry.file_key), (self._by_title, entry.compact)]
+        buckets.extend((self._by_gram, gram) for gram in entry.grams)
+        for index, key in buckets:
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.discard(uid)
+                if not bucket:
+                    del index[key]
+
+    def _matches(self, entry: _Entry) -> List[DuplicateMatch]:
+        found: Dict[str, DuplicateMatch] = {}
+        if entry.tmdb_id is not None:
+            for uid in self._by_tmdb.get(entry.tmdb_id, ()):
+                found[uid] = DuplicateMatch(uid, "tmdb_id", 1.0)
+        if entry.file_key:
+            for uid in self._by_file.get(entry.file_key, ()):
+                found.setdefault(uid, DuplicateMatch(uid, "file", 1.0))
+        if not entry.compact:
+            return list(found.values())
+
+        for uid in self._by_title.get(entry.compact, ()):
+            if uid not in found and self._compatible(entry, self._entries[uid]):
+                found[uid] = DuplicateMatch(uid, "title", 1.0)
+        for gram in self._prefix(entry.grams):
+            for uid in self._by_gram.get(gram, ()):
+                if uid in found:
+                    continue
+                match = self._compare(entry, self._entries[uid])
+                if match is not None:
+                    found[uid] = match
+        return list(found.values())
+
+    def _prefix(self, grams: frozenset, sizes: Dict[str, int] | None = None) -> List[str]:
+        if sizes is None:
+            sizes = {gram: len(self._by_gram.get(gram, ())) for gram in grams}
+        jaccard = self.fuzzy_threshold / (2 - self.fuzzy_threshold)
+        keep = len(grams) - math.ceil(jaccard * len(grams)) + 1
+        ordered = sorted(grams, key=lambda gram: (sizes.get(gram, 0), gram))[:keep]
+        return [gram for gram in ordered if sizes.get(gram, 0) <= self.max_bucket]
+
+    def _compare(self, entry: _Entry, other: _Entry) -> DuplicateMatch | None:
+        if not self._compatible(entry, other):
+            return None
+        if entry.compact == other.compact:
+            return DuplicateMatch(other.uid, "title", 1.0)
+        # "Saw II" and "Saw III" are near-identical strings but different
+        # films; a fuzzy match needs the same trailing sequel number.
+        if entry.sequel != other.sequel:
+            return None
+        score = dice(entry.grams, other.grams)
+        if score >= self.fuzzy_threshold:
+            return DuplicateMatch(other.uid, "fuzzy", score)
+        return None
+
+    def _compatible(self, a: _Entry, b: _Entry) -> bool:
+        if a.tmdb_id is not None and b.tmdb_id is not None and a.tmdb_id != b.tmdb_id:
+            return False
+        if a.year is not None and b.year is not None and abs(a.year - b.year) > self.year_tolerance:
+            return False
+        return True
+
+
+def _completeness(movie: Movie) -> Tuple:
+    filled = sum(1 for value in (movie.year, movie.genre, movie.poster_path, movie.file_path) if value)
+    return (movie.tmdb_id is not None, filled, movie.rating > 0)
+
+
+def merge_members(members: List[Movie], reasons: Iterable[str] = ()) -> MergeGroup:
+    keeper = max(members, key=_completeness)
+    merged = replace(keeper)
+    for movie in members:
+        if movie is keeper:
+            continue
+        merged.watched = merged.watched or movie.watched
+        merged.favorite = merged.favorite or movie.favorite
+        merged.watchlist = merged.watchlist or movie.watchlist
+        if not merged.rating and movie.rating:
+            merged.rating = movie.rating
+        for name in ("year", "genre", "poster_path", "file_path"):
+            if not getattr(merged, name) and getattr(movie, name):
+                setattr(merged, name, getattr(movie, name))
+        if merged.tmdb_id is None and movie.tmdb_id is not None:
+            merged.tmdb_id = movie.tmdb_id
+    return MergeGroup(merged, list(members), set(reasons))
+
+
+def find_merge_groups(movies: Iterable[Movie], index: DuplicateIndex | None = None) -> List[MergeGroup]:
+    movies = list(movies)
+    if index is None:
+        index = DuplicateIndex(movies)
+    by_uid = {movie.uid: movie for movie in movies}
+    return [
+        merge_members([by_uid[uid] for uid in uids if uid in by_uid], reasons)
+        for uids, reasons in index.groups()
+        if sum(1 for uid in uids if uid in by_uid) > 1
+    ]
+
+
+def apply_merge_groups(movies: Iterable[Movie], groups: Iterable[MergeGroup]) -> Tuple[List[Movie], Set[str], Set[str]]:
+    movies = list(movies)
+    present = {movie.uid for movie in movies}
+    merged: Dict[str, Movie] = {}
+    removed: Set[str] = set()
+    for group in groups:
+        # A group whose members changed since it was planned is skipped rather
+        # than risk dropping a movie without its replacement.
+        if any(member.uid not in present for member in group.members):
+            continue
+        merged[group.merged.uid] = group.merged
+        removed.update(group.removed)
+    result = []
+    for movie in movies:
+        if movie.uid in removed:
+            continue
+        result.append(merged.get(movie.uid, movie))
+    return result, set(merged), removed
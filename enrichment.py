@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Tuple
+
+from models import Movie
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def movie_updates_from_result(
+    result: Dict[str, Any], fallback_title: str = "", genre_names: Mapping[int, str] | None = None
+) -> Dict[str, Any]:
+    try:
+        rating = float(result.get("vote_average", 0.0) or 0.0)
+    except (TypeError, ValueError):
+        rating = 0.0
+    genres = []
+    for genre_id in (result.get("genre_ids") or [])[:3]:
+        name = genre_names.get(genre_id) if genre_names is not None and isinstance(genre_id, int) else None
+        genres.append(name or str(genre_id))
+    return {
+        "name": str(result.get("title") or fallback_title),
+        "year": str(result.get("release_date", ""))[:4],
+        "genre": ", ".join(genres),
+        "rating": max(0.0, min(10.0, rating)),
+        "poster_path": result.get("poster_path") or "",
+        "tmdb_id": result.get("id"),
+    }
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        capacity: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop: threading.Event | None = None) -> bool:
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                delay = (1 - self._tokens) / self.rate
+            if stop is not None:
+                if stop.wait(delay):
+                    return False
+            else:
+                self._sleep(delay)
+
+
+@dataclass
+class EnrichmentReport:
+    total: int = 0
+    done: int = 0
+    updated: int = 0
+    not_found: int = 0
+    failed: int = 0
+    errors: List[Tuple[str, str]] = field(default_factory=list)
+
+
+class BulkEnricher:
+    def __init__(
+        self,
+        tmdb,
+        workers: int = 4,
+        requests_per_second: float = 20.0,
+        retries: int = 4,
+        backoff: float = 0.5,
+        batch_size: int = 50,
+        genre_names: Mapping[int, str] | None = None,
+    ) -> None:
+        self.tmdb = tmdb
+        self.genre_names = genre_names
+        self.workers = workers
+        self.bucket = TokenBucket(requests_per_second)
+        self.retries = retries
+        self.backoff = backoff
+        self.batch_size = batch_size
+        self.stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def run(
+        self,
+        movies: Iterable[Movie],
+        on_batch: Callable[[List[Tuple[Movie, Dict[str, Any]]]], None],
+        on_progress: Callable[[EnrichmentReport], None] | None = None,
+    ) -> EnrichmentReport:
+        pending = [movie for movie in movies if movie.tmdb_id is None]
+        report = EnrichmentReport(total=len(pending))
+        batch: List[Tuple[Movie, Dict[str, Any]]] = []
+        in_flight: Dict[Future, Movie] = {}
+        queue = iter(pending)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="enrich") as pool:
+            while not self.stop_event.is_set():
+                while len(in_flight) < self.workers * 2:
+                    movie = next(queue, None)
+                    if movie is None:
+                        break
+                    in_flight[pool.submit(self._enrich_one, movie)] = movie
+                if not in_flight:
+                    break
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    movie = in_flight.pop(future)
+                    report.done += 1
+                    try:
+                        updates = future.result()
+                    except Exception as exc:
+                        report.failed += 1
+                        report.errors.append((movie.name, str(exc)))
+                        continue
+                    if updates is None:
+                        report.not_found += 1
+                        continue
+                    report.updated += 1
+                    batch.append((movie, updates))
+
+                if len(batch) >= self.batch_size:
+                    on_batch(batch)
+                    batch = []
+                if on_progress is not None:
+                    on_progress(report)
+
+            for future in in_flight:
+                future.cancel()
+
+        if batch:
+            on_batch(batch)
+        if on_progress is not None:
+            on_progress(report)
+        return report
+
+    def _enrich_one(self, movie: Movie) -> Dict[str, Any] | None:
+        data = self._call(self.tmdb.search_movie, movie.name, movie.year)
+        results = data.get("results") or []
+        if not results:
+            return None
+        updates = movie_updates_from_result(results[0], movie.name, self.genre_names)
+        if updates["tmdb_id"] is not None:
+            self._call(self.tmdb.get_credits, int(updates["tmdb_id"]))
+        return updates
+
+    def _call(self, func: Callable[..., Any], *args: Any) -> Any:
+        attempt = 0
+        while True:
+            if not self.bucket.acquire(self.stop_event):
+                raise RuntimeError("Enrichment cancelled")
+            try:
+                return func(*args)
+            except Exception as exc:
+                response = getattr(exc, "response", None)
+                status = getattr(response, "status_code", None)
+                retryable = status in RETRYABLE_STATUS or (status is None and isinstance(exc, OSError))
+                if not retryable or attempt >= self.retries:
+                    raise
+                delay = self.backoff * (2 ** attempt) * (1 + random.random())
+                retry_after = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+                if retry_after:
+                    try:
+                        delay = max(delay, float(retry_after))
+                    except ValueError:
+                        pass
+                attempt += 1
+                if self.stop_event.wait(delay):
+                    raise RuntimeError("Enrichment cancelled") from exc
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, Iterable, List, Mapping, Set, Tuple
+
+from genre_catalog import split_genres
+from models import Movie
+
+FACETS = ("genre", "decade", "rating", "status")
+UNKNOWN = "Unknown"
+RATING_BUCKETS = ((9.0, "9+"), (8.0, "8-9"), (7.0, "7-8"), (6.0, "6-7"), (5.0, "5-6"), (0.1, "Under 5"))
+UNRATED = "Unrated"
+
+
+def decade_of(year: str) -> str:
+    digits = year[:4]
+    if len(digits) == 4 and digits.isdigit():
+        return f"{int(digits) // 10 * 10}s"
+    return UNKNOWN
+
+
+def rating_bucket(rating: float) -> str:
+    for floor, label in RATING_BUCKETS:
+        if rating >= floor:
+            return label
+    return UNRATED
+
+
+def facet_values(movie: Movie, normalize_genre: Callable[[str], str] | None = None) -> List[Tuple[str, str]]:
+    genre = normalize_genre(movie.genre) if normalize_genre is not None else movie.genre
+    values = [("genre", name) for name in split_genres(genre)] or [("genre", UNKNOWN)]
+    values.append(("decade", decade_of(movie.year)))
+    values.append(("rating", rating_bucket(movie.rating)))
+    values.append(("status", "Watched" if movie.watched else "Unwatched"))
+    if movie.favorite:
+        values.append(("status", "Favorites"))
+    if movie.watchlist:
+        values.append(("status", "Watchlist"))
+    return values
+
+
+def _mask(slots: Iterable[int], size: int) -> int:
+    bitmap = bytearray((size >> 3) + 1)
+    for slot in slots:
+        bitmap[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(bitmap, "little")
+
+
+class FacetIndex:
+    def __init__(self, movies: Iterable[Movie] = (), normalize_genre: Callable[[str], str] | None = None) -> None:
+        self.normalize_genre = normalize_genre
+        self.version = 0
+        self.alive = 0
+        self._slots: Dict[str, int] = {}
+        self._uids: List[str | None] = []
+        self._free: List[int] = []
+        self._values: Dict[int, List[Tuple[str, str]]] = {}
+        self._bits: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        self._counts: Dict[str, Dict[str, int]] = {facet: {} for facet in FACETS}
+        self._lock = threading.RLock()
+        self.extend(movies)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add(self, movie: Movie) -> None:
+        values = facet_values(movie, self.normalize_genre)
+        with self._lock:
+            slot = self._slots.get(movie.uid)
+            if slot is None:
+                slot = self._free.pop() if self._free else len(self._uids)
+                if slot == len(self._uids):
+                    self._uids.append(movie.uid)
+                else:
+                    self._uids[slot] = movie.uid
+                self._slots[movie.uid] = slot
+                self.alive |= 1 << slot
+            elif self._values.get(slot) == values:
+                return
+            else:
+                self._unset(slot)
+            bit = 1 << slot
+            for facet, value in values:
+                bits = self._bits[facet]
+                bits[value] = bits.get(value, 0) | bit
+                counts = self._counts[facet]
+                counts[value] = counts.get(value, 0) + 1
+            self._values[slot] = values
+            self.version += 1
+
+    def remove(self, uid: str) -> None:
+        with self._lock:
+            slot = self._slots.pop(uid, None)
+            if slot is None:
+                return
+            self._unset(slot)
+            self._uids[slot] = None
+            self._free.append(slot)
+            self.alive &= ~(1 << slot)
+            self.version += 1
+
+    def extend(self, movies: Iterable[Movie]) -> None:
+        prepared = [(movie.uid, facet_values(movie, self.normalize_genre)) for movie in movies]
+        with self._lock:
+            self._update(prepared, insert=True)
+
+    def rebuild(self, movies: Iterable[Movie]) -> None:
+        # Recomputes values (e.g. after the genre catalog changed) for movies
+        # still in the index; ones removed meanwhile are not brought back.
+        prepared = [(movie.uid, facet_values(movie, self.normalize_genre)) for movie in movies]
+        with self._lock:
+            self._update(prepared, insert=False)
+
+    def _update(self, prepared: List[Tuple[str, List[Tuple[str, str]]]], insert: bool) -> None:
+        # Setting bits one at a time copies the whole int per movie, which is
+        # quadratic; positions are gathered first and each int is built once.
+        added: Dict[Tuple[str, str], List[int]] = {}
+        dropped: Dict[Tuple[str, str], List[int]] = {}
+        created: List[int] = []
+        for uid, values in prepared:
+            slot = self._slots.get(uid)
+            if slot is None:
+                if not insert:
+                    continue
+                slot = self._free.pop() if self._free else len(self._uids)
+                if slot == len(self._uids):
+                    self._uids.append(uid)
+                else:
+                    self._uids[slot] = uid
+                self._slots[uid] = slot
+                created.append(slot)
+            else:
+                previous = self._values.get(slot)
+                if previous == values:
+                    continue
+                for key in previous or ():
+                    dropped.setdefault(key, []).append(slot)
+            for key in values:
+                added.setdefault(key, []).append(slot)
+            self._values[slot] = values
+        if not (added or dropped or created):
+            return
+
+        size = len(self._uids)
+        for (facet, value), slots in dropped.items():
+            bits, counts = self._bits[facet], self._counts[facet]
+            remaining = bits.get(value, 0) & ~_mask(slots, size)
+            if remaining:
+                bits[value] = remaining
+            else:
+                bits.pop(value, None)
+            counts[value] = counts.get(value, 0) - len(slots)
+            if counts[value] <= 0:
+                del counts[value]
+        for (facet, value), slots in added.items():
+            bits, counts = self._bits[facet], self._counts[facet]
+            bits[value] = bits.get(value, 0) | _mask(slots, size)
+            counts[value] = counts.get(value, 0) + len(slots)
+        if created:
+            self.alive |= _mask(created, size)
+        self.version += 1
+
+    def counts(self, facet: str, within: int | None = None) -> Dict[str, int]:
+        with self._lock:
+            if within is None:
+                return dict(self._counts[facet])
+            result = {}
+            for value, bits in self._bits[facet].items():
+                count = (bits & within).bit_count()
+                if count:
+                    result[value] = count
+            return result
+
+    def select(self, selection: Mapping[str, Iterable[str]]) -> int | None:
+        mask = None
+        with self._lock:
+            for facet, values in selection.items():
+                values = list(values)
+                if not values:
+                    continue
+                bits = self._bits.get(facet, {})
+                union = 0
+                for value in values:
+                    union |= bits.get(value, 0)
+                mask = union if mask is None else mask & union
+                if not mask:
+                    return 0
+        return mask
+
+    def uids(self, mask: int) -> Set[str]:
+        with self._lock:
+            uids = self._uids
+            result: Set[str] = set()
+            bits = bin(mask & self.alive)[:1:-1]
+            position = bits.find("1")
+            while position != -1:
+                uid = uids[position]
+                if uid is not None:
+                    result.add(uid)
+                position = bits.find("1", position + 1)
+            return result
+
+    def _unset(self, slot: int) -> None:
+        clear = ~(1 << slot)
+        for facet, value in self._values.pop(slot, ()):
+            bits = self._bits[facet]
+            remaining = bits.get(value, 0) & clear
+            counts = self._counts[facet]
+            counts[value] = counts.get(value, 1) - 1
+            if remaining:
+                bits[value] = remaining
+            else:
+                bits.pop(value, None)
+            if counts[value] <= 0:
+                del counts[value]
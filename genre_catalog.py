@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+GENRE_TTL = 30 * 24 * 60 * 60
+
+
+def split_genres(text: str) -> List[str]:
+    return [part.strip() for part in text.split(",") if part.strip()]
+
+
+class GenreCatalog:
+    def __init__(self, cache_file: str = "genres.json") -> None:
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._names: Dict[int, str] = {}
+        self._fetched_at = 0.0
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, genre_id: object) -> bool:
+        return genre_id in self._names
+
+    def get(self, genre_id: int, default: str | None = None) -> str | None:
+        return self._names.get(genre_id, default)
+
+    @property
+    def is_stale(self) -> bool:
+        return not self._names or time.time() - self._fetched_at > GENRE_TTL
+
+    def normalize(self, genre: str) -> str:
+        names: List[str] = []
+        for part in split_genres(genre):
+            name = self._names.get(int(part), part) if part.isdigit() else part
+            if name not in names:
+                names.append(name)
+        return ", ".join(names)
+
+    def needs_normalizing(self, genre: str) -> bool:
+        return any(part.isdigit() and int(part) in self._names for part in split_genres(genre))
+
+    def refresh(self, tmdb) -> bool:
+        payload = tmdb.get_genres()
+        genres = payload.get("genres") if isinstance(payload, dict) else None
+        if not isinstance(genres, list):
+            return False
+        names: Dict[int, str] = {}
+        for item in genres:
+            try:
+                names[int(item["id"])] = str(item["name"])
+            except (KeyError, TypeError, ValueError):
+                continue
+        if not names:
+            return False
+        with self._lock:
+            changed = names != self._names
+            self._names = names
+            self._fetched_at = time.time()
+            self._save()
+        return changed
+
+    def _load(self) -> None:
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except (OSError, json.JSONDecodeError):
+            return
+        if not isinstance(payload, dict):
+            return
+        names: Dict[int, str] = {}
+        for genre_id, name in (payload.get("genres") or {}).items():
+            try:
+                names[int(genre_id)] = str(name)
+            except (TypeError, ValueError):
+                continue
+        self._names = names
+        try:
+            self._fetched_at = float(payload.get("fetched_at", 0))
+        except (TypeError, ValueError):
+            self._fetched_at = 0.0
+
+    def _save(self) -> None:
+        payload = {"fetched_at": self._fetched_at, "genres": {str(k): v for k, v in sorted(self._names.items())}}
+        directory = os.path.dirname(self.cache_file) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as temp:
+                json.dump(payload, temp, indent=2)
+            os.replace(temp_path, self.cache_file)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
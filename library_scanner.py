@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+from models import Movie
+
+VIDEO_EXTENSIONS = {
+    ".avi", ".flv", ".m2ts", ".m4v", ".mkv", ".mov", ".mp4", ".mpeg", ".mpg", ".ts", ".webm", ".wmv",
+}
+
+_YEAR_RE = re.compile(r"[\(\[\s]((?:19|20)\d{2})(?=[\)\]\s]|$)")
+_TAG_RE = re.compile(
+    r"\b(?:2160p|1080p|720p|480p|4k|uhd|hdr|bluray|blu-ray|brrip|bdrip|webrip|web-dl|web|hdtv|dvdrip|"
+    r"x264|x265|h264|h265|hevc|aac|ac3|dts|remux|proper|repack|extended|unrated)\b",
+    re.IGNORECASE,
+)
+
+
+def parse_file_name(file_name: str) -> Tuple[str, str]:
+    stem = os.path.splitext(file_name)[0]
+    text = re.sub(r"[._]+", " ", stem).strip()
+    year = ""
+    match = None
+    for candidate in _YEAR_RE.finditer(f" {text} "):
+        if candidate.start(1) > 1:
+            match = candidate
+    if match is not None:
+        year = match.group(1)
+        text = f" {text} "[:match.start()]
+    else:
+        tag = _TAG_RE.search(text)
+        if tag is not None and tag.start() > 0:
+            text = text[:tag.start()]
+    title = re.sub(r"[\s\-\[\(]+$", "", " ".join(text.split())).strip()
+    return title or stem, year
+
+
+@dataclass
+class ScannedFile:
+    path: str
+    size: int
+    mtime_ns: int
+    title: str
+    year: str
+
+
+@dataclass
+class ScanResult:
+    files_seen: int = 0
+    changed: List[ScannedFile] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+
+class LibraryScanner:
+    def __init__(self, index_file: str = "scan_index.json", workers: int = 8) -> None:
+        self.index_file = index_file
+        self.workers = workers
+        self._index: Dict[str, Tuple[int, int]] = self._load_index()
+        self._lock = threading.Lock()
+
+    def scan(
+        self,
+        roots: Iterable[str],
+        on_progress: Callable[[int], None] | None = None,
+        stop: threading.Event | None = None,
+    ) -> ScanResult:
+        result = ScanResult()
+        seen: Set[str] = set()
+        roots = [os.path.abspath(root) for root in roots if os.path.isdir(root)]
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="library-scan") as pool:
+            pending: Dict[Future, str] = {pool.submit(self._scan_dir, root): root for root in roots}
+            while pending:
+                if stop is not None and stop.is_set():
+                    for future in pending:
+                        future.cancel()
+                    return result
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    directory = pending.pop(future)
+                    try:
+                        subdirs, files = future.result()
+                    except OSError as exc:
+                        result.errors.append(f"{directory}: {exc}")
+                        continue
+                    for subdir in subdirs:
+                        pending[pool.submit(self._scan_dir, subdir)] = subdir
+                    for path, size, mtime_ns in files:
+                        seen.add(path)
+                        result.files_seen += 1
+                        if self._index.get(path) != (size, mtime_ns):
+                            title, year = parse_file_name(os.path.basename(path))
+                            result.changed.append(ScannedFile(path, size, mtime_ns, title, year))
+                if on_progress is not None:
+                    on_progress(result.files_seen)
+
+        prefixes = tuple(os.path.join(root, "") for root in roots)
+        with self._lock:
+            result.removed = [path for path in self._index if path.startswith(prefixes) and path not in seen]
+        return result
+
+    def commit(self, result: ScanResult) -> None:
+        # Called once the scanned files are safely in the saved library; an
+        # index written earlier would hide them from the next scan if that
+        # save never happened.
+        with self._lock:
+            for path in result.removed:
+                self._index.pop(path, None)
+            for scanned in result.changed:
+                self._index[scanned.path] = (scanned.size, scanned.mtime_ns)
+        self._save_index()
+
+    def forget(self, paths: Iterable[str]) -> None:
+        with self._lock:
+            for path in paths:
+                self._index.pop(path, None)
+        self._save_index()
+
+    @staticmethod
+    def _scan_dir(directory: str) -> Tuple[List[str], List[Tuple[str, int, int]]]:
+        subdirs: List[str] = []
+        files: List[Tuple[str, int, int]] = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith("."):
+                            subdirs.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS and entry.is_file():
+                        stat = entry.stat()
+                        files.append((entry.path, stat.st_size, stat.st_mtime_ns))
+                except OSError:
+                    continue
+        return subdirs, files
+
+    def _load_index(self) -> Dict[str, Tuple[int, int]]:
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if not isinstance(payload, dict):
+            return {}
+        index: Dict[str, Tuple[int, int]] = {}
+        for path, value in payload.items():
+            try:
+                index[path] = (int(value[0]), int(value[1]))
+            except (TypeError, ValueError, IndexError):
+                continue
+        return index
+
+    def _save_index(self) -> None:
+        with self._lock:
+            payload = {path: [size, mtime] for path, (size, mtime) in self._index.items()}
+        directory = os.path.dirname(self.index_file) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as temp:
+                json.dump(payload, temp)
+            os.replace(temp_path, self.index_file)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+def merge_scanned(movies: List[Movie], scanned: Iterable[ScannedFile]) -> Tuple[List[Movie], List[Movie]]:
+    by_path = {os.path.normcase(m.file_path): m for m in movies if m.file_path}
+    by_title: Dict[Tuple[str, str], Movie] = {}
+    for movie in movies:
+        by_title.setdefault((movie.name.strip().lower(), movie.year), movie)
+
+    added: List[Movie] = []
+    updated: List[Movie] = []
+    for item in scanned:
+        path_key = os.path.normcase(item.path)
+        if path_key in by_path:
+            continue
+        title_key = (item.title.lower(), item.year)
+        existing = by_title.get(title_key)
+        if existing is None and item.year:
+            existing = by_title.get((item.title.lower(), ""))
+        if existing is not None and not existing.file_path:
+            existing.file_path = item.path
+            if not existing.year:
+                existing.year = item.year
+            updated.append(existing)
+            by_path[path_key] = existing
+            continue
+        if existing is not None:
+            continue
+        movie = Movie(name=item.title, year=item.year, file_path=item.path)
+        added.append(movie)
+        by_path[path_key] = movie
+        by_title[title_key] = movie
+    return added, updated
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field, fields
+from typing import Callable, Iterable, List, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+try:
+    from watchdog.observers import Observer
+except Exception:
+    Observer = None
+
+from models import Movie
+
+_MOVIE_FIELDS = tuple(item.name for item in fields(Movie))
+
+
+def file_signature(paths: Iterable[str]) -> Tuple:
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            signature.append((path, None))
+            continue
+        signature.append((path, stat.st_mtime_ns, stat.st_size, stat.st_ino))
+    return tuple(signature)
+
+
+class FileLock:
+    def __init__(self, path: str, timeout: float = 10.0) -> None:
+        self.path = path
+        self.timeout = timeout
+        self._guard = threading.RLock()
+        self._depth = 0
+        self._handle = None
+
+    def __enter__(self) -> "FileLock":
+        self._guard.acquire()
+        if self._depth == 0:
+            try:
+                self._handle = self._acquire()
+            except BaseException:
+                self._guard.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            handle, self._handle = self._handle, None
+            self._release(handle)
+        self._guard.release()
+
+    def _acquire(self):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        handle = open(self.path, "a+b")
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                elif msvcrt is not None:
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+                return handle
+            except OSError:
+                if time.monotonic() >= deadline:
+                    handle.close()
+                    raise TimeoutError(f"Could not lock {self.path}")
+                time.sleep(0.05)
+
+    def _release(self, handle) -> None:
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+        finally:
+            handle.close()
+
+
+class _WakeHandler:
+    def __init__(self, names: set[str], wake: threading.Event) -> None:
+        self._names = names
+        self._wake = wake
+
+    def dispatch(self, event) -> None:
+        paths = (getattr(event, "src_path", ""), getattr(event, "dest_path", ""))
+        if any(os.path.basename(str(path)) in self._names for path in paths if path):
+            self._wake.set()
+
+
+class FileWatcher:
+    def __init__(
+        self,
+        paths: Sequence[str],
+        on_change: Callable[[], None],
+        interval: float = 1.0,
+        settle: float = 0.3,
+    ) -> None:
+        self.paths = list(paths)
+        self.on_change = on_change
+        self.interval = interval
+        self.settle = settle
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._observer = None
+        self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+
+    @property
+    def native(self) -> bool:
+        return self._observer is not None
+
+    def start(self) -> "FileWatcher":
+        if Observer is not None:
+            try:
+                observer = Observer()
+                handler = _WakeHandler({os.path.basename(path) for path in self.paths}, self._wake)
+                for directory in {os.path.dirname(os.path.abspath(path)) for path in self.paths}:
+                    observer.schedule(handler, directory, recursive=False)
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+            except Exception:
+                self._observer = None
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            try:
+                self._observer.stop()
+            except Exception:
+                pass
+
+    def _run(self) -> None:
+        # The native observer only wakes the loop early; polling still runs
+        # (slowly) so a missed or unsupported event cannot stall the watcher.
+        last = file_signature(self.paths)
+        while not self._stop.is_set():
+            self._wake.wait(self.interval * 10 if self.native else self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            current = file_signature(self.paths)
+            if current == last:
+                continue
+            while not self._stop.wait(self.settle):
+                settled = file_signature(self.paths)
+                if settled == current:
+                    break
+                current = settled
+            last = current
+            try:
+                self.on_change()
+            except Exception:
+                continue
+
+
+@dataclass
+class MovieDiff:
+    added: List[Movie] = field(default_factory=list)
+    changed: List[Movie] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+def diff_movies(current: Iterable[Movie], incoming: Iterable[Movie]) -> MovieDiff:
+    known = {movie.uid: movie.to_dict() for movie in current}
+    diff = MovieDiff()
+    for movie in incoming:
+        record = known.pop(movie.uid, None)
+        if record is None:
+            diff.added.append(movie)
+        elif record != movie.to_dict():
+            diff.changed.append(movie)
+    diff.removed = list(known)
+    return diff
+
+
+def merge_external(local: Sequence[Movie], diff: MovieDiff, keep: Callable[[str], bool]) -> MovieDiff:
+    # Applies another writer's diff to the local movies: changes are copied
+    # into the local instances, except for uids where keep() says a local
+    # edit is still unsaved and has to win. Returns what was applied.
+    by_uid = {movie.uid: movie for movie in local}
+    applied = MovieDiff()
+    for movie in diff.changed:
+        target = by_uid.get(movie.uid)
+        if target is not None and not keep(movie.uid):
+            update_movie(target, movie)
+            applied.changed.append(target)
+    applied.added = [movie for movie in diff.added if movie.uid not in by_uid and not keep(movie.uid)]
+    applied.removed = [uid for uid in diff.removed if uid in by_uid and not keep(uid)]
+    return applied
+
+
+def update_movie(target: Movie, source: Movie) -> None:
+    for name in _MOVIE_FIELDS:
+        setattr(target, name, getattr(source, name))
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import functools
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Deque, Dict, List, TextIO, TypeVar
+
+ENABLED = os.environ.get("MOVIE_METRICS", "").strip().lower() not in ("", "0", "false", "no")
+SAMPLE_SIZE = 2048
+
+F = TypeVar("F", bound=Callable)
+
+
+class _Timing:
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: Deque[float] = deque(maxlen=SAMPLE_SIZE)
+
+
+class _Registry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._timings: Dict[str, _Timing] = {}
+        self._counters: Dict[str, int] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = _Timing()
+            timing.count += 1
+            timing.total += seconds
+            if seconds > timing.max:
+                timing.max = seconds
+            timing.samples.append(seconds)
+
+    def count(self, name: str, value: int) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def register_gauge(self, name: str, read: Callable[[], float]) -> None:
+        with self._lock:
+            self._gauges[name] = read
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            timings = {
+                name: (timing.count, timing.total, timing.max, sorted(timing.samples))
+                for name, timing in self._timings.items()
+            }
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+
+        result: Dict[str, dict] = {"timings": {}, "counters": counters, "gauges": {}}
+        for name, (count, total, longest, samples) in timings.items():
+            result["timings"][name] = {
+                "count": count,
+                "mean_ms": total / count * 1000 if count else 0.0,
+                "p50_ms": _percentile(samples, 0.50) * 1000,
+                "p95_ms": _percentile(samples, 0.95) * 1000,
+                "max_ms": longest * 1000,
+            }
+        for name, read in gauges.items():
+            try:
+                result["gauges"][name] = read()
+            except Exception:
+                continue
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, int(round(fraction * (len(samples) - 1))))
+    return samples[index]
+
+
+_registry = _Registry()
+
+
+class _Span:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        _registry.record(self.name, time.perf_counter() - self.started)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str):
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def timed(name: str) -> Callable[[F], F]:
+    def decorate(func: F) -> F:
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _registry.record(name, time.perf_counter() - started)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def record(name: str, seconds: float) -> None:
+    if ENABLED:
+        _registry.record(name, seconds)
+
+
+def count(name: str, value: int = 1) -> None:
+    if ENABLED:
+        _registry.count(name, value)
+
+
+def gauge(name: str, read: Callable[[], float]) -> None:
+    if ENABLED:
+        _registry.register_gauge(name, read)
+
+
+class _InFlight:
+    __slots__ = ("lock", "value")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.value = 0
+
+    def add(self, delta: int) -> None:
+        with self.lock:
+            self.value += delta
+
+
+def track_executor(name: str, executor: Executor) -> None:
+    # Wraps submit() with a counter of queued and running work items, so the
+    # gauge does not depend on the executor's private queue.
+    if not ENABLED:
+        return
+    in_flight = _InFlight()
+    submit = executor.submit
+
+    def tracked(fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        in_flight.add(1)
+        try:
+            future = submit(fn, *args, **kwargs)
+        except BaseException:
+            in_flight.add(-1)
+            raise
+        future.add_done_callback(lambda _future: in_flight.add(-1))
+        return future
+
+    executor.submit = tracked  # type: ignore[method-assign]
+    _registry.register_gauge(name, lambda: in_flight.value)
+
+
+def snapshot() -> Dict[str, dict]:
+    return _registry.snapshot()
+
+
+def reset() -> None:
+    _registry.reset()
+
+
+def format_report(data: Dict[str, dict] | None = None) -> str:
+    data = data if data is not None else snapshot()
+    lines = [f"{'span':36} {'count':>8} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+    for name in sorted(data["timings"]):
+        row = data["timings"][name]
+        lines.append(
+            f"{name:36} {row['count']:8d} {row['p50_ms']:9.2f} {row['p95_ms']:9.2f} {row['max_ms']:9.2f}"
+        )
+    if data["counters"]:
+        lines.append("")
+        lines.extend(f"{name:36} {value:8d}" for name, value in sorted(data["counters"].items()))
+    if data["gauges"]:
+        lines.append("")
+        lines.extend(f"{name:36} {value:8g}" for name, value in sorted(data["gauges"].items()))
+    return "\n".join(lines)
+
+
+class PeriodicReporter:
+    def __init__(self, interval: float, stream: TextIO | None = None) -> None:
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-reporter", daemon=True)
+
+    def start(self) -> "PeriodicReporter":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.stream.write(f"--- metrics {time.strftime('%H:%M:%S')} ---\n{format_report()}\n")
+                self.stream.flush()
+            except Exception:
+                continue
+
+
+def start_reporter_from_env() -> PeriodicReporter | None:
+    if not ENABLED:
+        return None
+    try:
+        interval = float(os.environ.get("MOVIE_METRICS_LOG_INTERVAL", "0"))
+    except ValueError:
+        return None
+    if interval <= 0:
+        return None
+    return PeriodicReporter(interval).start()
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
+import uuid
+from dataclasses import dataclass, field
 from typing import Any, Dict
 
 
-@dataclass
+@dataclass(slots=True)
 class Movie:
     name: str
     year: str = ""
@@ -16,9 +17,25 @@ class Movie:
     poster_path: str = ""
     file_path: str = ""
     tmdb_id: int | None = None
+    uid: str = field(default_factory=lambda: uuid.uuid4().hex)
 
     @classmethod
-    def from_dict(cls, payload: Dict[str, Any]) -> "Movie":
+    def from_dict(cls, payload: Dict[str, Any], trusted: bool = False) -> "Movie":
+        if trusted:
+            return cls(
+                payload["name"],
+                payload.get("year", ""),
+                payload.get("genre", ""),
+                payload.get("rating", 0.0),
+                payload.get("watched", False),
+                payload.get("favorite", False),
+                payload.get("watchlist", False),
+                payload.get("poster_path", ""),
+                payload.get("file_path", ""),
+                payload.get("tmdb_id"),
+                payload.get("uid") or uuid.uuid4().hex,
+            )
+
         name = str(payload.get("name", "")).strip()
         if not name:
             raise ValueError("Movie name is required")
@@ -49,7 +66,20 @@ class Movie:
             poster_path=str(payload.get("poster_path", "")).strip(),
             file_path=str(payload.get("file_path", "")).strip(),
             tmdb_id=tmdb_id,
+            uid=str(payload.get("uid") or "").strip() or uuid.uuid4().hex,
         )
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "name": self.name,
+            "year": self.year,
+            "genre": self.genre,
+            "rating": self.rating,
+            "watched": self.watched,
+            "favorite": self.favorite,
+            "watchlist": self.watchlist,
+            "poster_path": self.poster_path,
+            "file_path": self.file_path,
+            "tmdb_id": self.tmdb_id,
+            "uid": self.uid,
+        }
@@ -0,0 +1,452 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import heapq
+import json
+import os
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+from data_store import JournalMovieRepository, MovieRepository, iter_json_records
+from dedupe import normalize_title
+from models import Movie
+from search_index import FILTER_MODES
+
+CSV_FIELDS = (
+    "name", "year", "genre", "rating", "watched", "favorite", "watchlist", "poster_path", "file_path", "tmdb_id", "uid",
+)
+FLAG_FIELDS = ("watched", "favorite", "watchlist")
+MERGE_FIELDS = tuple(name for name in CSV_FIELDS if name != "uid")
+CHUNK_SIZE = 1000
+
+_TRUE = {"1", "true", "yes", "y", "x", "on"}
+
+
+def open_repository(args: argparse.Namespace) -> MovieRepository:
+    storage = args.storage or MovieRepository(args.data, args.settings).load_settings().get("storage", "journal")
+    if storage == "sqlite":
+        from sqlite_store import SQLiteMovieRepository
+
+        return SQLiteMovieRepository(args.db, args.settings, args.data)
+    if storage == "json":
+        return MovieRepository(args.data, args.settings)
+    return JournalMovieRepository(args.data, args.settings)
+
+
+def stream_library(repo: MovieRepository) -> Iterator[Movie]:
+    for chunk in repo.stream_movies(CHUNK_SIZE):
+        yield from chunk
+
+
+def detect_format(path: str, explicit: str | None) -> str:
+    if explicit:
+        return explicit
+    return "csv" if path.lower().endswith(".csv") else "json"
+
+
+def _open_input(path: str) -> TextIO:
+    if path == "-":
+        return sys.stdin
+    return open(path, "r", encoding="utf-8-sig", newline="")
+
+
+def _open_output(path: str) -> TextIO:
+    if path == "-":
+        return sys.stdout
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def read_records(path: str, fmt: str) -> Iterator[Tuple[Movie, dict]]:
+    handle = _open_input(path)
+    try:
+        if fmt == "csv":
+            records: Iterable[dict] = (_csv_record(row) for row in csv.DictReader(handle))
+        else:
+            records = iter_json_records(handle)
+        for record in records:
+            try:
+                yield Movie.from_dict(record), record
+            except ValueError:
+                continue
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def read_movies(path: str, fmt: str) -> Iterator[Movie]:
+    for movie, _record in read_records(path, fmt):
+        yield movie
+
+
+def supplied_fields(record: dict) -> List[str]:
+    return [name for name in MERGE_FIELDS if record.get(name) not in (None, "")]
+
+
+def _csv_record(row: Dict[str, str]) -> dict:
+    # Blank cells and missing columns are left out so a merge can tell
+    # "not in this file" apart from an explicit value.
+    record: dict = {}
+    for key, value in row.items():
+        if key and isinstance(value, str) and value.strip():
+            record[key.strip().lower()] = value.strip()
+    for name in FLAG_FIELDS:
+        if name in record:
+            record[name] = record[name].lower() in _TRUE
+    return record
+
+
+def write_movies(movies: Iterable[Movie], path: str, fmt: str) -> int:
+    handle = _open_output(path)
+    count = 0
+    try:
+        if fmt == "csv":
+            writer = csv.DictWriter(handle, fieldnames=CSV_FIELDS)
+            writer.writeheader()
+            for movie in movies:
+                record = movie.to_dict()
+                record["tmdb_id"] = "" if movie.tmdb_id is None else movie.tmdb_id
+                writer.writerow({name: record.get(name, "") for name in CSV_FIELDS})
+                count += 1
+        else:
+            handle.write("[")
+            for movie in movies:
+                handle.write(",\n  " if count else "\n  ")
+                handle.write(json.dumps(movie.to_dict(), ensure_ascii=False))
+                count += 1
+            handle.write("\n]\n" if count else "]\n")
+    finally:
+        if handle is sys.stdout:
+            handle.flush()
+        else:
+            handle.close()
+    return count
+
+
+def selector(args: argparse.Namespace) -> Callable[[Movie], bool]:
+    search = (getattr(args, "search", "") or "").strip().lower()
+    predicate = FILTER_MODES.get(getattr(args, "filter", "All") or "All")
+
+    def matches(movie: Movie) -> bool:
+        if search and search not in movie.name.lower():
+            return False
+        return predicate is None or predicate(movie)
+
+    return matches
+
+
+def _sort_spec(sort: str):
+    if sort == "Year":
+        return (lambda m: m.year or "0"), True
+    if sort == "Rating":
+        return (lambda m: m.rating), True
+    return (lambda m: m.name.lower()), False
+
+
+def identity_keys(movie: Movie) -> List[tuple]:
+    # Rows exported without a uid (or from another library) get a fresh one
+    # on read, so they are matched on what identifies the film instead.
+    keys: List[tuple] = []
+    if movie.file_path:
+        keys.append(("file", os.path.normcase(os.path.normpath(movie.file_path))))
+    if movie.tmdb_id is not None:
+        keys.append(("tmdb", movie.tmdb_id))
+    title = normalize_title(movie.name)
+    if title:
+        keys.append(("title", title, movie.year.strip()[:4]))
+    return keys
+
+
+def _report(payload: dict) -> None:
+    print(json.dumps(payload))
+
+
+def cmd_search(args: argparse.Namespace) -> int:
+    repo = open_repository(args)
+    try:
+        matches = filter(selector(args), stream_library(repo))
+        key, reverse = _sort_spec(args.sort)
+        if args.limit:
+            pick = heapq.nlargest if reverse else heapq.nsmallest
+            results = pick(args.limit, matches, key=key)
+        else:
+            results = sorted(matches, key=key, reverse=reverse)
+    finally:
+        repo.close()
+
+    if args.format == "table":
+        for movie in results:
+            flags = "".join(code for code, on in (("W", movie.watched), ("F", movie.favorite), ("L", movie.watchlist)) if on)
+            year = f" ({movie.year})" if movie.year else ""
+            print(f"{movie.rating:4.1f}  {flags:3}  {movie.name}{year}")
+    else:
+        write_movies(results, "-", args.format)
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    repo = open_repository(args)
+    try:
+        count = write_movies(filter(selector(args), stream_library(repo)), args.file, detect_format(args.file, args.format))
+    finally:
+        repo.close()
+    _report({"exported": count})
+    return 0
+
+
+def cmd_import(args: argparse.Namespace) -> int:
+    fmt = detect_format(args.file, args.format)
+    if args.file == "-" and not args.replace:
+        print("Merging from stdin is not supported; pass --replace or a file path", file=sys.stderr)
+        return 2
+    repo = open_repository(args)
+    try:
+        if args.replace:
+            count = repo.save_stream(read_movies(args.file, fmt))
+            _report({"imported": count, "replaced": True})
+            return 0
+
+        existing: set[str] = set()
+        identities: Dict[tuple, str] = {}
+        for movie in stream_library(repo):
+            existing.add(movie.uid)
+            for key in identity_keys(movie):
+                identities.setdefault(key, movie.uid)
+
+        def resolve(movie: Movie) -> str | None:
+            if movie.uid in existing:
+                return movie.uid
+            return next((identities[key] for key in identity_keys(movie) if key in identities), None)
+
+        updates: Dict[str, Tuple[Movie, List[str]]] = {}
+        for movie, record in read_records(args.file, fmt):
+            target = resolve(movie)
+            if target is not None:
+                updates.setdefault(target, (movie, supplied_fields(record)))
+        stats = {"added": 0, "updated": len(updates)}
+
+        def merged() -> Iterator[Movie]:
+            for movie in stream_library(repo):
+                update = updates.get(movie.uid)
+                if update is not None:
+                    # Sparse rows (a CSV without flag, poster or TMDB columns)
+                    # only overwrite the fields they actually carry.
+                    source, fields = update
+                    for name in fields:
+                        value = getattr(source, name)
+                        if value is not None:
+                            setattr(movie, name, value)
+                yield movie
+            for movie in read_movies(args.file, fmt):
+                if resolve(movie) is not None:
+                    continue
+                existing.add(movie.uid)
+                for key in identity_keys(movie):
+                    identities.setdefault(key, movie.uid)
+                stats["added"] += 1
+                yield movie
+
+        total = repo.save_stream(merged())
+    finally:
+        repo.close()
+    _report({**stats, "total": total})
+    return 0
+
+
+def cmd_dedupe(args: argparse.Namespace) -> int:
+    from dedupe import DuplicateIndex, merge_members
+
+    repo = open_repository(args)
+    try:
+        index = DuplicateIndex(fuzzy_threshold=args.threshold, year_tolerance=args.year_tolerance)
+        for movie in stream_library(repo):
+            index.add(movie)
+        planned = index.groups()
+        wanted = {uid for uids, _reasons in planned for uid in uids}
+        members = {movie.uid: movie for movie in stream_library(repo) if movie.uid in wanted}
+        groups = [
+            merge_members([members[uid] for uid in uids if uid in members], reasons)
+            for uids, reasons in planned
+        ]
+        groups = [group for group in groups if len(group.members) > 1]
+        merged = {group.merged.uid: group.merged for group in groups}
+        removed = {uid for group in groups for uid in group.removed}
+
+        def unique() -> Iterator[Movie]:
+            for movie in stream_library(repo):
+                if movie.uid not in removed:
+                    yield merged.get(movie.uid, movie)
+
+        if args.dry_run:
+            total = sum(1 for _movie in unique())
+        else:
+            total = repo.save_stream(unique())
+    finally:
+        repo.close()
+    for group in groups:
+        names = " = ".join(f"{m.name} ({m.year})" if m.year else m.name for m in group.members)
+        print(f"{'/'.join(sorted(group.reasons))}: {names}", file=sys.stderr)
+    _report({"groups": len(groups), "removed": len(removed), "total": total, "dry_run": args.dry_run})
+    return 0
+
+
+def cmd_set(args: argparse.Namespace) -> int:
+    changes = {name: getattr(args, name) == "yes" for name in FLAG_FIELDS if getattr(args, name) is not None}
+    if args.rating is not None:
+        changes["rating"] = max(0.0, min(10.0, args.rating))
+    if not changes:
+        print("Nothing to change; pass --watched/--favorite/--watchlist/--rating", file=sys.stderr)
+        return 2
+
+    repo = open_repository(args)
+    matches = selector(args)
+    stats = {"matched": 0, "changed": 0}
+
+    def updated() -> Iterator[Movie]:
+        for movie in stream_library(repo):
+            if matches(movie):
+                stats["matched"] += 1
+                if any(getattr(movie, name) != value for name, value in changes.items()):
+                    stats["changed"] += 1
+                    for name, value in changes.items():
+                        setattr(movie, name, value)
+            yield movie
+
+    try:
+        if args.dry_run:
+            sum(1 for _movie in updated())
+        else:
+            repo.save_stream(updated())
+    finally:
+        repo.close()
+    _report({**stats, "dry_run": args.dry_run})
+    return 0
+
+
+def cmd_enrich(args: argparse.Namespace) -> int:
+    from enrichment import BulkEnricher
+    from genre_catalog import GenreCatalog
+    from tmdb_service import DEFAULT_API_KEY, TMDBService
+
+    repo = open_repository(args)
+    tmdb = TMDBService(api_key=args.api_key or os.environ.get("TMDB_API_KEY") or DEFAULT_API_KEY)
+    genres = GenreCatalog()
+    if genres.is_stale:
+        try:
+            genres.refresh(tmdb)
+        except Exception:
+            pass
+    enricher = BulkEnricher(tmdb, workers=args.workers, requests_per_second=args.rate, genre_names=genres)
+    matches = selector(args)
+    totals = {"updated": 0, "not_found": 0, "failed": 0}
+    budget = [args.limit or -1]
+
+    def enriched() -> Iterator[Movie]:
+        for chunk in repo.stream_movies(CHUNK_SIZE):
+            wanted = [m for m in chunk if m.tmdb_id is None and matches(m)]
+            if budget[0] >= 0:
+                wanted = wanted[:budget[0]]
+                budget[0] -= len(wanted)
+            if wanted and not enricher.stop_event.is_set():
+                report = enricher.run(wanted, _apply_updates)
+                totals["updated"] += report.updated
+                totals["not_found"] += report.not_found
+                totals["failed"] += report.failed
+                for name, error in report.errors[:5]:
+                    print(f"failed: {name}: {error}", file=sys.stderr)
+                if not args.quiet:
+                    print(f"enriched {sum(totals.values())} movies", file=sys.stderr)
+            yield from chunk
+
+    try:
+        repo.save_stream(enriched())
+    except KeyboardInterrupt:
+        enricher.stop()
+        raise
+    finally:
+        repo.close()
+        tmdb.close()
+    _report(totals)
+    return 0
+
+
+def _apply_updates(batch) -> None:
+    for movie, updates in batch:
+        for name, value in updates.items():
+            setattr(movie, name, value)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="movie_cli", description="Bulk operations on the movie library.")
+    parser.add_argument("--storage", choices=("json", "journal", "sqlite"), help="defaults to the settings file")
+    parser.add_argument("--data", default="movies_data.json", help="JSON library file")
+    parser.add_argument("--db", default="movies.db", help="SQLite library file")
+    parser.add_argument("--settings", default="settings.json")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_selection(command: argparse.ArgumentParser, positional: bool = False) -> None:
+        if positional:
+            command.add_argument("search", nargs="?", default="")
+        else:
+            command.add_argument("--search", default="", help="title substring")
+        command.add_argument("--filter", default="All", choices=("All", *FILTER_MODES))
+
+    search = commands.add_parser("search", help="filter and sort the library")
+    add_selection(search, positional=True)
+    search.add_argument("--sort", default="Title", choices=("Title", "Year", "Rating"))
+    search.add_argument("--limit", type=int, default=0)
+    search.add_argument("--format", default="table", choices=("table", "json", "csv"))
+    search.set_defaults(func=cmd_search)
+
+    export = commands.add_parser("export", help="write the library to CSV or JSON")
+    export.add_argument("file", help="output path, or - for stdout")
+    export.add_argument("--format", choices=("csv", "json"))
+    add_selection(export)
+    export.set_defaults(func=cmd_export)
+
+    import_ = commands.add_parser("import", help="merge movies from CSV or JSON")
+    import_.add_argument("file", help="input path, or - for stdin with --replace")
+    import_.add_argument("--format", choices=("csv", "json"))
+    import_.add_argument("--replace", action="store_true", help="replace the library instead of merging by uid, file, TMDB id or title")
+    import_.set_defaults(func=cmd_import)
+
+    dedupe = commands.add_parser("dedupe", help="merge duplicate movies")
+    dedupe.add_argument("--threshold", type=float, default=0.85, help="fuzzy title similarity (0-1)")
+    dedupe.add_argument("--year-tolerance", type=int, default=1)
+    dedupe.add_argument("--dry-run", action="store_true")
+    dedupe.set_defaults(func=cmd_dedupe)
+
+    set_flags = commands.add_parser("set", help="bulk-set flags on matching movies")
+    add_selection(set_flags)
+    for name in FLAG_FIELDS:
+        set_flags.add_argument(f"--{name}", choices=("yes", "no"))
+    set_flags.add_argument("--rating", type=float)
+    set_flags.add_argument("--dry-run", action="store_true")
+    set_flags.set_defaults(func=cmd_set)
+
+    enrich = commands.add_parser("enrich", help="fill in metadata from TMDB for movies without a tmdb_id")
+    add_selection(enrich)
+    enrich.add_argument("--limit", type=int, default=0)
+    enrich.add_argument("--workers", type=int, default=4)
+    enrich.add_argument("--rate", type=float, default=20.0, help="requests per second")
+    enrich.add_argument("--api-key")
+    enrich.add_argument("--quiet", action="store_true")
+    enrich.set_defaults(func=cmd_enrich)
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        return 0
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,70 +1,395 @@
 from __future__ import annotations
 
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import argparse
+import json
+import multiprocessing
 import os
 import re
 import subprocess
 import sys
 import threading
 import tkinter as tk
-from concurrent.futures import ThreadPoolExecutor
-from io import BytesIO
-from tkinter import messagebox, ttk
-
-import webbrowser
-from PIL import Image, ImageTk
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from tkinter import filedialog, messagebox, ttk
+from typing import TYPE_CHECKING, Callable, Sequence
 
 try:
     import customtkinter as ctk
 except Exception:
     ctk = None
 
-from data_store import MovieRepository
+from autosave import AutosaveWriter, SaveDeferred
+from data_store import JournalMovieRepository, MovieRepository
+from dedupe import DuplicateIndex, MergeGroup, apply_merge_groups, find_merge_groups, merge_members
+from enrichment import BulkEnricher, EnrichmentReport, movie_updates_from_result
+from facet_index import RATING_BUCKETS, UNKNOWN, UNRATED, FacetIndex
+from genre_catalog import GenreCatalog
+from library_scanner import LibraryScanner, ScanResult, merge_scanned
+from library_sync import FileWatcher, MovieDiff, diff_movies, merge_external
+import metrics
 from models import Movie
-from tmdb_service import TMDBService
+from poster_cache import PosterCache, PosterDiskCache
+from poster_grid import PosterCard, VirtualPosterGrid
+from poster_scheduler import PosterScheduler
+from recommender import CreditStore, SimilarityIndex
+from search_index import MovieSearchIndex, QueryCancelled, filter_and_sort
+from sqlite_store import SQLiteMovieRepository
 
+if TYPE_CHECKING:
+    from PIL import Image
 
-class PosterCache:
-    def __init__(self, max_items: int = 256) -> None:
-        self._items: dict[tuple[str, tuple[int, int]], object] = {}
-        self._order: list[tuple[str, tuple[int, int]]] = []
-        self._max_items = max_items
+    from async_tmdb import AsyncTMDBService, LoopBridge
+    from tmdb_service import TMDBService
 
-    def get(self, key: tuple[str, tuple[int, int]]):
-        return self._items.get(key)
-
-    def put(self, key: tuple[str, tuple[int, int]], value: object) -> None:
-        if key not in self._items:
-            self._order.append(key)
-        self._items[key] = value
-        while len(self._order) > self._max_items:
-            oldest = self._order.pop(0)
-            self._items.pop(oldest, None)
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+WARM_UP_MODULES = ("PIL.Image", "PIL.ImageTk", "poster_decode", "tmdb_service", "async_tmdb", "webbrowser", "numpy")
 
 
 class MovieCollectionManager:
     PAGE_SIZE = 30
+    LOAD_CHUNK_SIZE = 500
+    POSTER_SIZE = (140, 200)
+    FACET_MENUS = (("genre", "All Genres"), ("decade", "All Decades"), ("rating", "All Ratings"))
 
-    def __init__(self, root: tk.Tk) -> None:
+    def __init__(self, root: tk.Tk, started: float | None = None) -> None:
         self.root = root
+        self.started = started if started is not None else time.perf_counter()
+        self.startup_times: dict[str, float] = {"import_ms": _IMPORT_SECONDS * 1000}
+        self.on_startup_complete: Callable[[dict[str, float]], None] | None = None
         self.root.title("Movie Collection Manager")
         self.root.geometry("1200x760")
 
-        self.repo = MovieRepository()
-        self.settings = self.repo.load_settings()
-        self.movies = self.repo.load_movies()
+        self.settings = MovieRepository().load_settings()
+        self.repo = self._open_repository(self.settings.get("storage", "journal"))
+        self.movies: list[Movie] = []
+        self.search_index = MovieSearchIndex()
+        self.dedupe_index = DuplicateIndex()
+        self.genre_catalog = GenreCatalog()
+        self.facet_index = FacetIndex(normalize_genre=self.genre_catalog.normalize)
+        self.similar_index = SimilarityIndex(normalize_genre=self.genre_catalog.normalize)
+        self.credit_store: CreditStore | None = None
+        self._facet_version = -1
+        self._facet_labels: dict[str, dict[str, str]] = {}
+        self.library_loaded = False
+        self._save_after_load = False
+        self.dirty_uids: set[str] = set()
+        self.autosave = AutosaveWriter(self._write_movies, on_state=self._post_save_state, lookup=self.search_index.get)
         self.poster_cache = PosterCache()
-        self.tmdb = TMDBService(api_key="ea33b23284657d2f1881ac56474f943e")
+        self.poster_disk_cache = PosterDiskCache(max_bytes=int(self.settings.get("poster_cache_mb", 200)) * 1024 * 1024)
+        self._services_lock = threading.Lock()
+        self._tmdb: TMDBService | None = None
+        self._async_client: tuple[AsyncTMDBService, LoopBridge] | None = None
+        self._async_checked = False
         self.executor = ThreadPoolExecutor(max_workers=8)
+        self.query_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="movie-query")
+        self.decode_pool: ProcessPoolExecutor | None = None
+        self.poster_scheduler = PosterScheduler(self._fetch_poster_source, self._decode_posters)
+        self.query_generation = 0
+        self.enricher: BulkEnricher | None = None
+        self.scanner = LibraryScanner(os.path.join(os.path.dirname(self.repo.data_file), "scan_index.json"))
+        self.scan_running = False
+        self.watcher: FileWatcher | None = None
+        self._sync_running = False
+        self._sync_full_save = False
+        self._closing = False
+        self.diagnostics_window: tk.Toplevel | None = None
+        self.metrics_reporter = metrics.start_reporter_from_env()
+        metrics.gauge("queue.poster_fetch", lambda: self.poster_scheduler.pending()["fetch"])
+        metrics.gauge("queue.poster_decode", lambda: self.poster_scheduler.pending()["decode"])
+        metrics.track_executor("queue.executor", self.executor)
+        metrics.track_executor("queue.query", self.query_executor)
 
         self.search_debounce_id: str | None = None
         self.filter_signature: tuple | None = None
-        self.page = 0
-        self.filtered_movies: list[Movie] = []
-        self.card_widgets: list[tk.Widget] = []
+        self.filtered_movies: Sequence[Movie] = []
 
         self._build_ui()
         self._bind_shortcuts()
+        self._mark_startup("ui_built")
+        self.root.after_idle(self._on_first_paint)
+
+    def _on_first_paint(self) -> None:
+        self.root.update_idletasks()
+        self._mark_startup("first_paint")
+        self.root.after(1, self._start_deferred)
+
+    def _start_deferred(self) -> None:
         self.refresh_movie_list(force=True)
+        self._start_library_load()
+        threading.Thread(target=self._warm_up, name="warm-up", daemon=True).start()
+
+    def _warm_up(self) -> None:
+        for name in WARM_UP_MODULES:
+            try:
+                __import__(name)
+            except Exception:
+                continue
+        try:
+            self.tmdb
+            self._poster_client()
+        except Exception:
+            pass
+        try:
+            self.root.after(0, lambda: self._mark_startup("warm_up"))
+        except (RuntimeError, tk.TclError):
+            pass
+
+    def _mark_startup(self, stage: str) -> None:
+        elapsed = time.perf_counter() - self.started
+        self.startup_times[f"{stage}_ms"] = elapsed * 1000
+        metrics.record(f"startup.{stage}", elapsed)
+        done = all(f"{name}_ms" in self.startup_times for name in ("first_paint", "library_loaded", "warm_up"))
+        if done and self.on_startup_complete is not None:
+            callback, self.on_startup_complete = self.on_startup_complete, None
+            callback(dict(self.startup_times))
+
+    @property
+    def tmdb(self) -> TMDBService:
+        if self._tmdb is None:
+            with self._services_lock:
+                if self._tmdb is None:
+                    from tmdb_service import DEFAULT_API_KEY, TMDBService
+
+                    self._tmdb = TMDBService(api_key=DEFAULT_API_KEY)
+        return self._tmdb
+
+    def _poster_client(self) -> tuple[AsyncTMDBService, LoopBridge] | None:
+        if not self._async_checked:
+            api_key = self.tmdb.api_key
+            with self._services_lock:
+                if not self._async_checked:
+                    from async_tmdb import AsyncTMDBService, LoopBridge, aiohttp
+
+                    if aiohttp:
+                        self._async_client = (AsyncTMDBService(api_key=api_key), LoopBridge())
+                    self._async_checked = True
+        return self._async_client
+
+    def _start_library_load(self) -> None:
+        self._set_loading("Loading library...", True)
+
+        def task() -> None:
+            try:
+                with metrics.span("storage.load_library"):
+                    for chunk in self.repo.iter_movies(self.LOAD_CHUNK_SIZE):
+                        # The indexes are thread-safe; filling them here keeps
+                        # tens of seconds of indexing off the Tk thread.
+                        with metrics.span("index.load_chunk"):
+                            self.search_index.extend(chunk)
+                            self.facet_index.extend(chunk)
+                            for movie in chunk:
+                                self.dedupe_index.add(movie)
+                        self.root.after(0, lambda c=chunk: self._on_library_chunk(c))
+                self.root.after(0, self._on_library_loaded)
+            except Exception as exc:
+                self.root.after(0, lambda: self._on_library_loaded(error=str(exc)))
+
+        threading.Thread(target=task, name="library-loader", daemon=True).start()
+
+    def _on_library_chunk(self, chunk: list[Movie]) -> None:
+        first = not self.movies
+        self.movies.extend(chunk)
+        self.loading_label.configure(text=f"Loading library... {len(self.movies)} movies")
+        if first:
+            self.refresh_movie_list(force=True)
+        elif len(self.movies) // self.LOAD_CHUNK_SIZE % 20 == 0:
+            self.refresh_movie_list(force=True, keep_position=True)
+
+    def _on_library_loaded(self, error: str | None = None) -> None:
+        self.library_loaded = True
+        self._mark_startup("library_loaded")
+        self._set_loading(f"Library load failed: {error}" if error else f"Loaded {len(self.movies)} movies", False)
+        self.refresh_movie_list(force=True, keep_position=True)
+        if self._save_after_load:
+            self._save_after_load = False
+            self._schedule_save()
+        if not error:
+            self._refresh_genres()
+            self._build_similarity()
+            if self.repo.watched_files():
+                self.watcher = FileWatcher(self.repo.watched_files(), self._on_files_changed).start()
+
+    def _on_files_changed(self) -> None:
+        if not self.repo.has_external_changes():
+            return
+        try:
+            self.root.after(0, self._sync_external)
+        except (RuntimeError, tk.TclError):
+            pass
+
+    def _sync_external(self, resave: set[str] | None = None, full: bool = False) -> None:
+        self.dirty_uids.update(resave or ())
+        self._sync_full_save = self._sync_full_save or full
+        if self._sync_running or self._closing:
+            return
+        self._sync_running = True
+        current = list(self.movies)
+
+        def task() -> None:
+            try:
+                incoming, signature = self.repo.read_external()
+                diff = diff_movies(current, incoming)
+            except Exception as exc:
+                self.root.after(0, lambda: self._on_sync_failed(str(exc)))
+                return
+            self.root.after(0, lambda: self._apply_external(diff, signature))
+
+        self.executor.submit(task)
+
+    def _on_sync_failed(self, message: str) -> None:
+        self._sync_running = False
+        self.status.configure(text=f"Could not read external changes: {message}")
+
+    def _apply_external(self, diff: MovieDiff, signature: tuple, closing: bool = False) -> None:
+        self._sync_running = False
+        # Unsaved local edits win; they are written on top of the merged file.
+        # Edits already handed to the autosave writer are still unsaved.
+        pending = self.autosave.pending_dirty()
+        keep = self.dirty_uids | (pending or set())
+        keep_all = pending is None or self._sync_full_save
+        applied = merge_external(self.movies, diff, lambda uid: keep_all or uid in keep)
+        changed, added, removed = applied.changed, applied.added, set(applied.removed)
+
+        if removed:
+            self.movies = [movie for movie in self.movies if movie.uid not in removed]
+        self.movies.extend(added)
+        for uid in removed:
+            self.search_index.remove(uid)
+            self.dedupe_index.remove(uid)
+            self.facet_index.remove(uid)
+            self.similar_index.remove(uid)
+        for movie in (*changed, *added):
+            self.search_index.add(movie)
+            self.dedupe_index.add(movie)
+            self.facet_index.add(movie)
+            self.similar_index.add(movie)
+        self.repo.accept_external(signature, (*changed, *added), removed)
+        self.autosave.invalidate(movie.uid for movie in (*changed, *added))
+        metrics.count("sync.external_changes", len(changed) + len(added) + len(removed))
+
+        if self.selected_movie is not None:
+            if self.selected_movie.uid in removed:
+                self.selected_movie = None
+            elif any(movie is self.selected_movie for movie in changed):
+                self.select_movie(self.selected_movie)
+        # A capture still queued in the writer predates the merge; scheduling
+        # again replaces it so the merged movies are not written back stale.
+        if self.dirty_uids or self._sync_full_save or pending is None or pending:
+            full, self._sync_full_save = self._sync_full_save, False
+            self._schedule_save(full=full)
+        if closing:
+            # Shutdown only needs the merged list for its final save; the
+            # grid and a follow-up sync would go through closing executors.
+            return
+        if added or removed:
+            self.refresh_movie_list(force=True, keep_position=True)
+        elif changed:
+            self.grid.refresh_items({movie.uid for movie in changed})
+        if diff:
+            self.status.configure(text=f"External changes merged: {len(added)} added, {len(changed)} updated, {len(removed)} removed")
+        if self.repo.has_external_changes():
+            self._sync_external()
+
+    def _refresh_genres(self) -> None:
+        if not self.genre_catalog.is_stale:
+            self._normalize_genres()
+            return
+
+        def task() -> None:
+            try:
+                self.genre_catalog.refresh(self.tmdb)
+            except Exception:
+                return
+            self.root.after(0, self._normalize_genres)
+
+        self.executor.submit(task)
+
+    def _normalize_genres(self) -> None:
+        changed = []
+        for movie in self.movies:
+            if self.genre_catalog.needs_normalizing(movie.genre):
+                movie.genre = self.genre_catalog.normalize(movie.genre)
+                self.search_index.add(movie)
+                self.dedupe_index.add(movie)
+                self.similar_index.add(movie)
+                changed.append(movie.uid)
+        if changed:
+            self.mark_dirty(*changed)
+        movies = list(self.movies)
+
+        def task() -> None:
+            with metrics.span("facets.rebuild"):
+                self.facet_index.rebuild(movies)
+            self.root.after(0, lambda: self.refresh_movie_list(force=True, keep_position=True))
+
+        self.executor.submit(task)
+
+    def _build_similarity(self) -> None:
+        movies = list(self.movies)
+
+        def task() -> None:
+            try:
+                if self.credit_store is None:
+                    self.credit_store = CreditStore(self.tmdb, os.path.join(os.path.dirname(self.repo.data_file), "credit_features.json"))
+                self.similar_index.credits = self.credit_store.get
+                with metrics.span("similar.build"):
+                    for movie in movies:
+                        self.similar_index.add(movie)
+                self.credit_store.save()
+            except Exception:
+                return
+
+        self.executor.submit(task)
+
+    def show_similar(self) -> None:
+        movie = self.selected_movie
+        if movie is None:
+            messagebox.showwarning("More Like This", "Select a movie first")
+            return
+        with metrics.span("similar.more_like"):
+            scored = self.similar_index.more_like(movie.uid, self.PAGE_SIZE)
+        self._show_recommendations(scored, f"Movies like {movie.name}")
+
+    def show_watch_next(self) -> None:
+        facets = self.facet_index
+        watched = facets.select({"status": ["Watched"]}) or 0
+        liked = facets.uids((facets.select({"status": ["Favorites"]}) or 0) | (watched & (facets.select({"rating": ["9+", "8-9", "7-8"]}) or 0)))
+        candidates = facets.uids((facets.select({"status": ["Watchlist"]}) or 0) & (facets.select({"status": ["Unwatched"]}) or 0))
+        if not candidates:
+            messagebox.showinfo("Watch Next", "Add some unwatched movies to the watchlist first")
+            return
+        if not liked:
+            messagebox.showinfo("Watch Next", "Mark favorites or rate watched movies 7+ to get suggestions")
+            return
+        with metrics.span("similar.watch_next"):
+            scored = self.similar_index.watch_next(liked, candidates, self.PAGE_SIZE)
+        self._show_recommendations(scored, "Watch next")
+
+    def _show_recommendations(self, scored: list[tuple[str, float]], title: str) -> None:
+        movies = (self.search_index.get(uid) for uid, _score in scored)
+        items = [movie for movie in movies if movie is not None]
+        # Recommendations replace the grid until the next search or filter
+        # change; clearing the signature makes that change re-run the query.
+        self.query_generation += 1
+        self.filter_signature = None
+        self.filtered_movies = items
+        self.grid.set_items(items)
+        self.status.configure(text=f"{title}: {len(items)} suggestions" if items else f"{title}: no suggestions yet")
+
+    def _open_repository(self, storage: str) -> MovieRepository:
+        if storage == "sqlite":
+            repo = SQLiteMovieRepository()
+            if repo.is_empty() and os.path.exists(repo.data_file):
+                repo.import_json()
+            return repo
+        if storage == "json":
+            return MovieRepository()
+        return JournalMovieRepository()
 
     def _build_ui(self) -> None:
         use_dark = bool(self.settings.get("dark_mode", True))
@@ -98,13 +423,28 @@ class MovieCollectionManager:
             self.filter_menu.bind("<<ComboboxSelected>>", lambda _: self.refresh_movie_list(force=True))
 
         btn = ctk.CTkButton if ctk else ttk.Button
+        facet_bar = ctk.CTkFrame(outer) if ctk else ttk.Frame(outer)
+        self.facet_vars: dict[str, tk.StringVar] = {}
+        self.facet_menus: dict[str, object] = {}
+        for facet, label in self.FACET_MENUS:
+            var = tk.StringVar(value=label)
+            menu = ctk.CTkOptionMenu(facet_bar, values=[label], variable=var, command=lambda _: self.refresh_movie_list(force=True)) if ctk else ttk.Combobox(facet_bar, values=[label], textvariable=var, width=18, state="readonly")
+            menu.pack(side="left", padx=4)
+            if not ctk:
+                menu.bind("<<ComboboxSelected>>", lambda _: self.refresh_movie_list(force=True))
+            self.facet_vars[facet] = var
+            self.facet_menus[facet] = menu
         self.fetch_btn = btn(toolbar, text="Auto Fetch", command=self.auto_fetch_movie)
         self.fetch_btn.pack(side="left", padx=4)
+        self.fetch_all_btn = btn(toolbar, text="Fetch All", command=self.fetch_all_metadata)
+        self.fetch_all_btn.pack(side="left", padx=4)
         self.save_btn = btn(toolbar, text="Save", command=self.save_movies)
         self.save_btn.pack(side="left", padx=4)
         self.theme_btn = btn(toolbar, text="Toggle Theme", command=self.toggle_theme)
         self.theme_btn.pack(side="right", padx=4)
 
+        facet_bar.pack(fill="x", padx=12)
+
         body = ctk.CTkFrame(outer) if ctk else ttk.Frame(outer)
         body.pack(fill="both", expand=True, padx=12, pady=6)
 
@@ -149,35 +489,43 @@ class MovieCollectionManager:
         self.trailer_btn.pack(fill="x", pady=4)
         self.play_btn = btn(left, text="Play Movie", command=self.play_selected_movie)
         self.play_btn.pack(fill="x", pady=4)
+        self.scan_btn = btn(left, text="Scan Folders", command=self.scan_library)
+        self.scan_btn.pack(fill="x", pady=4)
+        self.dedupe_btn = btn(left, text="Find Duplicates", command=self.find_duplicates)
+        self.dedupe_btn.pack(fill="x", pady=4)
+        self.similar_btn = btn(left, text="More Like This", command=self.show_similar)
+        self.similar_btn.pack(fill="x", pady=4)
+        self.watch_next_btn = btn(left, text="Watch Next", command=self.show_watch_next)
+        self.watch_next_btn.pack(fill="x", pady=4)
 
         self.selected_movie: Movie | None = None
 
         self.canvas = tk.Canvas(right, highlightthickness=0)
         self.canvas.pack(side="left", fill="both", expand=True)
-        scrollbar = ttk.Scrollbar(right, orient="vertical", command=self.canvas.yview)
+        scrollbar = ttk.Scrollbar(right, orient="vertical")
         scrollbar.pack(side="right", fill="y")
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-        self.grid_frame = ctk.CTkFrame(self.canvas) if ctk else ttk.Frame(self.canvas)
-        self.canvas.create_window((0, 0), window=self.grid_frame, anchor="nw")
-        self.grid_frame.bind("<Configure>", lambda _: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        self.canvas.bind("<Configure>", lambda _: self.refresh_movie_list(force=False))
+        self.grid = VirtualPosterGrid(
+            self.canvas,
+            scrollbar,
+            self._load_poster_async,
+            self.select_movie,
+            self.play_movie,
+            on_release=self._release_card,
+            on_viewport=lambda: self.poster_scheduler.reprioritize(self.grid.priority),
+        )
         self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
 
         self.status = ctk.CTkLabel(outer, text="Ready") if ctk else ttk.Label(outer, text="Ready")
         self.status.pack(fill="x", padx=12, pady=(0, 8))
 
-        self.load_more_btn = btn(outer, text="Load More", command=self.load_next_page)
-        self.load_more_btn.pack(pady=(0, 8))
-
     def _bind_shortcuts(self) -> None:
         self.root.bind("<Return>", lambda _: self.refresh_movie_list(force=True))
         self.root.bind("<Control-s>", lambda _: self.save_movies())
         self.root.bind("<Delete>", lambda _: self.delete_selected())
+        self.root.bind("<Control-Shift-D>", lambda _: self.toggle_diagnostics())
 
     def _on_mousewheel(self, event: tk.Event) -> None:
-        self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-        if self.canvas.yview()[1] > 0.95:
-            self.load_next_page()
+        self.grid.scroll(int(-1 * (event.delta / 120)))
 
     def _on_search_change(self, _event=None) -> None:
         if self.search_debounce_id:
@@ -190,139 +538,194 @@ class MovieCollectionManager:
             self.sort_var.get(),
             self.filter_var.get(),
             len(self.movies),
-            self.canvas.winfo_width() // 180,
+            tuple(sorted(self._facet_selection().items())),
         )
 
-    def refresh_movie_list(self, force: bool = False) -> None:
+    def _facet_selection(self) -> dict[str, str]:
+        selection = {}
+        for facet, _label in self.FACET_MENUS:
+            value = self._facet_labels.get(facet, {}).get(self.facet_vars[facet].get())
+            if value is not None:
+                selection[facet] = value
+        return selection
+
+    def _update_facet_menus(self) -> None:
+        if self.facet_index.version == self._facet_version:
+            return
+        self._facet_version = self.facet_index.version
+        rating_order = [label for _floor, label in RATING_BUCKETS] + [UNRATED]
+        for facet, all_label in self.FACET_MENUS:
+            counts = self.facet_index.counts(facet)
+            if facet == "decade":
+                values = sorted((v for v in counts if v != UNKNOWN), reverse=True) + [v for v in counts if v == UNKNOWN]
+            elif facet == "rating":
+                values = [v for v in rating_order if v in counts]
+            else:
+                values = sorted(counts, key=lambda v: (v == UNKNOWN, v.lower()))
+            labels = {f"{value} ({counts[value]})": value for value in values}
+            current = self._facet_labels.get(facet, {}).get(self.facet_vars[facet].get())
+            self._facet_labels[facet] = labels
+            menu = self.facet_menus[facet]
+            if ctk:
+                menu.configure(values=[all_label, *labels])
+            else:
+                menu["values"] = [all_label, *labels]
+            selected = next((label for label, value in labels.items() if value == current), all_label)
+            self.facet_vars[facet].set(selected)
+
+    @metrics.timed("ui.refresh_movie_list")
+    def refresh_movie_list(self, force: bool = False, keep_position: bool = False) -> None:
         signature = self._current_signature()
         if not force and signature == self.filter_signature:
             return
 
         self.filter_signature = signature
-        self.page = 0
-        search = signature[0]
-        mode = self.filter_var.get()
-        items = [m for m in self.movies if search in m.name.lower()]
-
-        if mode == "Watched":
-            items = [m for m in items if m.watched]
-        elif mode == "Unwatched":
-            items = [m for m in items if not m.watched]
-        elif mode == "Favorites":
-            items = [m for m in items if m.favorite]
-        elif mode == "Watchlist":
-            items = [m for m in items if m.watchlist]
-
-        if self.sort_var.get() == "Year":
-            items.sort(key=lambda m: m.year or "0", reverse=True)
-        elif self.sort_var.get() == "Rating":
-            items.sort(key=lambda m: m.rating, reverse=True)
-        else:
-            items.sort(key=lambda m: m.name.lower())
+        self.query_generation += 1
+        generation = self.query_generation
+        search, sort, mode = signature[0], signature[1], signature[2]
+        selection = {facet: [value] for facet, value in signature[4]}
+        requested = time.perf_counter()
 
-        self.filtered_movies = items
-        for w in self.card_widgets:
-            w.destroy()
-        self.card_widgets.clear()
-        self.load_next_page()
-
-    def _grid_columns(self) -> int:
-        width = max(260, self.canvas.winfo_width())
-        return max(1, width // 190)
-
-    def load_next_page(self) -> None:
-        start = self.page * self.PAGE_SIZE
-        end = start + self.PAGE_SIZE
-        chunk = self.filtered_movies[start:end]
-        if not chunk:
-            self.load_more_btn.configure(state="disabled")
-            return
+        def is_stale() -> bool:
+            return generation != self.query_generation
 
-        cols = self._grid_columns()
-        existing = len(self.card_widgets)
-        for idx, movie in enumerate(chunk):
-            pos = existing + idx
-            row, col = divmod(pos, cols)
-            card = self._build_card(self.grid_frame, movie)
-            card.grid(row=row, column=col, padx=8, pady=8, sticky="nsew")
-            self.card_widgets.append(card)
-
-        for c in range(cols):
-            self.grid_frame.grid_columnconfigure(c, weight=1)
-
-        self.page += 1
-        self.load_more_btn.configure(state="normal" if end < len(self.filtered_movies) else "disabled")
-        self.status.configure(text=f"Showing {min(end, len(self.filtered_movies))}/{len(self.filtered_movies)} movies")
-
-    def _build_card(self, parent: tk.Widget, movie: Movie) -> tk.Widget:
-        frame = ctk.CTkFrame(parent, corner_radius=10) if ctk else ttk.Frame(parent, relief="ridge", borderwidth=1)
-        poster_label = ctk.CTkLabel(frame, text="Loading...", width=140, height=200) if ctk else ttk.Label(frame, text="Loading...", width=20)
-        poster_label.pack(padx=6, pady=6)
-        title = ctk.CTkLabel(frame, text=f"{movie.name}\n{movie.year} ★{movie.rating:.1f}", width=160, wraplength=150) if ctk else ttk.Label(frame, text=f"{movie.name}\n{movie.year} ★{movie.rating:.1f}", width=24)
-        title.pack(padx=6, pady=(0, 4))
-
-        flags = []
-        if movie.favorite:
-            flags.append("❤️")
-        if movie.watchlist:
-            flags.append("📌")
-        if movie.watched:
-            flags.append("✅")
-        badge_text = " ".join(flags) if flags else ""
-        badge = ctk.CTkLabel(frame, text=badge_text) if ctk else ttk.Label(frame, text=badge_text)
-        badge.pack(pady=(0, 6))
-
-        frame.bind("<Button-1>", lambda _e, m=movie: self.select_movie(m))
-        frame.bind("<Double-Button-1>", lambda _e, m=movie: self.play_movie(m))
-        for child in frame.winfo_children():
-            child.bind("<Button-1>", lambda _e, m=movie: self.select_movie(m))
-            child.bind("<Double-Button-1>", lambda _e, m=movie: self.play_movie(m))
-
-        self._bind_hover(frame)
-        self._load_poster_async(movie, poster_label)
-        return frame
-
-    def _bind_hover(self, widget: tk.Widget) -> None:
-        def on_enter(_):
-            self._animate_bg(widget, 0)
-
-        def on_leave(_):
-            self._animate_bg(widget, 1)
-
-        widget.bind("<Enter>", on_enter)
-        widget.bind("<Leave>", on_leave)
-
-    def _animate_bg(self, widget: tk.Widget, direction: int) -> None:
-        if not ctk:
-            return
-        colors = ["#2b2e3b", "#343849"] if ctk.get_appearance_mode() == "Dark" else ["#e7ecf3", "#d7dfeb"]
-        widget.configure(fg_color=colors[direction])
+        def task() -> None:
+            if is_stale():
+                return
+            try:
+                with metrics.span("query.execute"):
+                    if isinstance(self.repo, SQLiteMovieRepository):
+                        items = self.repo.query_movies(search, mode, sort, self.PAGE_SIZE, facets=selection)
+                        # The result is lazy; run the COUNT and first page here
+                        # rather than on the Tk thread when the grid reads it.
+                        count = len(items)
+                        items.fetch(0, min(count, self.PAGE_SIZE))
+                    else:
+                        items = filter_and_sort(
+                            self.search_index, self.facet_index, search, mode, sort, selection, cancelled=is_stale
+                        )
+            except QueryCancelled:
+                metrics.count("query.cancelled")
+                return
+            except Exception as exc:
+                self.root.after(0, lambda: self.status.configure(text=f"Search failed: {exc}"))
+                return
+            self.root.after(0, lambda: self._apply_query_result(generation, items, keep_position, requested))
+
+        self.query_executor.submit(task)
 
-    def _load_poster_async(self, movie: Movie, label: tk.Widget) -> None:
+    def _apply_query_result(
+        self, generation: int, items: Sequence[Movie], keep_position: bool, requested: float | None = None
+    ) -> None:
+        if generation != self.query_generation:
+            return
+        with metrics.span("ui.apply_query_result"):
+            self._update_facet_menus()
+            self.filtered_movies = items
+            self.grid.set_items(items, keep_position=keep_position)
+            self.status.configure(text=f"Showing {len(items)} movies")
+        if requested is not None:
+            metrics.record("ui.query_to_paint", time.perf_counter() - requested)
+
+    def _load_poster_async(self, card: PosterCard, movie: Movie, generation: int) -> None:
         if not movie.poster_path:
-            label.configure(text="No poster")
+            self.poster_scheduler.cancel(id(card))
+            card.set_poster_text(generation, "No poster")
             return
 
-        key = (movie.poster_path, (140, 200))
+        key = (movie.poster_path, self.POSTER_SIZE)
         cached = self.poster_cache.get(key)
         if cached is not None:
-            label.configure(image=cached, text="")
+            self.poster_scheduler.cancel(id(card))
+            card.set_poster(generation, cached)
             return
 
-        def task() -> None:
-            try:
-                raw = self.tmdb.fetch_poster_bytes(movie.poster_path)
-                image = Image.open(BytesIO(raw)).convert("RGB")
-                image.thumbnail((140, 200), Image.Resampling.LANCZOS)
-                poster = ctk.CTkImage(light_image=image, dark_image=image, size=(140, 200)) if ctk else ImageTk.PhotoImage(image)
-                self.poster_cache.put(key, poster)
-                self.root.after(0, lambda: label.configure(image=poster, text=""))
-            except Exception:
-                self.root.after(0, lambda: label.configure(text="Poster error"))
+        def on_ready(image: Image.Image) -> None:
+            self.root.after(0, lambda: self._deliver_poster(card, generation, key, image))
 
-        self.executor.submit(task)
+        def on_error(_message: str) -> None:
+            self.root.after(0, lambda: card.set_poster_text(generation, "Poster error"))
+
+        priority = self.grid.priority(id(card))
+        self.poster_scheduler.submit(id(card), movie.poster_path, priority or 0, on_ready, on_error)
+
+    def _deliver_poster(self, card: PosterCard, generation: int, key: tuple, image: Image.Image) -> None:
+        poster = self.poster_cache.get(key)
+        if poster is None:
+            if ctk:
+                poster = ctk.CTkImage(light_image=image, dark_image=image, size=self.POSTER_SIZE)
+            else:
+                from PIL import ImageTk
+
+                poster = ImageTk.PhotoImage(image)
+            self.poster_cache.put(key, poster, image.width * image.height * 4)
+        card.set_poster(generation, poster)
+
+    def _release_card(self, card: PosterCard) -> None:
+        self.poster_scheduler.cancel(id(card))
+
+    @metrics.timed("poster.fetch")
+    def _fetch_poster_source(self, poster_path: str) -> tuple[str, bytes]:
+        thumb = self.poster_disk_cache.get_thumbnail(poster_path, self.POSTER_SIZE)
+        if thumb:
+            metrics.count("poster.thumbnail_hit")
+            return "thumbnail", thumb
+        metrics.count("poster.thumbnail_miss")
+        return "raw", self._poster_raw_bytes(poster_path)
+
+    def _poster_raw_bytes(self, poster_path: str) -> bytes:
+        raw = self.poster_disk_cache.get_raw(poster_path)
+        if not raw:
+            raw = self._fetch_poster_bytes(poster_path)
+            self.poster_disk_cache.put_raw(poster_path, raw)
+        return raw
+
+    @metrics.timed("poster.decode_batch")
+    def _decode_posters(self, items: list[tuple[str, tuple[str, bytes]]]) -> list:
+        from poster_decode import decode_batch, decode_poster, to_image
+
+        metrics.count("poster.decoded", len(items))
+        jobs = [source for _path, source in items]
+        try:
+            decoded = self._decode_pool().submit(decode_batch, jobs, self.POSTER_SIZE).result(timeout=30)
+        except (BrokenProcessPool, OSError, TimeoutError, RuntimeError):
+            decoded = decode_batch(jobs, self.POSTER_SIZE)
+
+        images: list = []
+        for (poster_path, (kind, _data)), result in zip(items, decoded):
+            if isinstance(result, str) and kind == "thumbnail":
+                try:
+                    result = decode_poster("raw", self._poster_raw_bytes(poster_path), self.POSTER_SIZE)
+                except Exception as exc:
+                    result = str(exc)
+            if isinstance(result, str):
+                images.append(RuntimeError(result))
+                continue
+            thumbnail = result[3]
+            if thumbnail:
+                self.poster_disk_cache.put_thumbnail(poster_path, self.POSTER_SIZE, thumbnail)
+            images.append(to_image(result))
+        return images
+
+    def _decode_pool(self) -> ProcessPoolExecutor:
+        if self.decode_pool is None:
+            workers = max(1, min(4, (os.cpu_count() or 2) - 1))
+            # Forking now would copy locks held by Tk and the worker threads
+            # into the child; spawned workers start clean.
+            self.decode_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return self.decode_pool
+
+    def _fetch_poster_bytes(self, poster_path: str) -> bytes:
+        client = self._poster_client()
+        if client is not None:
+            async_tmdb, loop_bridge = client
+            return loop_bridge.call(async_tmdb.fetch_poster_bytes(poster_path), timeout=15)
+        return self.tmdb.fetch_poster_bytes(poster_path)
 
     def select_movie(self, movie: Movie) -> None:
+        # SQLite query pages hold fresh row copies; edits must land on the
+        # instance in self.movies that the autosave writer captures.
+        movie = self.search_index.get(movie.uid) or movie
         self.selected_movie = movie
         self.name_entry.delete(0, tk.END)
         self.name_entry.insert(0, movie.name)
@@ -359,32 +762,164 @@ class MovieCollectionManager:
             file_path=self.selected_movie.file_path if self.selected_movie else "",
             tmdb_id=self.selected_movie.tmdb_id if self.selected_movie else None,
         )
-
-        if self.selected_movie and self.selected_movie in self.movies:
-            idx = self.movies.index(self.selected_movie)
+        if self.selected_movie:
+            movie.uid = self.selected_movie.uid
+        else:
+            duplicate = self._confirm_new_movie(movie)
+            if duplicate is None:
+                return
+            if duplicate is not movie:
+                merged = merge_members([duplicate, movie]).merged
+                merged.uid = duplicate.uid
+                self._apply_merges([MergeGroup(merged, [duplicate], {"add"})])
+                return
+
+        idx = next((i for i, m in enumerate(self.movies) if self.selected_movie and m.uid == self.selected_movie.uid), None)
+        if idx is not None:
             self.movies[idx] = movie
         else:
             self.movies.append(movie)
+        self.search_index.add(movie)
+        self.dedupe_index.add(movie)
+        self.facet_index.add(movie)
+        self.similar_index.add(movie)
         self.selected_movie = movie
-        self.save_movies()
+        self.mark_dirty(movie.uid)
         self.refresh_movie_list(force=True)
 
+    def _confirm_new_movie(self, movie: Movie) -> Movie | None:
+        matches = self.dedupe_index.matches(movie, limit=1)
+        if not matches:
+            return movie
+        existing = next((m for m in self.movies if m.uid == matches[0].uid), None)
+        if existing is None:
+            return movie
+        year = f" ({existing.year})" if existing.year else ""
+        answer = messagebox.askyesnocancel(
+            "Possible Duplicate",
+            f"'{movie.name}' looks like '{existing.name}{year}', which is already in the library.\n\n"
+            "Yes: merge into the existing movie\nNo: add it as a separate movie",
+        )
+        if answer is None:
+            return None
+        return existing if answer else movie
+
+    def find_duplicates(self) -> None:
+        if not self.library_loaded:
+            messagebox.showinfo("Find Duplicates", "Please wait for the library to finish loading")
+            return
+        movies = list(self.movies)
+        self._set_loading("Looking for duplicates...", True)
+
+        def task() -> None:
+            try:
+                groups = find_merge_groups(movies, self.dedupe_index)
+            except Exception as exc:
+                self.root.after(0, lambda: self._set_loading(f"Duplicate check failed: {exc}", False))
+                return
+            self.root.after(0, lambda: self._confirm_merges(groups))
+
+        self.executor.submit(task)
+
+    def _confirm_merges(self, groups: list[MergeGroup]) -> None:
+        if not groups:
+            self._set_loading("No duplicates found", False)
+            return
+        removed = sum(len(group.removed) for group in groups)
+        preview = "\n".join(
+            " = ".join(f"{m.name} ({m.year})" if m.year else m.name for m in group.members[:3]) for group in groups[:8]
+        )
+        more = f"\n... and {len(groups) - 8} more" if len(groups) > 8 else ""
+        self._set_loading(f"Found {len(groups)} duplicate groups", False)
+        if messagebox.askyesno(
+            "Find Duplicates",
+            f"Merge {len(groups)} groups, removing {removed} duplicate entries?\n\n{preview}{more}",
+        ):
+            self._apply_merges(groups)
+
+    def _apply_merges(self, groups: list[MergeGroup]) -> None:
+        self.movies, merged, removed = apply_merge_groups(self.movies, groups)
+        by_uid = {movie.uid: movie for movie in self.movies}
+        for uid in removed:
+            self.search_index.remove(uid)
+            self.dedupe_index.remove(uid)
+            self.facet_index.remove(uid)
+            self.similar_index.remove(uid)
+        for uid in merged:
+            self.search_index.add(by_uid[uid])
+            self.dedupe_index.add(by_uid[uid])
+            self.facet_index.add(by_uid[uid])
+            self.similar_index.add(by_uid[uid])
+        if self.selected_movie is not None and self.selected_movie.uid in removed | merged:
+            self.selected_movie = by_uid.get(self.selected_movie.uid)
+        self.mark_dirty(*merged, *removed)
+        self.status.configure(text=f"Merged {len(removed)} duplicates")
+        self.refresh_movie_list(force=True, keep_position=True)
+
     def delete_selected(self) -> None:
         if not self.selected_movie:
             return
         if not messagebox.askyesno("Delete", f"Delete '{self.selected_movie.name}'?"):
             return
-        self.movies = [m for m in self.movies if m is not self.selected_movie]
+        self.movies = [m for m in self.movies if m.uid != self.selected_movie.uid]
+        self.search_index.remove(self.selected_movie.uid)
+        self.dedupe_index.remove(self.selected_movie.uid)
+        self.facet_index.remove(self.selected_movie.uid)
+        self.similar_index.remove(self.selected_movie.uid)
+        self.mark_dirty(self.selected_movie.uid)
         self.selected_movie = None
-        self.save_movies()
         self.refresh_movie_list(force=True)
 
+    def mark_dirty(self, *uids: str) -> None:
+        self.dirty_uids.update(uids)
+        self._schedule_save()
+
     def save_movies(self) -> None:
+        self._schedule_save(full=True, immediate=True)
+
+    def _schedule_save(
+        self, full: bool = False, immediate: bool = False, on_saved: Callable[[], None] | None = None
+    ) -> None:
+        if not self.library_loaded:
+            self._save_after_load = True
+            self.status.configure(text="Will save once the library has loaded")
+            return
+        # In SQLite mode the grid is queried from the database, so edits are
+        # written straight away instead of after the quiet period.
+        immediate = immediate or isinstance(self.repo, SQLiteMovieRepository)
+        self.autosave.schedule(self.movies, None if full else self.dirty_uids, immediate=immediate, on_saved=on_saved)
+        self.dirty_uids = set()
+
+    def _write_movies(self, movies: list[Movie], dirty: set[str] | None) -> None:
+        with metrics.span("storage.save_movies"), self.repo.lock:
+            if not self._closing and self.repo.has_external_changes():
+                # Writing now would clobber the other writer; merge first and
+                # let the merge reschedule this save.
+                metrics.count("sync.deferred_save")
+                self.root.after(0, lambda: self._sync_external(set(dirty or ()), full=dirty is None))
+                raise SaveDeferred("Merging changes from another window before saving")
+            self.repo.save_movies(movies, dirty)
+
+    def _post_save_state(self, state: str, detail: str) -> None:
         try:
-            self.repo.save_movies(self.movies)
-            self.status.configure(text="Saved")
-        except OSError as exc:
-            messagebox.showerror("Save Error", str(exc))
+            self.root.after(0, lambda: self._on_save_state(state, detail))
+        except (RuntimeError, tk.TclError):
+            pass
+
+    def _on_save_state(self, state: str, detail: str) -> None:
+        if state == AutosaveWriter.PENDING:
+            self.status.configure(text="Changes pending...")
+        elif state == AutosaveWriter.SAVING:
+            self.status.configure(text="Saving...")
+        elif state == AutosaveWriter.DEFERRED:
+            self.status.configure(text=f"{detail}...")
+        elif state == AutosaveWriter.SAVED:
+            self.status.configure(text="All changes saved")
+            if isinstance(self.repo, SQLiteMovieRepository):
+                self.refresh_movie_list(force=True, keep_position=True)
+        else:
+            self.status.configure(text=f"Save failed: {detail}")
+            messagebox.showerror("Save Error", detail)
 
     def _set_loading(self, text: str, active: bool) -> None:
         self.loading_label.configure(text=text)
@@ -408,13 +943,13 @@ class MovieCollectionManager:
                 results = data.get("results") or []
                 if not results:
                     raise ValueError("Movie not found")
-                best = results[0]
-                title = best.get("title", query)
-                release = str(best.get("release_date", ""))[:4]
-                poster = best.get("poster_path", "")
-                genre = ", ".join(str(x) for x in best.get("genre_ids", [])[:3])
-                rating = float(best.get("vote_average", 0.0))
-                tmdb_id = best.get("id")
+                updates = movie_updates_from_result(results[0], query, self.genre_catalog)
+                title = updates["name"]
+                release = updates["year"]
+                poster = updates["poster_path"]
+                genre = updates["genre"]
+                rating = updates["rating"]
+                tmdb_id = updates["tmdb_id"]
 
                 def apply_result() -> None:
                     self.name_entry.delete(0, tk.END)
@@ -428,6 +963,7 @@ class MovieCollectionManager:
                     if self.selected_movie:
                         self.selected_movie.poster_path = poster
                         self.selected_movie.tmdb_id = tmdb_id
+                        self.mark_dirty(self.selected_movie.uid)
                     self._set_loading("Fetch complete", False)
                     self.refresh_movie_list(force=True)
 
@@ -437,10 +973,124 @@ class MovieCollectionManager:
 
         self.executor.submit(task)
 
+    def fetch_all_metadata(self) -> None:
+        if self.enricher is not None:
+            self.enricher.stop()
+            self.status.configure(text="Stopping metadata fetch...")
+            return
+
+        pending = [m for m in self.movies if m.tmdb_id is None]
+        if not pending:
+            self.status.configure(text="All movies already have TMDB metadata")
+            return
+
+        enricher = BulkEnricher(self.tmdb, genre_names=self.genre_catalog)
+        self.enricher = enricher
+        self.fetch_all_btn.configure(text="Stop Fetch")
+        self._set_loading(f"Fetching metadata for {len(pending)} movies...", True)
+
+        def on_batch(batch: list[tuple[Movie, dict]]) -> None:
+            self.root.after(0, lambda: self._apply_enrichment(batch))
+
+        def on_progress(report: EnrichmentReport) -> None:
+            text = f"Fetched {report.done}/{report.total} ({report.updated} updated, {report.not_found} not found, {report.failed} failed)"
+            self.root.after(0, lambda: self.status.configure(text=text))
+
+        def task() -> None:
+            try:
+                report = enricher.run(pending, on_batch, on_progress)
+                summary = f"Metadata fetch finished: {report.updated}/{report.total} updated"
+            except Exception as exc:
+                summary = f"Metadata fetch failed: {exc}"
+            self.root.after(0, lambda: self._finish_enrichment(summary))
+
+        threading.Thread(target=task, name="bulk-enrichment", daemon=True).start()
+
+    def _apply_enrichment(self, batch: list[tuple[Movie, dict]]) -> None:
+        by_uid = {m.uid: m for m in self.movies}
+        changed: set[str] = set()
+        for movie, updates in batch:
+            target = by_uid.get(movie.uid)
+            if target is None:
+                continue
+            for name, value in updates.items():
+                setattr(target, name, value)
+            self.search_index.add(target)
+            self.dedupe_index.add(target)
+            self.facet_index.add(target)
+            self.similar_index.add(target)
+            changed.add(target.uid)
+        if changed:
+            self.mark_dirty(*changed)
+            self.filter_signature = None
+            self.grid.refresh_items(changed)
+
+    def _finish_enrichment(self, summary: str) -> None:
+        self.enricher = None
+        self.fetch_all_btn.configure(text="Fetch All")
+        self._set_loading(summary, False)
+        self.refresh_movie_list(force=True)
+
+    def scan_library(self) -> None:
+        if self.scan_running:
+            return
+        if not self.library_loaded:
+            self.status.configure(text="Wait for the library to finish loading before scanning")
+            return
+        roots = [path for path in self.settings.get("library_dirs", []) if os.path.isdir(path)]
+        if not roots:
+            directory = filedialog.askdirectory(title="Choose a movie folder")
+            if not directory:
+                return
+            roots = [directory]
+            self.settings["library_dirs"] = roots
+            self.repo.save_settings(self.settings)
+
+        self.scan_running = True
+        self._set_loading("Scanning folders...", True)
+
+        def on_progress(count: int) -> None:
+            self.root.after(0, lambda: self.loading_label.configure(text=f"Scanning folders... {count} files"))
+
+        def task() -> None:
+            try:
+                result = self.scanner.scan(roots, on_progress)
+                self.root.after(0, lambda: self._apply_scan(result))
+            except Exception as exc:
+                self.root.after(0, lambda: self._finish_scan(f"Scan failed: {exc}"))
+
+        threading.Thread(target=task, name="library-scan", daemon=True).start()
+
+    def _apply_scan(self, result: ScanResult) -> None:
+        added, updated = merge_scanned(self.movies, result.changed)
+        self.movies.extend(added)
+        for movie in (*added, *updated):
+            self.search_index.add(movie)
+            self.dedupe_index.add(movie)
+            self.facet_index.add(movie)
+            self.similar_index.add(movie)
+        if added or updated:
+            # The scan index only learns about these files once they are saved,
+            # so an interrupted save means the next scan finds them again.
+            self.dirty_uids.update(m.uid for m in (*added, *updated))
+            self._schedule_save(on_saved=lambda: self.scanner.commit(result))
+            self.refresh_movie_list(force=True, keep_position=True)
+        else:
+            self.executor.submit(self.scanner.commit, result)
+        self._finish_scan(
+            f"Scanned {result.files_seen} files: {len(added)} added, {len(updated)} linked, {len(result.removed)} missing"
+        )
+
+    def _finish_scan(self, summary: str) -> None:
+        self.scan_running = False
+        self._set_loading(summary, False)
+
     def open_trailer(self) -> None:
         movie = self.selected_movie
         if not movie:
             return
+        import webbrowser
+
         webbrowser.open(f"https://www.youtube.com/results?search_query={movie.name}+{movie.year}+official+trailer")
 
     def play_selected_movie(self) -> None:
@@ -470,6 +1120,69 @@ class MovieCollectionManager:
         except OSError as exc:
             messagebox.showerror("Play Movie", f"Unable to play movie: {exc}")
 
+    def toggle_diagnostics(self) -> None:
+        if self.diagnostics_window is not None:
+            self.diagnostics_window.destroy()
+            self.diagnostics_window = None
+            return
+        window = tk.Toplevel(self.root)
+        window.title("Diagnostics")
+        window.geometry("640x420")
+        text = tk.Text(window, font=("Courier", 10), wrap="none")
+        text.pack(fill="both", expand=True)
+        window.protocol("WM_DELETE_WINDOW", self.toggle_diagnostics)
+        self.diagnostics_window = window
+
+        def update() -> None:
+            if self.diagnostics_window is not window:
+                return
+            if metrics.ENABLED:
+                report = metrics.format_report()
+            else:
+                report = "Metrics are disabled. Start the app with MOVIE_METRICS=1 to collect timings."
+            text.configure(state="normal")
+            text.delete("1.0", "end")
+            text.insert("1.0", report)
+            text.configure(state="disabled")
+            window.after(1000, update)
+
+        update()
+
+    def shutdown(self) -> None:
+        if self.metrics_reporter is not None:
+            self.metrics_reporter.stop()
+        if self.enricher is not None:
+            self.enricher.stop()
+        # Merge another window's last writes before the executors go away, so
+        # the final save below is written on top of them.
+        if self.watcher is not None:
+            self.watcher.stop()
+            if self.repo.has_external_changes():
+                try:
+                    incoming, signature = self.repo.read_external()
+                    self._apply_external(diff_movies(self.movies, incoming), signature, closing=True)
+                except Exception as exc:
+                    messagebox.showwarning("Sync", f"Could not merge changes from another window: {exc}")
+        self.query_generation += 1
+        self.query_executor.shutdown(wait=False, cancel_futures=True)
+        self.poster_scheduler.shutdown()
+        if self.decode_pool is not None:
+            self.decode_pool.shutdown(wait=False, cancel_futures=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self._closing = True
+        if self._async_client is not None:
+            async_tmdb, loop_bridge = self._async_client
+            loop_bridge.stop(async_tmdb.close())
+        if self.library_loaded:
+            self._schedule_save()
+        if not self.autosave.stop(timeout=10):
+            messagebox.showwarning("Save", "Some changes could not be written before closing")
+        self.poster_disk_cache.flush()
+        if self._tmdb is not None:
+            self._tmdb.close()
+        self.repo.close()
+        self.root.destroy()
+
     def toggle_theme(self) -> None:
         if not ctk:
             return
@@ -480,17 +1193,34 @@ class MovieCollectionManager:
         self.repo.save_settings(self.settings)
 
 
-def main() -> None:
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Movie Collection Manager")
+    parser.add_argument("--startup-report", action="store_true", help="print startup timings as JSON and exit once the library has loaded")
+    parser.add_argument("--startup-budget", type=float, metavar="MS", help="with --startup-report, exit 1 when time-to-first-paint exceeds MS")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
     root = tk.Tk()
     if os.name == "nt":
         try:
             subprocess.run(["chcp", "65001"], check=False, capture_output=True)
         except Exception:
             pass
-    app = MovieCollectionManager(root)
-    root.protocol("WM_DELETE_WINDOW", lambda: (app.executor.shutdown(wait=False, cancel_futures=True), root.destroy()))
+    app = MovieCollectionManager(root, started=started)
+    root.protocol("WM_DELETE_WINDOW", app.shutdown)
+    status = [0]
+    if args.startup_report:
+        def report(times: dict[str, float]) -> None:
+            times["loaded_modules"] = len(sys.modules)
+            print(json.dumps({name: round(value, 1) for name, value in times.items()}, indent=2))
+            if args.startup_budget is not None and times["first_paint_ms"] > args.startup_budget:
+                status[0] = 1
+            app.shutdown()
+
+        app.on_startup_complete = report
     root.mainloop()
+    return status[0]
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import operator
+import sys
+from array import array
+from itertools import compress
+from typing import Dict, Iterable, Iterator, List, Set
+
+from models import Movie
+
+FLAGS = ("watched", "favorite", "watchlist")
+
+MODE_FLAGS = {
+    "Watched": ("watched", True),
+    "Unwatched": ("watched", False),
+    "Favorites": ("favorite", True),
+    "Watchlist": ("watchlist", True),
+}
+
+# TMDB ids are positive, so -1 marks "not matched" without confusing it with 0.
+MISSING_ID = -1
+
+
+class MovieRow:
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "MovieTable", index: int) -> None:
+        self._table = table
+        self._index = index
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def uid(self) -> str:
+        return self._table.uids[self._index]
+
+    @property
+    def name(self) -> str:
+        return self._table.names[self._index]
+
+    @property
+    def year(self) -> str:
+        return self._table.year_text(self._index)
+
+    @property
+    def genre(self) -> str:
+        return self._table.genres[self._index]
+
+    @property
+    def rating(self) -> float:
+        return self._table.ratings[self._index]
+
+    @property
+    def watched(self) -> bool:
+        return self._table.flag(self._index, "watched")
+
+    @property
+    def favorite(self) -> bool:
+        return self._table.flag(self._index, "favorite")
+
+    @property
+    def watchlist(self) -> bool:
+        return self._table.flag(self._index, "watchlist")
+
+    @property
+    def poster_path(self) -> str:
+        return self._table.poster_paths[self._index]
+
+    @property
+    def file_path(self) -> str:
+        return self._table.file_paths[self._index]
+
+    @property
+    def tmdb_id(self) -> int | None:
+        value = self._table.tmdb_ids[self._index]
+        return None if value == MISSING_ID else value
+
+    def to_movie(self) -> Movie:
+        return self._table.to_movie(self._index)
+
+    def __repr__(self) -> str:
+        return f"MovieRow({self.name!r}, {self.year!r})"
+
+
+class MovieTable:
+    def __init__(self, movies: Iterable[Movie] = ()) -> None:
+        self.uids: List[str] = []
+        self.names: List[str] = []
+        self.names_lower: List[str] = []
+        self.genres: List[str] = []
+        self.poster_paths: List[str] = []
+        self.file_paths: List[str] = []
+        self.years = array("H")
+        self.ratings = array("d")
+        self.tmdb_ids = array("q")
+        self.odd_years: Dict[int, str] = {}
+        # One byte per row rather than a big-int bitset: setting a bit in a
+        # Python int copies the whole int, which made bulk loads quadratic.
+        self.flags: Dict[str, bytearray] = {name: bytearray() for name in FLAGS}
+        self.alive = bytearray()
+        self._positions: Dict[str, int] = {}
+        self.extend(movies)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __iter__(self) -> Iterator[MovieRow]:
+        return (MovieRow(self, i) for i in self.indices())
+
+    def __contains__(self, uid: str) -> bool:
+        return uid in self._positions
+
+    def extend(self, movies: Iterable[Movie]) -> None:
+        for movie in movies:
+            self.upsert(movie)
+
+    def upsert(self, movie: Movie) -> int:
+        index = self._positions.get(movie.uid)
+        if index is None:
+            index = len(self.uids)
+            self._positions[movie.uid] = index
+            self.uids.append(movie.uid)
+            self.names.append("")
+            self.names_lower.append("")
+            self.genres.append("")
+            self.poster_paths.append("")
+            self.file_paths.append("")
+            self.years.append(0)
+            self.ratings.append(0.0)
+            self.tmdb_ids.append(MISSING_ID)
+            self.alive.append(0)
+            for flags in self.flags.values():
+                flags.append(0)
+        self._write(index, movie)
+        return index
+
+    def remove(self, uid: str) -> None:
+        index = self._positions.pop(uid, None)
+        if index is None:
+            return
+        self.alive[index] = 0
+        for flags in self.flags.values():
+            flags[index] = 0
+        self.names[index] = self.names_lower[index] = ""
+        self.genres[index] = self.poster_paths[index] = self.file_paths[index] = ""
+        self.odd_years.pop(index, None)
+
+    def row(self, uid: str) -> MovieRow | None:
+        index = self._positions.get(uid)
+        return MovieRow(self, index) if index is not None else None
+
+    def flag(self, index: int, name: str) -> bool:
+        return bool(self.flags[name][index])
+
+    def year_text(self, index: int) -> str:
+        odd = self.odd_years.get(index)
+        if odd is not None:
+            return odd
+        year = self.years[index]
+        return str(year) if year else ""
+
+    def to_movie(self, index: int) -> Movie:
+        return Movie(
+            self.names[index],
+            self.year_text(index),
+            self.genres[index],
+            self.ratings[index],
+            self.flag(index, "watched"),
+            self.flag(index, "favorite"),
+            self.flag(index, "watchlist"),
+            self.poster_paths[index],
+            self.file_paths[index],
+            None if self.tmdb_ids[index] == MISSING_ID else self.tmdb_ids[index],
+            self.uids[index],
+        )
+
+    def to_movies(self) -> List[Movie]:
+        return [self.to_movie(i) for i in self.indices()]
+
+    def indices(self, mode: str = "All") -> List[int]:
+        return list(compress(range(len(self.alive)), self._mask(mode)))
+
+    def mode_uids(self, mode: str) -> Set[str]:
+        return set(compress(self.uids, self._mask(mode)))
+
+    def _mask(self, mode: str) -> Iterable[int]:
+        flag = MODE_FLAGS.get(mode)
+        if flag is None:
+            return self.alive
+        name, wanted = flag
+        return map(operator.and_ if wanted else operator.gt, self.alive, self.flags[name])
+
+    def query(self, search: str = "", mode: str = "All", sort: str = "Title") -> List[int]:
+        indices = self.indices(mode)
+
+        search = search.strip().lower()
+        if search:
+            names_lower = self.names_lower
+            indices = [i for i in indices if search in names_lower[i]]
+
+        if sort == "Year":
+            years = self.years
+            indices.sort(key=lambda i: years[i], reverse=True)
+        elif sort == "Rating":
+            ratings = self.ratings
+            indices.sort(key=lambda i: ratings[i], reverse=True)
+        else:
+            names_lower = self.names_lower
+            indices.sort(key=names_lower.__getitem__)
+        return indices
+
+    def query_rows(self, search: str = "", mode: str = "All", sort: str = "Title") -> List[MovieRow]:
+        return [MovieRow(self, i) for i in self.query(search, mode, sort)]
+
+    def _write(self, index: int, movie: Movie) -> None:
+        name = sys.intern(movie.name)
+        self.names[index] = name
+        self.names_lower[index] = sys.intern(name.lower())
+        self.genres[index] = sys.intern(movie.genre)
+        self.poster_paths[index] = movie.poster_path
+        self.file_paths[index] = movie.file_path
+        self.ratings[index] = movie.rating
+        self.tmdb_ids[index] = MISSING_ID if movie.tmdb_id is None else movie.tmdb_id
+
+        year = movie.year
+        self.odd_years.pop(index, None)
+        if year.isdigit() and 0 < int(year) < 65536 and str(int(year)) == year:
+            self.years[index] = int(year)
+        else:
+            self.years[index] = 0
+            if year:
+                self.odd_years[index] = year
+
+        self.alive[index] = 1
+        flags = self.flags
+        flags["watched"][index] = movie.watched
+        flags["favorite"][index] = movie.favorite
+        flags["watchlist"][index] = movie.watchlist
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Tuple
+
+
+class PosterCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Hashable, Tuple[object, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: object, size: int) -> None:
+        if size <= 0:
+            raise ValueError(f"Poster cache entries need a positive size, got {size}")
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._items[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._items) > 1:
+                _oldest, (_value, evicted_size) = self._items.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "items": len(self._items),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class PosterDiskCache:
+    INDEX_NAME = "index.json"
+
+    def __init__(self, directory: str = "poster_cache", max_bytes: int = 200 * 1024 * 1024, flush_every: int = 32) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._flush_every = flush_every
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._pending = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def get_raw(self, poster_path: str) -> bytes | None:
+        return self._read(self._key(poster_path, "raw"))
+
+    def put_raw(self, poster_path: str, data: bytes) -> None:
+        self._write(self._key(poster_path, "raw"), data)
+
+    def get_thumbnail(self, poster_path: str, size: Tuple[int, int]) -> bytes | None:
+        return self._read(self._key(poster_path, f"{size[0]}x{size[1]}"))
+
+    def put_thumbnail(self, poster_path: str, size: Tuple[int, int], data: bytes) -> None:
+        self._write(self._key(poster_path, f"{size[0]}x{size[1]}"), data)
+
+    def flush(self) -> None:
+        with self._lock:
+            entries = list(self._entries.items())
+            self._pending = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as temp:
+                json.dump({"version": 1, "entries": entries}, temp)
+            os.replace(temp_path, os.path.join(self.directory, self.INDEX_NAME))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def clear(self) -> None:
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+            self._total = 0
+        for key in keys:
+            self._remove_file(key)
+        self.flush()
+
+    @staticmethod
+    def _key(poster_path: str, variant: str) -> str:
+        digest = hashlib.sha1(poster_path.encode("utf-8")).hexdigest()
+        return f"{digest}.{variant}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _read(self, key: str) -> bytes | None:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            self._mark_dirty()
+        try:
+            with open(self._path(key), "rb") as handle:
+                return handle.read()
+        except OSError:
+            with self._lock:
+                self._total -= self._entries.pop(key, 0)
+            return None
+
+    def _write(self, key: str, data: bytes) -> None:
+        if not data or len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as temp:
+                temp.write(data)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        evicted = []
+        with self._lock:
+            self._total -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total += len(data)
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                oldest, size = self._entries.popitem(last=False)
+                self._total -= size
+                evicted.append(oldest)
+            self._mark_dirty()
+        for oldest in evicted:
+            self._remove_file(oldest)
+
+    def _remove_file(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _mark_dirty(self) -> None:
+        self._pending += 1
+        if self._pending >= self._flush_every:
+            self._pending = 0
+            threading.Thread(target=self.flush, name="poster-index-flush", daemon=True).start()
+
+    def wait_for_reconcile(self, timeout: float | None = None) -> None:
+        self._reconciler.join(timeout)
+
+    def _load_index(self) -> None:
+        # Startup only reads the index; a file that has gone missing is
+        # dropped when it is read, and the directory scan for anything the
+        # lazily flushed index missed runs off the constructing thread.
+        index_path = os.path.join(self.directory, self.INDEX_NAME)
+        try:
+            with open(index_path, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+            entries = payload.get("entries", []) if isinstance(payload, dict) else []
+            for key, size in entries:
+                self._entries[str(key)] = int(size)
+        except (OSError, ValueError, TypeError):
+            self._entries.clear()
+        self._total = sum(self._entries.values())
+        self._reconciler = threading.Thread(target=self._reconcile, name="poster-cache-reconcile", daemon=True)
+        self._reconciler.start()
+
+    def _reconcile(self) -> None:
+        try:
+            found = self._scan_files()
+        except OSError:
+            return
+        with self._lock:
+            listed = [key for key in self._entries if key not in found]
+        missing = [key for key in listed if not os.path.exists(self._path(key))]
+        evicted = []
+        with self._lock:
+            for key in missing:
+                self._total -= self._entries.pop(key, 0)
+            # Files the index never heard of predate it, so they go to the
+            # least recently used end, newest last.
+            adopted = [key for key in found if key not in self._entries]
+            for key in sorted(adopted, key=lambda key: found[key][0], reverse=True):
+                self._entries[key] = found[key][1]
+                self._entries.move_to_end(key, last=False)
+                self._total += found[key][1]
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                oldest, size = self._entries.popitem(last=False)
+                self._total -= size
+                evicted.append(oldest)
+        for key in evicted:
+            self._remove_file(key)
+        if missing or adopted or evicted:
+            self.flush()
+
+    def _scan_files(self) -> Dict[str, Tuple[float, int]]:
+        found: Dict[str, Tuple[float, int]] = {}
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                if entry.name.endswith(".tmp"):
+                    # Left behind by a write interrupted before os.replace.
+                    if stat.st_mtime < time.time() - 60:
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
+                    continue
+                found[entry.name] = (stat.st_mtime, stat.st_size)
+        return found
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from io import BytesIO
+from typing import List, Sequence, Tuple
+
+from PIL import Image
+
+DecodedPoster = Tuple[str, Tuple[int, int], bytes, bytes | None]
+
+
+def decode_poster(kind: str, data: bytes, size: Tuple[int, int], encode_thumbnail: bool = True) -> DecodedPoster:
+    image = Image.open(BytesIO(data))
+    if kind == "thumbnail":
+        image = image.convert("RGB")
+        return image.mode, image.size, image.tobytes(), None
+
+    if image.format == "JPEG":
+        image.draft("RGB", size)
+    image = image.convert("RGB")
+    image.thumbnail(size, Image.Resampling.LANCZOS)
+    thumbnail = None
+    if encode_thumbnail:
+        encoded = BytesIO()
+        image.save(encoded, format="JPEG", quality=90)
+        thumbnail = encoded.getvalue()
+    return image.mode, image.size, image.tobytes(), thumbnail
+
+
+def decode_batch(jobs: Sequence[Tuple[str, bytes]], size: Tuple[int, int]) -> List[DecodedPoster | str]:
+    results: List[DecodedPoster | str] = []
+    for kind, data in jobs:
+        try:
+            results.append(decode_poster(kind, data, size))
+        except Exception as exc:
+            results.append(f"{type(exc).__name__}: {exc}")
+    return results
+
+
+def to_image(decoded: DecodedPoster) -> Image.Image:
+    mode, size, pixels, _thumbnail = decoded
+    return Image.frombytes(mode, size, pixels)
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import math
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, List, Sequence
+
+try:
+    import customtkinter as ctk
+except Exception:
+    ctk = None
+
+import metrics
+from models import Movie
+
+_NO_IMAGE = None if ctk else ""
+
+
+class PosterCard:
+    def __init__(self, parent: tk.Widget, on_select: Callable[[Movie], None], on_activate: Callable[[Movie], None]) -> None:
+        self.movie: Movie | None = None
+        self.generation = 0
+        self.frame = ctk.CTkFrame(parent, corner_radius=10) if ctk else ttk.Frame(parent, relief="ridge", borderwidth=1)
+        self.poster_label = ctk.CTkLabel(self.frame, text="Loading...", width=140, height=200) if ctk else ttk.Label(self.frame, text="Loading...", width=20)
+        self.poster_label.pack(padx=6, pady=6)
+        self.title = ctk.CTkLabel(self.frame, text="", width=160, wraplength=150) if ctk else ttk.Label(self.frame, text="", width=24)
+        self.title.pack(padx=6, pady=(0, 4))
+        self.badge = ctk.CTkLabel(self.frame, text="") if ctk else ttk.Label(self.frame, text="")
+        self.badge.pack(pady=(0, 6))
+
+        for widget in (self.frame, *self.frame.winfo_children()):
+            widget.bind("<Button-1>", lambda _e: self.movie and on_select(self.movie))
+            widget.bind("<Double-Button-1>", lambda _e: self.movie and on_activate(self.movie))
+        self.frame.bind("<Enter>", lambda _e: self._animate_bg(0))
+        self.frame.bind("<Leave>", lambda _e: self._animate_bg(1))
+
+    def bind(self, movie: Movie) -> int:
+        self.movie = movie
+        self.generation += 1
+        self.title.configure(text=f"{movie.name}\n{movie.year} ★{movie.rating:.1f}")
+        flags = []
+        if movie.favorite:
+            flags.append("❤️")
+        if movie.watchlist:
+            flags.append("📌")
+        if movie.watched:
+            flags.append("✅")
+        self.badge.configure(text=" ".join(flags))
+        self.poster_label.configure(image=_NO_IMAGE, text="Loading...")
+        return self.generation
+
+    def unbind(self) -> None:
+        self.movie = None
+        self.generation += 1
+
+    def is_current(self, generation: int) -> bool:
+        return self.generation == generation
+
+    def set_poster(self, generation: int, image: object) -> None:
+        if self.is_current(generation) and self.poster_label.winfo_exists():
+            self.poster_label.configure(image=image, text="")
+
+    def set_poster_text(self, generation: int, text: str) -> None:
+        if self.is_current(generation) and self.poster_label.winfo_exists():
+            self.poster_label.configure(image=_NO_IMAGE, text=text)
+
+    def _animate_bg(self, direction: int) -> None:
+        if not ctk:
+            return
+        colors = ["#2b2e3b", "#343849"] if ctk.get_appearance_mode() == "Dark" else ["#e7ecf3", "#d7dfeb"]
+        self.frame.configure(fg_color=colors[direction])
+
+
+class VirtualPosterGrid:
+    CELL_WIDTH = 190
+    DEFAULT_ROW_HEIGHT = 300
+    OVERSCAN_ROWS = 1
+
+    def __init__(
+        self,
+        canvas: tk.Canvas,
+        scrollbar: ttk.Scrollbar,
+        bind_card: Callable[[PosterCard, Movie, int], None],
+        on_select: Callable[[Movie], None],
+        on_activate: Callable[[Movie], None],
+        on_release: Callable[[PosterCard], None] | None = None,
+        on_viewport: Callable[[], None] | None = None,
+    ) -> None:
+        self.canvas = canvas
+        self.scrollbar = scrollbar
+        self._bind_card = bind_card
+        self._on_select = on_select
+        self._on_activate = on_activate
+        self._on_release = on_release
+        self._on_viewport = on_viewport
+        self._card_index: Dict[int, int] = {}
+        self._visible_rows = (0, 0)
+        self._items: Sequence[Movie] = []
+        self._pool: List[PosterCard] = []
+        self._windows: Dict[int, int] = {}
+        self._assigned: Dict[int, PosterCard] = {}
+        self._row_height = 0
+        self._columns = 1
+        self._update_pending = False
+
+        self.scrollbar.configure(command=self._on_scrollbar)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.bind("<Configure>", lambda _e: self.relayout())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def columns(self) -> int:
+        return self._columns
+
+    def set_items(self, items: Sequence[Movie], keep_position: bool = False) -> None:
+        self._items = items
+        self._release_all()
+        if not keep_position:
+            self.canvas.yview_moveto(0)
+        self.relayout()
+
+    def refresh_items(self, uids: set[str] | None = None) -> None:
+        for index, card in list(self._assigned.items()):
+            if index >= len(self._items):
+                continue
+            movie = self._items[index]
+            if uids is None or movie.uid in uids or (card.movie is not None and card.movie.uid in uids):
+                self._bind_card(card, movie, card.bind(movie))
+
+    def priority(self, card_id: int) -> int | None:
+        index = self._card_index.get(card_id)
+        if index is None:
+            return None
+        row = index // self._columns
+        first, last = self._visible_rows
+        if row < first:
+            return first - row
+        if row > last:
+            return row - last
+        return 0
+
+    def scroll(self, units: int) -> None:
+        self.canvas.yview_scroll(units, "units")
+        self.schedule_update()
+
+    def relayout(self) -> None:
+        width = max(260, self.canvas.winfo_width())
+        columns = max(1, width // self.CELL_WIDTH)
+        if columns != self._columns:
+            self._columns = columns
+            self._release_all()
+        rows = math.ceil(len(self._items) / self._columns)
+        height = max(rows * self._cell_height(), self.canvas.winfo_height())
+        self.canvas.configure(scrollregion=(0, 0, width, height), yscrollincrement=self._cell_height() // 4)
+        self._update_visible(force_positions=True)
+        if not self._row_height and self._pool:
+            self._pool[0].frame.update_idletasks()
+            self._row_height = self._pool[0].frame.winfo_reqheight() + 16
+            self.relayout()
+
+    def schedule_update(self) -> None:
+        if not self._update_pending:
+            self._update_pending = True
+            self.canvas.after_idle(self._update_visible)
+
+    def _on_scrollbar(self, *args) -> None:
+        self.canvas.yview(*args)
+        self.schedule_update()
+
+    def _cell_height(self) -> int:
+        return self._row_height or self.DEFAULT_ROW_HEIGHT
+
+    def _visible_range(self) -> range:
+        row_height = self._cell_height()
+        top = self.canvas.canvasy(0)
+        bottom = top + max(1, self.canvas.winfo_height())
+        self._visible_rows = (int(top // row_height), max(0, int(math.ceil(bottom / row_height)) - 1))
+        first_row = max(0, int(top // row_height) - self.OVERSCAN_ROWS)
+        last_row = int(math.ceil(bottom / row_height)) + self.OVERSCAN_ROWS
+        start = first_row * self._columns
+        return range(start, min(len(self._items), last_row * self._columns))
+
+    @metrics.timed("grid.update_visible")
+    def _update_visible(self, force_positions: bool = False) -> None:
+        self._update_pending = False
+        wanted = self._visible_range()
+        self._assigned = {index: card for index, card in self._assigned.items() if index in wanted}
+        assigned_ids = {id(card) for card in self._assigned.values()}
+        free = [card for card in self._pool if id(card) not in assigned_ids]
+
+        cell_width = max(self.CELL_WIDTH, self.canvas.winfo_width() // self._columns)
+        row_height = self._cell_height()
+        for index in wanted:
+            card = self._assigned.get(index)
+            fresh = card is None
+            if fresh:
+                card = free.pop() if free else self._new_card()
+                self._assigned[index] = card
+                self._card_index[id(card)] = index
+                movie = self._items[index]
+                with metrics.span("grid.bind_card"):
+                    self._bind_card(card, movie, card.bind(movie))
+            if fresh or force_positions:
+                row, col = divmod(index, self._columns)
+                window = self._windows[id(card)]
+                self.canvas.coords(window, col * cell_width + cell_width // 2, row * row_height + 8)
+                self.canvas.itemconfigure(window, state="normal")
+
+        for card in free:
+            self._release(card)
+        if self._on_viewport is not None:
+            self._on_viewport()
+
+    @metrics.timed("grid.new_card")
+    def _new_card(self) -> PosterCard:
+        card = PosterCard(self.canvas, self._on_select, self._on_activate)
+        self._pool.append(card)
+        self._windows[id(card)] = self.canvas.create_window(0, 0, window=card.frame, anchor="n", state="hidden")
+        return card
+
+    def _release_all(self) -> None:
+        for card in self._assigned.values():
+            self._release(card)
+        self._assigned.clear()
+
+    def _release(self, card: PosterCard) -> None:
+        self._card_index.pop(id(card), None)
+        if card.movie is not None and self._on_release is not None:
+            self._on_release(card)
+        card.unbind()
+        self.canvas.itemconfigure(self._windows[id(card)], state="hidden")
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+
+@dataclass
+class PosterRequest:
+    token: Hashable
+    poster_path: str
+    priority: float
+    on_ready: Callable[[Any], None]
+    on_error: Callable[[str], None]
+    payload: Any = None
+    cancelled: bool = False
+    seq: int = field(default=0, compare=False)
+
+
+class _Lane:
+    def __init__(
+        self,
+        name: str,
+        workers: int,
+        handle: Callable[[List[PosterRequest]], None],
+        batch_size: int = 1,
+    ) -> None:
+        self._heap: List[tuple] = []
+        self._cond = threading.Condition()
+        self._handle = handle
+        self._batch_size = batch_size
+        self._stopped = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return sum(1 for _p, _s, request in self._heap if not request.cancelled)
+
+    def push(self, request: PosterRequest) -> None:
+        with self._cond:
+            heapq.heappush(self._heap, (request.priority, request.seq, request))
+            self._cond.notify()
+
+    def reprioritize(self, priority_of: Callable[[PosterRequest], float | None]) -> None:
+        with self._cond:
+            entries = []
+            for _priority, seq, request in self._heap:
+                if request.cancelled:
+                    continue
+                priority = priority_of(request)
+                if priority is None:
+                    request.cancelled = True
+                    continue
+                request.priority = priority
+                entries.append((priority, seq, request))
+            heapq.heapify(entries)
+            self._heap = entries
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._heap.clear()
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                batch: List[PosterRequest] = []
+                while self._heap and len(batch) < self._batch_size:
+                    _priority, _seq, request = heapq.heappop(self._heap)
+                    if not request.cancelled:
+                        batch.append(request)
+            if not batch:
+                continue
+            try:
+                self._handle(batch)
+            except Exception as exc:
+                for request in batch:
+                    if not request.cancelled:
+                        request.on_error(str(exc))
+
+
+class _Group:
+    def __init__(self, request: PosterRequest) -> None:
+        self.waiters = [request]
+
+    def live(self) -> List[PosterRequest]:
+        return [request for request in self.waiters if not request.cancelled]
+
+
+class PosterScheduler:
+    def __init__(
+        self,
+        fetch: Callable[[str], Any],
+        decode: Callable[[List[Tuple[str, Any]]], List[Any]],
+        network_workers: int = 4,
+        decode_workers: int = 2,
+        decode_batch_size: int = 4,
+    ) -> None:
+        self._fetch = fetch
+        self._decode = decode
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._active: Dict[Hashable, PosterRequest] = {}
+        # Poster paths whose fetch or decode is under way; later requests for
+        # the same path wait on the group instead of fetching it again.
+        self._groups: Dict[str, _Group] = {}
+        self.network = _Lane("poster-fetch", network_workers, self._run_fetch)
+        self.decoder = _Lane("poster-decode", decode_workers, self._run_decode, decode_batch_size)
+
+    def submit(
+        self,
+        token: Hashable,
+        poster_path: str,
+        priority: float,
+        on_ready: Callable[[Any], None],
+        on_error: Callable[[str], None],
+    ) -> PosterRequest:
+        request = PosterRequest(token, poster_path, priority, on_ready, on_error, seq=next(self._seq))
+        with self._lock:
+            previous = self._active.get(token)
+            if previous is not None:
+                previous.cancelled = True
+            self._active[token] = request
+            group = self._groups.get(poster_path)
+            if group is not None:
+                group.waiters.append(request)
+                return request
+        self.network.push(request)
+        return request
+
+    def cancel(self, token: Hashable) -> None:
+        with self._lock:
+            request = self._active.pop(token, None)
+        if request is not None:
+            request.cancelled = True
+
+    def reprioritize(self, priority_of: Callable[[Hashable], float | None]) -> None:
+        self.network.reprioritize(lambda request: priority_of(request.token))
+
+        def group_priority(job: PosterRequest) -> float | None:
+            group = job.token
+            with self._lock:
+                priorities = []
+                for request in group.live():
+                    priority = priority_of(request.token)
+                    if priority is None:
+                        request.cancelled = True
+                    else:
+                        request.priority = priority
+                        priorities.append(priority)
+                if not priorities and self._groups.get(job.poster_path) is group:
+                    del self._groups[job.poster_path]
+            return min(priorities, default=None)
+
+        self.decoder.reprioritize(group_priority)
+
+    def pending(self) -> Dict[str, int]:
+        return {"fetch": len(self.network), "decode": len(self.decoder)}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for request in self._active.values():
+                request.cancelled = True
+            self._active.clear()
+            self._groups.clear()
+        self.network.stop()
+        self.decoder.stop()
+
+    def _run_fetch(self, batch: List[PosterRequest]) -> None:
+        for request in batch:
+            with self._lock:
+                group = self._groups.get(request.poster_path)
+                if group is not None:
+                    group.waiters.append(request)
+                    continue
+                group = self._groups[request.poster_path] = _Group(request)
+            try:
+                payload = self._fetch(request.poster_path)
+            except Exception as exc:
+                self._deliver(group, request.poster_path, exc)
+                continue
+            with self._lock:
+                live = group.live()
+                if not live:
+                    self._close_group(group, request.poster_path)
+                    continue
+                job = PosterRequest(
+                    group,
+                    request.poster_path,
+                    min(waiter.priority for waiter in live),
+                    request.on_ready,
+                    request.on_error,
+                    payload=payload,
+                    seq=next(self._seq),
+                )
+            self.decoder.push(job)
+
+    def _run_decode(self, batch: List[PosterRequest]) -> None:
+        try:
+            results = self._decode([(job.poster_path, job.payload) for job in batch])
+        except Exception as exc:
+            results = [exc] * len(batch)
+        for job, result in zip(batch, results):
+            job.payload = None
+            self._deliver(job.token, job.poster_path, result)
+
+    def _deliver(self, group: _Group, poster_path: str, result: Any) -> None:
+        with self._lock:
+            self._close_group(group, poster_path)
+        for request in group.waiters:
+            if request.cancelled:
+                continue
+            if isinstance(result, Exception):
+                request.on_error(str(result))
+            else:
+                request.on_ready(result)
+
+    def _close_group(self, group: _Group, poster_path: str) -> None:
+        if self._groups.get(poster_path) is group:
+            del self._groups[poster_path]
+        for request in group.waiters:
+            if self._active.get(request.token) is request:
+                del self._active[request.token]
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import math
+import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+
+from facet_index import UNRATED, rating_bucket
+from genre_catalog import split_genres
+from models import Movie
+
+CAST_WEIGHTS = (1.0, 0.9, 0.8, 0.7, 0.6, 0.5)
+DIRECTOR_WEIGHT = 1.5
+GENRE_WEIGHT = 1.2
+DECADE_WEIGHT = 0.5
+HALF_DECADE_WEIGHT = 0.5
+RATING_WEIGHT = 0.4
+# Without NumPy, postings longer than this (genres, decades, rating buckets)
+# only add to movies already reached through rarer features, plus their first
+# MAX_POSTING_SCAN entries, instead of being walked in full.
+MAX_POSTING_SCAN = 2000
+
+Credits = Tuple[Tuple[int, ...], Tuple[int, ...]]
+
+_numpy: Any = None
+
+
+def _numpy_module():
+    # NumPy is optional and slow to import, so it is resolved on the first
+    # query (or by the app's warm-up thread) instead of at import time.
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+
+def credit_features(payload: Dict[str, Any]) -> Credits:
+    cast = []
+    for member in sorted(payload.get("cast") or [], key=lambda item: item.get("order", 999)):
+        if isinstance(member.get("id"), int):
+            cast.append(member["id"])
+        if len(cast) >= len(CAST_WEIGHTS):
+            break
+    directors = tuple(
+        member["id"]
+        for member in payload.get("crew") or []
+        if member.get("job") == "Director" and isinstance(member.get("id"), int)
+    )
+    return tuple(cast), directors
+
+
+def movie_features(
+    movie: Movie,
+    credits: Credits | None = None,
+    normalize_genre: Callable[[str], str] | None = None,
+) -> Dict[str, float]:
+    features: Dict[str, float] = {}
+    if credits is not None:
+        cast, directors = credits
+        for weight, person in zip(CAST_WEIGHTS, cast):
+            features[f"cast:{person}"] = weight
+        for person in directors:
+            features[f"director:{person}"] = DIRECTOR_WEIGHT
+    genre = normalize_genre(movie.genre) if normalize_genre is not None else movie.genre
+    genres = split_genres(genre.lower())
+    for name in genres:
+        features[f"genre:{name}"] = GENRE_WEIGHT / math.sqrt(len(genres))
+    year = movie.year[:4]
+    if year.isdigit():
+        features[f"decade:{int(year) // 10}"] = DECADE_WEIGHT
+        features[f"half:{int(year) // 5}"] = HALF_DECADE_WEIGHT
+    bucket = rating_bucket(movie.rating)
+    if bucket != UNRATED:
+        features[f"rating:{bucket}"] = RATING_WEIGHT
+    norm = math.sqrt(sum(weight * weight for weight in features.values()))
+    return {name: weight / norm for name, weight in features.items()} if norm else {}
+
+
+class CreditStore:
+    def __init__(self, tmdb, cache_file: str = "credit_features.json") -> None:
+        self.tmdb = tmdb
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._credits: Dict[int, Credits] = {}
+        self._dirty = False
+        self._load()
+
+    def get(self, tmdb_id: int | None) -> Credits | None:
+        if tmdb_id is None:
+            return None
+        with self._lock:
+            credits = self._credits.get(tmdb_id)
+        if credits is not None:
+            return credits
+        # Only the response cache is consulted; credits are fetched by
+        # enrichment, never while answering a query.
+        payload = self.tmdb.cached_json(f"movie/{tmdb_id}/credits") if self.tmdb is not None else None
+        if not isinstance(payload, dict):
+            return None
+        credits = credit_features(payload)
+        with self._lock:
+            self._credits[tmdb_id] = credits
+            self._dirty = True
+        return credits
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {str(key): [list(cast), list(directors)] for key, (cast, directors) in self._credits.items()}
+            self._dirty = False
+        directory = os.path.dirname(self.cache_file) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as temp:
+                json.dump(payload, temp)
+            os.replace(temp_path, self.cache_file)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _load(self) -> None:
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except (OSError, json.JSONDecodeError):
+            return
+        if not isinstance(payload, dict):
+            return
+        for key, value in payload.items():
+            try:
+                cast, directors = value
+                self._credits[int(key)] = (tuple(int(v) for v in cast), tuple(int(v) for v in directors))
+            except (TypeError, ValueError):
+                continue
+
+
+class SimilarityIndex:
+    def __init__(
+        self,
+        movies: Iterable[Movie] = (),
+        credits: Callable[[int | None], Credits | None] | None = None,
+        normalize_genre: Callable[[str], str] | None = None,
+    ) -> None:
+        self.credits = credits
+        self.normalize_genre = normalize_genre
+        self._lock = threading.RLock()
+        self._slots: Dict[str, int] = {}
+        self._uids: List[str | None] = []
+        self._free: List[int] = []
+        self._vectors: List[Dict[int, float]] = []
+        self._feature_ids: Dict[str, int] = {}
+        self._postings: List[Dict[int, float]] = []
+        self._arrays: Dict[int, Tuple[Any, Any]] = {}
+        for movie in movies:
+            self.add(movie)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, uid: object) -> bool:
+        return uid in self._slots
+
+    def add(self, movie: Movie) -> None:
+        credits = self.credits(movie.tmdb_id) if self.credits is not None else None
+        features = movie_features(movie, credits, self.normalize_genre)
+        with self._lock:
+            vector = {self._feature_id(name): weight for name, weight in features.items()}
+            slot = self._slots.get(movie.uid)
+            if slot is None:
+                slot = self._free.pop() if self._free else len(self._uids)
+                if slot == len(self._uids):
+                    self._uids.append(movie.uid)
+                    self._vectors.append({})
+                else:
+                    self._uids[slot] = movie.uid
+                self._slots[movie.uid] = slot
+            old = self._vectors[slot]
+            for fid in old:
+                if fid not in vector:
+                    del self._postings[fid][slot]
+                    self._arrays.pop(fid, None)
+            for fid, weight in vector.items():
+                if old.get(fid) != weight:
+                    self._postings[fid][slot] = weight
+                    self._arrays.pop(fid, None)
+            self._vectors[slot] = vector
+
+    def remove(self, uid: str) -> None:
+        with self._lock:
+            slot = self._slots.pop(uid, None)
+            if slot is None:
+                return
+            for fid in self._vectors[slot]:
+                del self._postings[fid][slot]
+                self._arrays.pop(fid, None)
+            self._vectors[slot] = {}
+            self._uids[slot] = None
+            self._free.append(slot)
+
+    def rebuild(self, movies: Iterable[Movie]) -> None:
+        with self._lock:
+            self._slots.clear()
+            self._uids.clear()
+            self._free.clear()
+            self._vectors.clear()
+            self._feature_ids.clear()
+            self._postings.clear()
+            self._arrays.clear()
+        for movie in movies:
+            self.add(movie)
+
+    def more_like(self, uid: str, limit: int = 12, exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        with self._lock:
+            slot = self._slots.get(uid)
+            if slot is None:
+                return []
+            skip = {self._slots[item] for item in exclude if item in self._slots}
+            skip.add(slot)
+            return self._top(self._vectors[slot], limit, skip)
+
+    def watch_next(self, liked: Iterable[str], candidates: Iterable[str], limit: int = 12) -> List[Tuple[str, float]]:
+        with self._lock:
+            profile: Dict[int, float] = {}
+            for uid in liked:
+                slot = self._slots.get(uid)
+                if slot is None:
+                    continue
+                for fid, weight in self._vectors[slot].items():
+                    profile[fid] = profile.get(fid, 0.0) + weight
+            norm = math.sqrt(sum(weight * weight for weight in profile.values()))
+            if not norm:
+                return []
+            allowed = {self._slots[uid] for uid in candidates if uid in self._slots}
+            if not allowed:
+                return []
+            return self._top({fid: weight / norm for fid, weight in profile.items()}, limit, set(), allowed)
+
+    def _top(
+        self, vector: Dict[int, float], limit: int, skip: Set[int], allowed: Set[int] | None = None
+    ) -> List[Tuple[str, float]]:
+        # Both backends add features rarest first and break ties by slot, so
+        # they produce the same ranking.
+        features = sorted(vector.items(), key=lambda item: len(self._postings[item[0]]))
+        np = _numpy_module()
+        if np is not None:
+            scores = np.zeros(len(self._uids))
+            for fid, weight in features:
+                slots, weights = self._posting_arrays(np, fid)
+                scores[slots] += weight * weights
+            if allowed is not None:
+                mask = np.ones(len(scores), dtype=bool)
+                mask[list(allowed)] = False
+                scores[mask] = 0.0
+            if skip:
+                scores[list(skip)] = 0.0
+            count = min(limit, len(scores))
+            if count <= 0:
+                return []
+            threshold = np.partition(scores, len(scores) - count)[len(scores) - count]
+            above = np.flatnonzero(scores > threshold)
+            best = np.concatenate((above, np.flatnonzero(scores == threshold)[: count - len(above)]))
+            best = best[np.lexsort((best, -scores[best]))]
+            return [(self._uids[slot], float(scores[slot])) for slot in best if scores[slot] > 0]
+
+        totals: Dict[int, float] = {}
+        for fid, weight in features:
+            posting = self._postings[fid]
+            if allowed is not None and len(allowed) < len(posting):
+                entries: Iterable[Tuple[int, float]] = ((slot, posting[slot]) for slot in allowed if slot in posting)
+            elif allowed is None and len(posting) > MAX_POSTING_SCAN:
+                reached = [(slot, posting[slot]) for slot in totals if slot in posting]
+                seen = set(totals)
+                extra = itertools.islice(posting.items(), MAX_POSTING_SCAN)
+                entries = itertools.chain(reached, ((slot, other) for slot, other in extra if slot not in seen))
+            else:
+                entries = posting.items()
+            for slot, other in entries:
+                if allowed is None or slot in allowed:
+                    totals[slot] = totals.get(slot, 0.0) + weight * other
+        for slot in skip:
+            totals.pop(slot, None)
+        best = heapq.nsmallest(limit, totals.items(), key=lambda item: (-item[1], item[0]))
+        return [(self._uids[slot], score) for slot, score in best if score > 0]
+
+    def _posting_arrays(self, np, fid: int):
+        arrays = self._arrays.get(fid)
+        if arrays is None:
+            posting = self._postings[fid]
+            arrays = (
+                np.fromiter(posting.keys(), dtype=np.int64, count=len(posting)),
+                np.fromiter(posting.values(), dtype=np.float64, count=len(posting)),
+            )
+            self._arrays[fid] = arrays
+        return arrays
+
+    def _feature_id(self, name: str) -> int:
+        fid = self._feature_ids.get(name)
+        if fid is None:
+            fid = self._feature_ids[name] = len(self._postings)
+            self._postings.append({})
+        return fid
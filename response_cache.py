@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Tuple
+
+import metrics
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    body TEXT NOT NULL,
+    etag TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_endpoint ON responses (endpoint, fetched_at);
+"""
+
+IGNORED_PARAMS = {"api_key"}
+
+# Called with the stored ETag (or None); returns (body, etag), with a None
+# body when the server answered 304 Not Modified.
+Fetcher = Callable[[str | None], Tuple[Dict[str, Any] | None, str | None]]
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: float
+    stale: float = 0.0
+
+
+@dataclass
+class CachedResponse:
+    key: str
+    endpoint: str
+    body: Dict[str, Any]
+    etag: str | None
+    fetched_at: float
+    age: float
+
+
+def normalize_params(params: Mapping[str, Any]) -> Dict[str, str]:
+    normalized: Dict[str, str] = {}
+    for name, value in params.items():
+        if name in IGNORED_PARAMS or value in (None, ""):
+            continue
+        text = " ".join(str(value).split())
+        normalized[name] = text.lower() if name == "query" else text
+    return normalized
+
+
+class ResponseCache:
+    def __init__(self, db_file: str = "tmdb_cache.db", clock: Callable[[], float] = time.time) -> None:
+        self.db_file = db_file
+        self._clock = clock
+        directory = os.path.dirname(db_file) or "."
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(endpoint: str, params: Mapping[str, Any]) -> str:
+        normalized = normalize_params(params)
+        return f"{endpoint.strip('/')}?{json.dumps(normalized, sort_keys=True, separators=(',', ':'))}"
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT key, endpoint, body, etag, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            body = json.loads(row[2])
+        except json.JSONDecodeError:
+            return None
+        fetched_at = float(row[4])
+        return CachedResponse(row[0], row[1], body, row[3], fetched_at, self._clock() - fetched_at)
+
+    def get_or_fetch(
+        self,
+        key: str,
+        endpoint: str,
+        policy: CachePolicy,
+        fetch: Fetcher,
+        revalidate: Callable[[str, Callable[[], object]], None],
+    ) -> Dict[str, Any]:
+        # Fresh entries are served as is; within the stale window the cached
+        # body is served while revalidate() refreshes it in the background.
+        entry = self.get(key)
+        if entry is not None:
+            if entry.age < policy.ttl:
+                metrics.count("tmdb.cache.fresh")
+                return entry.body
+            if entry.age < policy.ttl + policy.stale:
+                metrics.count("tmdb.cache.stale")
+                revalidate(key, lambda: self.fetch_through(key, endpoint, fetch))
+                return entry.body
+        metrics.count("tmdb.cache.miss")
+        return self.fetch_through(key, endpoint, fetch, entry)
+
+    def fetch_through(
+        self, key: str, endpoint: str, fetch: Fetcher, entry: CachedResponse | None = None
+    ) -> Dict[str, Any]:
+        entry = entry or self.get(key)
+        body, etag = fetch(entry.etag if entry is not None else None)
+        if body is None:
+            if entry is None:
+                raise ValueError("Not modified, but nothing is cached")
+            self.touch(key)
+            return entry.body
+        self.put(key, endpoint, body, etag)
+        return body
+
+    def put(self, key: str, endpoint: str, body: Dict[str, Any], etag: str | None = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, body, etag, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint.strip("/"), json.dumps(body, separators=(",", ":")), etag, self._clock()),
+            )
+
+    def touch(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE responses SET fetched_at = ? WHERE key = ?", (self._clock(), key))
+
+    def purge(self, older_than: float) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM responses WHERE fetched_at < ?", (self._clock() - older_than,))
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
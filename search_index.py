@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterable, List, Mapping, Set, Tuple
+
+from facet_index import FacetIndex
+from models import Movie
+from movie_table import MODE_FLAGS, MovieTable
+
+FILTER_MODES: Dict[str, Callable[[Movie], bool]] = {
+    "Watched": lambda m: m.watched,
+    "Unwatched": lambda m: not m.watched,
+    "Favorites": lambda m: m.favorite,
+    "Watchlist": lambda m: m.watchlist,
+}
+
+GRAM_SIZE = 3
+
+
+class QueryCancelled(Exception):
+    pass
+
+
+def filter_and_sort(
+    index: "MovieSearchIndex",
+    facets: FacetIndex | None,
+    search: str,
+    mode: str,
+    sort: str,
+    selection: Mapping[str, Iterable[str]] | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> List[Movie]:
+    mask = facets.select(selection) if facets is not None and selection else None
+    allowed = None if mask is None else facets.uids(mask)
+    return index.query(search, mode, sort, cancelled=cancelled, allowed=allowed)
+
+
+def _grams(text: str) -> Set[str]:
+    grams: Set[str] = set()
+    for size in range(1, GRAM_SIZE + 1):
+        grams.update(text[i:i + size] for i in range(len(text) - size + 1))
+    return grams
+
+
+class MovieSearchIndex:
+    def __init__(self, movies: Iterable[Movie] = ()) -> None:
+        self._movies: Dict[str, Movie] = {}
+        self._names: Dict[str, str] = {}
+        self._seq: Dict[str, int] = {}
+        self._keys: Dict[str, Dict[str, Tuple]] = {}
+        self._table = MovieTable()
+        self._next_seq = 0
+        self._postings: Dict[str, Set[str]] = {}
+        self._orders: Dict[str, List[Tuple]] = {"Title": [], "Year": [], "Rating": []}
+        self._last_search = ""
+        self._last_matches: Set[str] | None = None
+        self._lock = threading.RLock()
+        self.extend(movies)
+
+    def __len__(self) -> int:
+        return len(self._movies)
+
+    def __contains__(self, movie: Movie) -> bool:
+        return movie.uid in self._movies
+
+    def get(self, uid: str) -> Movie | None:
+        return self._movies.get(uid)
+
+    def add(self, movie: Movie) -> None:
+        with self._lock:
+            self._add(movie)
+
+    def extend(self, movies: Iterable[Movie]) -> None:
+        batch = {movie.uid: movie for movie in movies}
+        with self._lock:
+            for uid in batch:
+                if uid in self._movies:
+                    self._remove(uid)
+            # Appending and sorting once keeps a bulk load O(n log n); insort
+            # per movie shifts the whole list every time.
+            for movie in batch.values():
+                self._add(movie, ordered=False)
+            for order in self._orders.values():
+                order.sort()
+
+    def _add(self, movie: Movie, ordered: bool = True) -> None:
+        uid = movie.uid
+        seq = self._seq.get(uid)
+        if seq is None:
+            seq = self._next_seq
+            self._next_seq += 1
+        else:
+            self._remove(uid)
+        name = movie.name.lower()
+        self._movies[uid] = movie
+        self._names[uid] = name
+        self._seq[uid] = seq
+        self._table.upsert(movie)
+        for gram in _grams(name):
+            self._postings.setdefault(gram, set()).add(uid)
+        keys = self._keys[uid] = self._sort_keys(movie, name, seq)
+        for sort, key in keys.items():
+            if ordered:
+                insort(self._orders[sort], key)
+            else:
+                self._orders[sort].append(key)
+        self._invalidate()
+
+    def remove(self, uid: str) -> None:
+        with self._lock:
+            self._remove(uid)
+
+    def _remove(self, uid: str) -> None:
+        movie = self._movies.pop(uid, None)
+        if movie is None:
+            return
+        name = self._names.pop(uid)
+        self._seq.pop(uid)
+        self._table.remove(uid)
+        for gram in _grams(name):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(uid)
+                if not posting:
+                    del self._postings[gram]
+        # The movie may already have been edited in place, so its old keys
+        # are the stored ones, not whatever its fields say now.
+        for sort, key in self._keys.pop(uid).items():
+            order = self._orders[sort]
+            pos = bisect_left(order, key)
+            if pos < len(order) and order[pos] == key:
+                del order[pos]
+        self._invalidate()
+
+    def replace(self, old_uid: str | None, movie: Movie) -> None:
+        with self._lock:
+            if old_uid and old_uid != movie.uid:
+                self._remove(old_uid)
+            self._add(movie)
+
+    def query(
+        self,
+        search: str,
+        mode: str = "All",
+        sort: str = "Title",
+        cancelled: Callable[[], bool] | None = None,
+        allowed: Set[str] | None = None,
+    ) -> List[Movie]:
+        def check() -> None:
+            if cancelled is not None and cancelled():
+                raise QueryCancelled()
+
+        search = search.strip().lower()
+        sort = sort if sort in self._orders else "Title"
+        # Only the lookups that read shared state run under the lock; sorting
+        # and building the result list work on a private snapshot so edits
+        # and the loader thread are not held up by a long query.
+        with self._lock:
+            check()
+            matches = self._match(search)
+            self._last_search = search
+            self._last_matches = matches
+            check()
+
+            # Flag filters run over the table's byte columns instead of
+            # reading attributes off every Movie.
+            flagged = self._table.mode_uids(mode) if mode in MODE_FLAGS else None
+            if matches is None:
+                candidates = flagged
+            elif flagged is None:
+                candidates = matches
+            else:
+                candidates = matches & flagged
+            if allowed is not None:
+                candidates = {uid for uid in allowed if uid in self._movies} if candidates is None else candidates & allowed
+            keys, movies, presorted = self._snapshot(candidates, sort)
+        check()
+
+        descending = sort != "Title"
+        if not presorted:
+            keys.sort(reverse=descending)
+        elif descending:
+            keys.reverse()
+        return [movies[key[-1]] for key in keys if key[-1] in movies]
+
+    def _match(self, search: str) -> Set[str] | None:
+        if not search:
+            return None
+        if self._last_matches is not None and self._last_search and self._last_search in search:
+            candidates: Iterable[str] = self._last_matches
+        else:
+            candidates = None
+        if len(search) <= GRAM_SIZE:
+            posting = self._postings.get(search, set())
+            if candidates is None or len(posting) <= len(candidates):
+                return set(posting)
+        else:
+            postings = sorted(
+                (self._postings.get(search[i:i + GRAM_SIZE], set()) for i in range(len(search) - GRAM_SIZE + 1)),
+                key=len,
+            )
+            if candidates is None or len(postings[0]) < len(candidates):
+                candidates = postings[0]
+        names = self._names
+        return {uid for uid in candidates if search in names[uid]}
+
+    def _snapshot(self, candidates: Set[str] | None, sort: str) -> Tuple[List[Tuple], Dict[str, Movie], bool]:
+        order = self._orders[sort]
+        movies = self._movies
+        if candidates is None:
+            return list(order), dict(movies), True
+        subset = {uid: movies[uid] for uid in candidates}
+        size = len(candidates)
+        if size * max(1.0, math.log2(size or 1)) < len(order):
+            keys = self._keys
+            return [keys[uid][sort] for uid in candidates], subset, False
+        return list(order), subset, True
+
+    @staticmethod
+    def _sort_keys(movie: Movie, name: str, seq: int) -> Dict[str, Tuple]:
+        return {
+            "Title": (name, seq, movie.uid),
+            "Year": (movie.year or "0", -seq, movie.uid),
+            "Rating": (movie.rating, -seq, movie.uid),
+        }
+
+    def _invalidate(self) -> None:
+        self._last_search = ""
+        self._last_matches = None
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple
+
+import metrics
+from data_store import MovieRepository
+from facet_index import RATING_BUCKETS, UNKNOWN, UNRATED
+from models import Movie
+
+
+_COLUMNS = (
+    "uid",
+    "name",
+    "name_lower",
+    "year",
+    "year_key",
+    "genre",
+    "rating",
+    "watched",
+    "favorite",
+    "watchlist",
+    "poster_path",
+    "file_path",
+    "tmdb_id",
+    "position",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS movies (
+    uid TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    year TEXT NOT NULL DEFAULT '',
+    year_key TEXT NOT NULL DEFAULT '0',
+    genre TEXT NOT NULL DEFAULT '',
+    rating REAL NOT NULL DEFAULT 0,
+    watched INTEGER NOT NULL DEFAULT 0,
+    favorite INTEGER NOT NULL DEFAULT 0,
+    watchlist INTEGER NOT NULL DEFAULT 0,
+    poster_path TEXT NOT NULL DEFAULT '',
+    file_path TEXT NOT NULL DEFAULT '',
+    tmdb_id INTEGER,
+    position INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_movies_name_lower ON movies (name_lower, position);
+CREATE INDEX IF NOT EXISTS idx_movies_year ON movies (year_key DESC, position);
+CREATE INDEX IF NOT EXISTS idx_movies_rating ON movies (rating DESC, position);
+CREATE INDEX IF NOT EXISTS idx_movies_watched ON movies (watched);
+CREATE INDEX IF NOT EXISTS idx_movies_favorite ON movies (favorite);
+CREATE INDEX IF NOT EXISTS idx_movies_watchlist ON movies (watchlist);
+"""
+
+# Trigram FTS serves substring search for queries of three or more characters;
+# REPLACE deletes only reach the delete trigger with recursive_triggers on.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5(
+    name_lower, content='movies', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS movies_fts_insert AFTER INSERT ON movies BEGIN
+    INSERT INTO movies_fts(rowid, name_lower) VALUES (new.rowid, new.name_lower);
+END;
+CREATE TRIGGER IF NOT EXISTS movies_fts_delete AFTER DELETE ON movies BEGIN
+    INSERT INTO movies_fts(movies_fts, rowid, name_lower) VALUES ('delete', old.rowid, old.name_lower);
+END;
+CREATE TRIGGER IF NOT EXISTS movies_fts_update AFTER UPDATE ON movies BEGIN
+    INSERT INTO movies_fts(movies_fts, rowid, name_lower) VALUES ('delete', old.rowid, old.name_lower);
+    INSERT INTO movies_fts(rowid, name_lower) VALUES (new.rowid, new.name_lower);
+END;
+"""
+
+_SORT_CLAUSES = {
+    "Title": "name_lower ASC, position ASC",
+    "Year": "year_key DESC, position ASC",
+    "Rating": "rating DESC, position ASC",
+}
+
+_FILTER_CLAUSES = {
+    "Watched": "watched = 1",
+    "Unwatched": "watched = 0",
+    "Favorites": "favorite = 1",
+    "Watchlist": "watchlist = 1",
+}
+
+
+def _facet_clause(facet: str, value: str) -> Tuple[str, Tuple]:
+    if facet == "genre":
+        if value == UNKNOWN:
+            return "trim(genre) = ''", ()
+        return "instr(',' || replace(genre, ', ', ',') || ',', ?) > 0", (f",{value},",)
+    if facet == "decade":
+        four_digits = "substr(year, 1, 4) GLOB '[0-9][0-9][0-9][0-9]'"
+        if value == UNKNOWN:
+            return f"NOT {four_digits}", ()
+        return f"{four_digits} AND substr(year, 1, 3) = ?", (value[:3],)
+    if facet == "rating":
+        if value == UNRATED:
+            return "rating < ?", (RATING_BUCKETS[-1][0],)
+        ceiling = None
+        for floor, label in RATING_BUCKETS:
+            if label == value:
+                if ceiling is None:
+                    return "rating >= ?", (floor,)
+                return "rating >= ? AND rating < ?", (floor, ceiling)
+            ceiling = floor
+        return "0", ()
+    if facet == "status" and value in _FILTER_CLAUSES:
+        return _FILTER_CLAUSES[value], ()
+    return "0", ()
+
+
+def _movie_row(movie: Movie, position: int) -> Tuple:
+    return (
+        movie.uid,
+        movie.name,
+        movie.name.lower(),
+        movie.year,
+        movie.year or "0",
+        movie.genre,
+        movie.rating,
+        int(movie.watched),
+        int(movie.favorite),
+        int(movie.watchlist),
+        movie.poster_path,
+        movie.file_path,
+        movie.tmdb_id,
+        position,
+    )
+
+
+def _row_movie(row: sqlite3.Row) -> Movie:
+    return Movie(
+        name=row["name"],
+        year=row["year"],
+        genre=row["genre"],
+        rating=float(row["rating"]),
+        watched=bool(row["watched"]),
+        favorite=bool(row["favorite"]),
+        watchlist=bool(row["watchlist"]),
+        poster_path=row["poster_path"],
+        file_path=row["file_path"],
+        tmdb_id=row["tmdb_id"],
+        uid=row["uid"],
+    )
+
+
+class MovieQueryResult:
+    def __init__(self, repo: "SQLiteMovieRepository", where: str, params: Tuple, order_by: str, page_size: int = 60) -> None:
+        self._repo = repo
+        self._where = where
+        self._params = params
+        self._order_by = order_by
+        self._page_size = page_size
+        self._pages: Dict[int, List[Movie]] = {}
+        self._count: int | None = None
+
+    def __len__(self) -> int:
+        if self._count is None:
+            self._count = self._repo._count(self._where, self._params)
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            if start >= stop:
+                return []
+            return self.fetch(start, stop - start)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("query result index out of range")
+        page, offset = divmod(index, self._page_size)
+        return self._page(page)[offset]
+
+    def fetch(self, offset: int, limit: int) -> List[Movie]:
+        first = offset // self._page_size
+        last = (offset + limit - 1) // self._page_size
+        rows: List[Movie] = []
+        for page in range(first, last + 1):
+            rows.extend(self._page(page))
+        start = offset - first * self._page_size
+        return rows[start:start + limit]
+
+    def _page(self, page: int) -> List[Movie]:
+        cached = self._pages.get(page)
+        if cached is None:
+            cached = self._repo._select(self._where, self._params, self._order_by, page * self._page_size, self._page_size)
+            self._pages[page] = cached
+        return cached
+
+
+class SQLiteMovieRepository(MovieRepository):
+    def __init__(self, db_file: str = "movies.db", settings_file: str = "settings.json", data_file: str = "movies_data.json") -> None:
+        super().__init__(data_file, settings_file)
+        self.db_file = db_file
+        directory = os.path.dirname(db_file) or "."
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        self._conn.executescript(_SCHEMA)
+        self._fts = self._create_fts()
+        self._lock = threading.Lock()
+        self._rows: Dict[str, Tuple] = {}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _create_fts(self) -> bool:
+        existed = self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'movies_fts'").fetchone() is not None
+        try:
+            self._conn.executescript(_FTS_SCHEMA)
+        except sqlite3.OperationalError:
+            return False
+        if not existed:
+            with self._conn:
+                self._conn.execute("INSERT INTO movies_fts(movies_fts) VALUES ('rebuild')")
+        return True
+
+    def watched_files(self) -> List[str]:
+        return []
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM movies LIMIT 1").fetchone() is None
+
+    @metrics.timed("storage.sqlite.load_movies")
+    def load_movies(self) -> List[Movie]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM movies ORDER BY position").fetchall()
+        movies = [_row_movie(row) for row in rows]
+        self._rows = {movie.uid: _movie_row(movie, position) for position, movie in enumerate(movies)}
+        return movies
+
+    def iter_movies(self, chunk_size: int = 500) -> Iterator[List[Movie]]:
+        self._rows = {}
+        position = 0
+        for chunk in self.stream_movies(chunk_size):
+            for movie in chunk:
+                self._rows[movie.uid] = _movie_row(movie, position)
+                position += 1
+            yield chunk
+
+    def stream_movies(self, chunk_size: int = 500) -> Iterator[List[Movie]]:
+        offset = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT * FROM movies ORDER BY position LIMIT ? OFFSET ?", (chunk_size, offset)
+                ).fetchall()
+            if not rows:
+                return
+            offset += len(rows)
+            yield [_row_movie(row) for row in rows]
+
+    @metrics.timed("storage.sqlite.save_movies")
+    def save_movies(self, movies: List[Movie], dirty: Iterable[str] | None = None) -> None:
+        if dirty is None:
+            current = {movie.uid: _movie_row(movie, position) for position, movie in enumerate(movies)}
+            changed = [row for uid, row in current.items() if self._rows.get(uid) != row]
+        else:
+            dirty = set(dirty)
+            current = dict(self._rows)
+            changed = []
+            for position, movie in enumerate(movies):
+                if movie.uid in dirty or movie.uid not in current:
+                    row = _movie_row(movie, position)
+                    if current.get(movie.uid) != row:
+                        changed.append(row)
+                    current[movie.uid] = row
+            live = {movie.uid for movie in movies}
+            for uid in [uid for uid in current if uid not in live]:
+                del current[uid]
+        deleted = [(uid,) for uid in self._rows if uid not in current]
+        if deleted or changed:
+            with self._lock, self._conn:
+                self._conn.executemany("DELETE FROM movies WHERE uid = ?", deleted)
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO movies ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                    changed,
+                )
+        self._rows = current
+
+    @metrics.timed("storage.sqlite.save_stream")
+    def save_stream(self, movies: Iterable[Movie], batch_size: int = 1000) -> int:
+        insert = f"INSERT OR REPLACE INTO {{table}} ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+        with self._lock:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS movies_stage AS SELECT * FROM movies WHERE 0")
+            self._conn.execute("DELETE FROM movies_stage")
+        rows: Dict[str, Tuple] = {}
+        batch: List[Tuple] = []
+        try:
+            for position, movie in enumerate(movies):
+                row = _movie_row(movie, position)
+                rows[movie.uid] = row
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    with self._lock, self._conn:
+                        self._conn.executemany(insert.format(table="movies_stage"), batch)
+                    batch = []
+            with self._lock, self._conn:
+                self._conn.executemany(insert.format(table="movies_stage"), batch)
+                self._conn.execute("DELETE FROM movies")
+                self._conn.execute("INSERT INTO movies SELECT * FROM movies_stage")
+        finally:
+            with self._lock:
+                self._conn.execute("DROP TABLE IF EXISTS movies_stage")
+        self._rows = rows
+        return len(rows)
+
+    def import_json(self, json_file: str | None = None) -> int:
+        source = MovieRepository(json_file or self.data_file, self.settings_file)
+        movies = source.load_movies()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM movies")
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO movies ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                [_movie_row(movie, position) for position, movie in enumerate(movies)],
+            )
+        self._rows = {movie.uid: _movie_row(movie, position) for position, movie in enumerate(movies)}
+        return len(movies)
+
+    def export_json(self, json_file: str | None = None) -> None:
+        MovieRepository(json_file or self.data_file, self.settings_file).save_movies(self.load_movies())
+
+    def query_movies(
+        self,
+        search: str = "",
+        mode: str = "All",
+        sort: str = "Title",
+        page_size: int = 60,
+        facets: Mapping[str, Iterable[str]] | None = None,
+    ) -> MovieQueryResult:
+        clauses: List[str] = []
+        params: List[object] = []
+        search = search.strip().lower()
+        if search and self._fts and len(search) >= 3:
+            clauses.append("rowid IN (SELECT rowid FROM movies_fts WHERE movies_fts MATCH ?)")
+            params.append('"' + search.replace('"', '""') + '"')
+        elif search:
+            # Trigrams cannot match fewer than three characters, so short
+            # searches scan with instr to keep substring semantics.
+            clauses.append("instr(name_lower, ?) > 0")
+            params.append(search)
+        if mode in _FILTER_CLAUSES:
+            clauses.append(_FILTER_CLAUSES[mode])
+        for facet, values in (facets or {}).items():
+            parts = [_facet_clause(facet, value) for value in values]
+            if parts:
+                clauses.append("(" + " OR ".join(f"({clause})" for clause, _params in parts) + ")")
+                for _clause, clause_params in parts:
+                    params.extend(clause_params)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return MovieQueryResult(self, where, tuple(params), _SORT_CLAUSES.get(sort, _SORT_CLAUSES["Title"]), page_size)
+
+    def count_movies(self, search: str = "", mode: str = "All", facets: Mapping[str, Iterable[str]] | None = None) -> int:
+        return len(self.query_movies(search, mode, facets=facets))
+
+    def _count(self, where: str, params: Tuple) -> int:
+        with self._lock:
+            return int(self._conn.execute(f"SELECT COUNT(*) FROM movies {where}", params).fetchone()[0])
+
+    def _select(self, where: str, params: Tuple, order_by: str, offset: int, limit: int) -> List[Movie]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM movies {where} ORDER BY {order_by} LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        return [_row_movie(row) for row in rows]
+
+
+def import_json_library(json_file: str = "movies_data.json", db_file: str = "movies.db") -> int:
+    repo = SQLiteMovieRepository(db_file, data_file=json_file)
+    try:
+        return repo.import_json()
+    finally:
+        repo.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    count = import_json_library(*sys.argv[1:3])
+    print(json.dumps({"imported": count}))
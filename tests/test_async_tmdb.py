@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp import web  # noqa: E402
+
+from async_tmdb import AsyncTMDBService, LoopBridge  # noqa: E402
+
+
+class StubTMDB:
+    def __init__(self, delay: float = 0.0, failures: int = 0, status: int = 503) -> None:
+        self.delay = delay
+        self.failures = failures
+        self.status = status
+        self.hits = 0
+        self.active = 0
+        self.peak = 0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.hits += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures:
+                self.failures -= 1
+                return web.Response(status=self.status)
+            query = request.query.get("query", "")
+            return web.json_response({"results": [{"title": query, "path": request.path}]})
+        finally:
+            self.active -= 1
+
+
+async def start_stub(stub: StubTMDB, **options):
+    app = web.Application()
+    app.router.add_route("GET", "/{tail:.*}", stub.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    service = AsyncTMDBService("key", base_url=f"http://127.0.0.1:{port}", backoff=0.001, **options)
+    service.image_base_url = f"http://127.0.0.1:{port}/img"
+    return service, runner
+
+
+async def stop_stub(service: AsyncTMDBService, runner) -> None:
+    await service.close()
+    await runner.cleanup()
+
+
+@contextlib.asynccontextmanager
+async def serve(stub: StubTMDB, **options):
+    service, runner = await start_stub(stub, **options)
+    try:
+        yield service
+    finally:
+        await stop_stub(service, runner)
+
+
+def test_duplicate_requests_share_one_fetch():
+    stub = StubTMDB(delay=0.05)
+
+    async def scenario():
+        async with serve(stub) as service:
+            results = await asyncio.gather(*(service.search_movie("Alien") for _ in range(10)))
+            return results, service.coalesced
+
+    results, coalesced = asyncio.run(scenario())
+    assert stub.hits == 1
+    assert coalesced == 9
+    assert all(result["results"][0]["title"] == "Alien" for result in results)
+
+
+def test_per_host_limit_caps_concurrent_requests():
+    stub = StubTMDB(delay=0.05)
+
+    async def scenario():
+        async with serve(stub, per_host_limit=2) as service:
+            await asyncio.gather(*(service.search_movie(f"Movie {i}") for i in range(8)))
+
+    asyncio.run(scenario())
+    assert stub.hits == 8
+    assert stub.peak == 2
+
+
+def test_retryable_status_is_retried_with_backoff():
+    stub = StubTMDB(failures=2, status=503)
+
+    async def scenario():
+        async with serve(stub, retries=3) as service:
+            return await service.search_movie("Heat")
+
+    result = asyncio.run(scenario())
+    assert stub.hits == 3
+    assert result["results"][0]["title"] == "Heat"
+
+
+def test_retries_give_up_after_the_limit():
+    stub = StubTMDB(failures=10, status=429)
+
+    async def scenario():
+        async with serve(stub, retries=2) as service:
+            await service.get_credits(603)
+
+    with pytest.raises(aiohttp.ClientResponseError) as info:
+        asyncio.run(scenario())
+    assert info.value.status == 429
+    assert stub.hits == 3
+
+
+def test_client_errors_are_not_retried():
+    stub = StubTMDB(failures=1, status=404)
+
+    async def scenario():
+        async with serve(stub) as service:
+            await service.fetch_poster_bytes("/missing.jpg")
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(scenario())
+    assert stub.hits == 1
+
+
+def test_cancelling_one_waiter_keeps_the_shared_fetch():
+    stub = StubTMDB(delay=0.1)
+
+    async def scenario():
+        async with serve(stub) as service:
+            first = asyncio.ensure_future(service.search_movie("Ran"))
+            second = asyncio.ensure_future(service.search_movie("Ran"))
+            await asyncio.sleep(0.02)
+            first.cancel()
+            result = await second
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return result, dict(service._in_flight)
+
+    result, in_flight = asyncio.run(scenario())
+    assert result["results"][0]["title"] == "Ran"
+    assert stub.hits == 1
+    assert in_flight == {}
+
+
+def test_loop_bridge_runs_and_cancels_from_another_thread():
+    stub = StubTMDB(delay=0.5)
+    bridge = LoopBridge()
+    service, runner = bridge.call(start_stub(stub), timeout=5)
+    try:
+        future = bridge.submit(service.search_movie("Slow"))
+        future.cancel()
+        assert future.cancelled()
+        stub.delay = 0.0
+        assert bridge.call(service.search_movie("Fast"), timeout=5)["results"][0]["title"] == "Fast"
+    finally:
+        bridge.stop(stop_stub(service, runner))
+
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from autosave import AutosaveWriter, SaveDeferred
+from models import Movie
+
+
+def test_dirty_movies_are_captured_when_scheduled():
+    saved = []
+    writer = AutosaveWriter(lambda movies, dirty: saved.append((movies, dirty)), quiet_period=60)
+    try:
+        alien, heat = Movie("Alien", rating=7.0), Movie("Heat", rating=8.0)
+        writer.schedule([alien, heat], None)
+        assert writer.flush(timeout=5)
+        movies, dirty = saved[-1]
+        assert dirty is None
+        assert [movie.rating for movie in movies] == [7.0, 8.0]
+        assert movies[0] is not alien
+
+        alien.rating = 9.0
+        writer.schedule([alien, heat], {alien.uid})
+        alien.rating = 1.0
+        assert writer.flush(timeout=5)
+        movies, dirty = saved[-1]
+        assert dirty == {alien.uid}
+        assert [movie.rating for movie in movies] == [9.0, 8.0]
+    finally:
+        writer.stop(timeout=5)
+
+
+def test_unchanged_movies_are_serialized_by_the_writer():
+    saved = []
+    writer = AutosaveWriter(lambda movies, dirty: saved.append(movies), quiet_period=60)
+    try:
+        movies = [Movie(f"Movie {i}", rating=5.0) for i in range(3)]
+        writer.schedule(movies, None)
+        assert writer.flush(timeout=5)
+
+        movies[2].rating = 9.0
+        writer.schedule(movies, {movies[2].uid})
+        assert writer.flush(timeout=5)
+        assert [movie.rating for movie in saved[-1]] == [5.0, 5.0, 9.0]
+
+        lookups = []
+
+        def lookup(uid):
+            lookups.append(uid)
+            return next(movie for movie in movies if movie.uid == uid)
+
+        tracked = AutosaveWriter(lambda movies, dirty: saved.append(movies), quiet_period=60, lookup=lookup)
+        try:
+            tracked.schedule(movies, {movies[0].uid})
+            assert lookups == [movies[0].uid]
+            assert tracked.flush(timeout=5)
+            assert [movie.name for movie in saved[-1]] == ["Movie 0", "Movie 1", "Movie 2"]
+        finally:
+            tracked.stop(timeout=5)
+    finally:
+        writer.stop(timeout=5)
+
+
+def test_pending_dirty_sets_accumulate_until_written():
+    saved = []
+    writer = AutosaveWriter(lambda movies, dirty: saved.append(dirty), quiet_period=60)
+    try:
+        movies = [Movie("Alien"), Movie("Heat")]
+        writer.schedule(movies, {movies[0].uid})
+        writer.schedule(movies, {movies[1].uid})
+        assert writer.flush(timeout=5)
+        assert saved == [{movies[0].uid, movies[1].uid}]
+    finally:
+        writer.stop(timeout=5)
+
+
+def test_on_saved_runs_only_after_a_successful_write():
+    attempts = []
+    done = []
+
+    def save(movies, dirty):
+        attempts.append(len(done))
+        if len(attempts) == 1:
+            raise OSError("disk full")
+
+    writer = AutosaveWriter(save, quiet_period=0.01)
+    try:
+        writer.schedule([Movie("Alien")], None, immediate=True, on_saved=lambda: done.append(True))
+        assert writer.flush(timeout=5)
+        assert attempts == [0, 0]
+        assert done == [True]
+    finally:
+        writer.stop(timeout=5)
+
+
+def test_deferred_save_keeps_callbacks_and_reports_deferred():
+    states = []
+    done = []
+    attempts = []
+
+    def save(movies, dirty):
+        attempts.append(dirty)
+        if len(attempts) == 1:
+            raise SaveDeferred("merging")
+
+    writer = AutosaveWriter(save, quiet_period=60, on_state=lambda state, detail: states.append(state))
+    try:
+        movie = Movie("Alien")
+        writer.schedule([movie], {movie.uid}, immediate=True, on_saved=lambda: done.append(True))
+        assert writer.flush(timeout=5)
+        assert states[-1] == AutosaveWriter.DEFERRED
+        assert done == [] and writer.pending_dirty() == set()
+
+        writer.schedule([movie], {movie.uid}, immediate=True)
+        assert writer.flush(timeout=5)
+        assert states[-1] == AutosaveWriter.SAVED
+        assert done == [True]
+    finally:
+        writer.stop(timeout=5)
+
+
+def test_pending_dirty_and_invalidate():
+    saved = []
+    writer = AutosaveWriter(lambda movies, dirty: saved.append(movies), quiet_period=60)
+    try:
+        alien, heat = Movie("Alien", rating=7.0), Movie("Heat", rating=8.0)
+        assert writer.pending_dirty() == set()
+        writer.schedule([alien, heat], {alien.uid})
+        assert writer.pending_dirty() == {alien.uid}
+        writer.schedule([alien, heat], None)
+        assert writer.pending_dirty() is None
+        assert writer.flush(timeout=5)
+
+        heat.rating = 9.0
+        writer.invalidate([heat.uid])
+        writer.schedule([alien, heat], set(), immediate=True)
+        assert writer.flush(timeout=5)
+        assert [movie.rating for movie in saved[-1]] == [7.0, 9.0]
+    finally:
+        writer.stop(timeout=5)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from dedupe import DuplicateIndex, apply_merge_groups, find_merge_groups, normalize_title, sequel_number
+from models import Movie
+
+
+def group_names(movies):
+    return sorted(sorted(movie.name for movie in group.members) for group in find_merge_groups(movies))
+
+
+def test_titles_normalize_articles_and_punctuation():
+    assert normalize_title("The Matrix") == normalize_title("Matrix, The") == "matrix"
+    assert normalize_title("Few Good Men, A") == normalize_title("A Few Good Men")
+    assert normalize_title("Fast & Furious") == normalize_title("Fast and Furious")
+    assert normalize_title("Amélie") == "amelie"
+
+
+def test_sequel_numbers():
+    assert [sequel_number(name) for name in ("Saw II", "Saw III", "Rocky IV", "Part 2", "Alien", "Se7en")] == [
+        "2",
+        "3",
+        "4",
+        "2",
+        "",
+        "",
+    ]
+
+
+def test_sequels_are_not_fuzzy_duplicates():
+    movies = [
+        Movie("Saw II", "2005"),
+        Movie("Saw III", "2006"),
+        Movie("Paranormal Activity 2", "2010"),
+        Movie("Paranormal Activity 3", "2011"),
+        Movie("Paranormal Activity", "2009"),
+    ]
+    assert group_names(movies) == []
+    assert DuplicateIndex(movies[:1]).matches(movies[1]) == []
+
+
+def test_duplicates_are_grouped_by_id_file_title_and_fuzzy_match():
+    movies = [
+        Movie("The Matrix", "1999"),
+        Movie("Matrix, The", "1999"),
+        Movie("Heat", "1995", tmdb_id=949),
+        Movie("Heat (Director's Cut)", "", tmdb_id=949),
+        Movie("Ran", file_path="/movies/ran.mkv"),
+        Movie("Ran 1985", file_path="/movies/ran.mkv"),
+        Movie("The Shawshank Redemption", "1994"),
+        Movie("Shawshank Redemtion", "1994"),
+        Movie("Heat", "1986"),
+    ]
+    assert group_names(movies) == [
+        ["Heat", "Heat (Director's Cut)"],
+        ["Matrix, The", "The Matrix"],
+        ["Ran", "Ran 1985"],
+        ["Shawshank Redemtion", "The Shawshank Redemption"],
+    ]
+
+
+def test_merge_keeps_the_most_complete_record_and_unions_flags():
+    full = Movie("Alien", "1979", genre="Horror", tmdb_id=348, poster_path="/a.jpg")
+    bare = Movie("alien", watched=True, file_path="/movies/alien.mkv")
+    (group,) = find_merge_groups([full, bare])
+    assert group.merged.uid == full.uid
+    assert group.merged.watched and group.merged.file_path == "/movies/alien.mkv"
+
+    result, merged, removed = apply_merge_groups([full, bare], [group])
+    assert [movie.uid for movie in result] == [full.uid]
+    assert merged == {full.uid} and removed == {bare.uid}
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from enrichment import BulkEnricher, TokenBucket
+from models import Movie
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, retry_after: str | None = None) -> None:
+        super().__init__(f"HTTP {status}")
+        self.response = type("Response", (), {"status_code": status, "headers": {"Retry-After": retry_after} if retry_after else {}})()
+
+
+class FakeTMDB:
+    def __init__(self, failures=None) -> None:
+        self.failures = dict(failures or {})
+        self.searched = []
+        self.credits = []
+        self._lock = threading.Lock()
+
+    def search_movie(self, name, year=""):
+        with self._lock:
+            self.searched.append(name)
+            queued = self.failures.get(name)
+            if queued:
+                raise queued.pop(0)
+        if name.startswith("Unknown"):
+            return {"results": []}
+        return {"results": [{"id": abs(hash(name)) % 100000, "title": name, "release_date": "1999-01-01", "vote_average": 7.0}]}
+
+    def get_credits(self, tmdb_id):
+        with self._lock:
+            self.credits.append(tmdb_id)
+        return {"cast": []}
+
+
+def apply(batch):
+    for movie, updates in batch:
+        for name, value in updates.items():
+            setattr(movie, name, value)
+
+
+def test_token_bucket_spaces_requests_at_the_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=clock, sleep=clock.sleep)
+    for _ in range(6):
+        assert bucket.acquire()
+    assert clock.now == pytest.approx(2.0)
+    assert all(delay == pytest.approx(0.5) for delay in clock.sleeps)
+
+
+def test_token_bucket_refills_up_to_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=3, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        bucket.acquire()
+    clock.now += 100
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_stopped_bucket_gives_up():
+    bucket = TokenBucket(rate=0.001, capacity=1)
+    bucket.acquire()
+    stop = threading.Event()
+    stop.set()
+    assert bucket.acquire(stop) is False
+
+
+def test_retries_rate_limits_and_server_errors():
+    tmdb = FakeTMDB({"Alien": [HTTPError(429, retry_after="0"), HTTPError(503)], "Heat": [HTTPError(404)]})
+    enricher = BulkEnricher(tmdb, workers=2, requests_per_second=1000, backoff=0.0)
+    movies = [Movie("Alien"), Movie("Heat"), Movie("Unknown Film")]
+
+    report = enricher.run(movies, apply)
+    assert (report.updated, report.failed, report.not_found) == (1, 1, 1)
+    assert tmdb.searched.count("Alien") == 3 and tmdb.searched.count("Heat") == 1
+    assert movies[0].tmdb_id is not None and movies[1].tmdb_id is None
+    assert report.errors == [("Heat", "HTTP 404")]
+
+
+def test_retries_stop_after_the_limit():
+    tmdb = FakeTMDB({"Alien": [HTTPError(500) for _ in range(5)]})
+    report = BulkEnricher(tmdb, requests_per_second=1000, retries=2, backoff=0.0).run([Movie("Alien")], apply)
+    assert report.failed == 1 and tmdb.searched.count("Alien") == 3
+
+
+def test_resumed_run_skips_movies_already_enriched():
+    movies = [Movie(f"Movie {i}") for i in range(20)]
+    tmdb = FakeTMDB()
+    enricher = BulkEnricher(tmdb, workers=1, requests_per_second=1000, batch_size=5)
+
+    def apply_then_stop(batch):
+        apply(batch)
+        enricher.stop()
+
+    first = enricher.run(movies, apply_then_stop)
+    enriched = {movie.uid for movie in movies if movie.tmdb_id is not None}
+    assert first.updated >= 5 and len(enriched) < len(movies)
+
+    tmdb.searched.clear()
+    second = BulkEnricher(tmdb, requests_per_second=1000).run(movies, apply)
+    assert second.total == len(movies) - len(enriched)
+    assert set(tmdb.searched) == {movie.name for movie in movies if movie.uid not in enriched}
+    assert all(movie.tmdb_id is not None for movie in movies)
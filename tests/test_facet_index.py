@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from facet_index import FACETS, FacetIndex
+from models import Movie
+
+
+def snapshot(index):
+    values = {facet: {value: index.uids(bits) for value, bits in index._bits[facet].items()} for facet in FACETS}
+    return values, {facet: index.counts(facet) for facet in FACETS}, index.uids(index.alive)
+
+
+def sample():
+    return [
+        Movie("Alien", "1979", "Horror, Sci-Fi", 8.5, watched=True),
+        Movie("Heat", "1995", "Crime", 8.3, favorite=True),
+        Movie("Ran", "1985", "", 0.0, watchlist=True),
+        Movie("Up", "2009", "Animation", 8.2),
+    ]
+
+
+def test_bulk_build_matches_incremental_adds():
+    movies = sample()
+    incremental = FacetIndex()
+    for movie in movies:
+        incremental.add(movie)
+    assert snapshot(FacetIndex(movies)) == snapshot(incremental)
+
+
+def test_select_combines_facets():
+    movies = sample()
+    index = FacetIndex(movies)
+    mask = index.select({"rating": ["8-9"], "status": ["Unwatched"]})
+    assert index.uids(mask) == {movies[1].uid, movies[3].uid}
+    assert index.uids(index.select({"genre": ["Unknown"]})) == {movies[2].uid}
+    assert index.select({"decade": ["1950s"]}) == 0
+
+
+def test_rebuild_updates_present_movies_only():
+    movies = sample()
+    index = FacetIndex(movies, normalize_genre=lambda genre: genre)
+    index.remove(movies[0].uid)
+    index.normalize_genre = lambda genre: genre.replace("Crime", "Thriller")
+    index.rebuild(movies)
+
+    assert movies[0].uid not in index.uids(index.alive)
+    assert index.counts("genre") == {"Thriller": 1, "Unknown": 1, "Animation": 1}
+    assert index.uids(index.select({"genre": ["Thriller"]})) == {movies[1].uid}
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+
+from data_store import JournalMovieRepository
+from models import Movie
+
+
+def make_repo(tmp_path, **options) -> JournalMovieRepository:
+    return JournalMovieRepository(str(tmp_path / "movies.json"), str(tmp_path / "settings.json"), **options)
+
+
+def names(movies):
+    return sorted(movie.name for movie in movies)
+
+
+def test_journal_replays_upserts_and_deletes(tmp_path):
+    repo = make_repo(tmp_path)
+    alien, heat, ran = Movie("Alien", "1979"), Movie("Heat", "1995"), Movie("Ran", "1985")
+    repo.save_movies([alien, heat, ran])
+    heat.watched = True
+    repo.save_movies([alien, heat, ran], dirty={heat.uid})
+    repo.save_movies([alien, heat], dirty=set())
+
+    loaded = make_repo(tmp_path).load_movies()
+    assert names(loaded) == ["Alien", "Heat"]
+    assert {movie.uid: movie.watched for movie in loaded}[heat.uid] is True
+    streamed = [movie for chunk in make_repo(tmp_path).iter_movies(chunk_size=1) for movie in chunk]
+    assert names(streamed) == ["Alien", "Heat"]
+
+
+def test_torn_journal_tail_is_ignored(tmp_path):
+    repo = make_repo(tmp_path)
+    repo.save_movies([Movie("Alien")])
+    with open(repo.journal_file, "a", encoding="utf-8") as handle:
+        handle.write('{"op": "upsert", "uid": "x", "movie": {"name": "Torn"')
+
+    assert names(make_repo(tmp_path).load_movies()) == ["Alien"]
+    repo = make_repo(tmp_path)
+    movies = repo.load_movies()
+    repo.save_movies(movies + [Movie("Heat")])
+    assert names(make_repo(tmp_path).load_movies()) == ["Alien", "Heat"]
+
+
+def test_compaction_folds_the_journal_into_the_data_file(tmp_path):
+    repo = make_repo(tmp_path, compact_threshold=1)
+    movies = [Movie("Alien"), Movie("Heat")]
+    repo.save_movies(movies)
+    repo.wait_for_compaction()
+    repo.save_movies(movies[:1], dirty=set())
+    repo.wait_for_compaction()
+
+    with open(repo.data_file, "r", encoding="utf-8") as handle:
+        assert [record["name"] for record in json.load(handle)] == ["Alien"]
+    assert names(make_repo(tmp_path).load_movies()) == ["Alien"]
+
+
+def test_legacy_records_keep_their_uid_across_journal_replay(tmp_path):
+    data_file = tmp_path / "movies.json"
+    data_file.write_text(json.dumps([{"name": "Alien"}, {"name": "Heat"}]), encoding="utf-8")
+    repo = make_repo(tmp_path)
+    movies = repo.load_movies()
+    repo.save_movies([movie for movie in movies if movie.name == "Alien"], dirty=set())
+
+    reloaded = make_repo(tmp_path).load_movies()
+    assert names(reloaded) == ["Alien"]
+    assert reloaded[0].uid == [movie.uid for movie in movies if movie.name == "Alien"][0]
+
+
+def test_stream_movies_replays_without_keeping_records(tmp_path):
+    repo = make_repo(tmp_path)
+    alien, heat = Movie("Alien", "1979"), Movie("Heat", "1995")
+    repo.save_movies([alien, heat])
+    heat.watched = True
+    repo.save_movies([alien, heat], dirty={heat.uid})
+
+    reader = make_repo(tmp_path)
+    streamed = [movie for chunk in reader.stream_movies(chunk_size=1) for movie in chunk]
+    assert names(streamed) == ["Alien", "Heat"]
+    assert {movie.uid: movie.watched for movie in streamed}[heat.uid] is True
+    assert reader._records == {}
+
+
+def test_close_folds_small_journals_into_the_data_file(tmp_path):
+    repo = make_repo(tmp_path)
+    alien, heat = Movie("Alien"), Movie("Heat")
+    repo.load_movies()
+    repo.save_movies([alien, heat], dirty={alien.uid, heat.uid})
+    heat.watched = True
+    repo.save_movies([alien, heat], dirty={heat.uid})
+    repo.close()
+
+    with open(repo.data_file, "r", encoding="utf-8") as handle:
+        records = json.load(handle)
+    assert [(record["name"], record["watched"]) for record in records] == [("Alien", False), ("Heat", True)]
+    assert repo._journal_size() == 0
+
+
+def test_close_without_a_full_read_keeps_the_journal(tmp_path):
+    repo = make_repo(tmp_path)
+    repo.save_movies([Movie("Alien")], dirty=set())
+
+    reader = make_repo(tmp_path)
+    assert names(movie for chunk in reader.stream_movies() for movie in chunk) == ["Alien"]
+    reader.close()
+    assert reader._journal_size() > 0
+    assert names(make_repo(tmp_path).load_movies()) == ["Alien"]
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from data_store import iter_json_records
+
+RECORDS = [
+    {"name": 'Say "Hello" [Director\'s Cut]', "genre": "Drama, {Indie}"},
+    {"name": "Amélie", "nested": {"cast": ["a", "b]"], "note": "},{"}},
+    {"name": "Back\\slash \\\" ]", "rating": 7.5},
+    {"name": "Zed"},
+]
+
+
+def parse(text: str, block_size: int = 64 * 1024):
+    return list(iter_json_records(io.StringIO(text), block_size))
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 5, 7, 16, 64 * 1024])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_records_split_across_blocks(block_size, indent):
+    assert parse(json.dumps(RECORDS, indent=indent, ensure_ascii=False), block_size) == RECORDS
+
+
+def test_non_object_items_are_skipped():
+    assert parse('[1, "x", {"name": "Alien"}, null, [2], {"name": "Heat"}]', 4) == [{"name": "Alien"}, {"name": "Heat"}]
+
+
+@pytest.mark.parametrize("text", ["", "   ", "[]", " [ ] ", '{"name": "Alien"}', "null"])
+def test_empty_or_non_array_input_yields_nothing(text):
+    assert parse(text, 3) == []
+
+
+@pytest.mark.parametrize("block_size", [1, 4, 64 * 1024])
+def test_truncated_input_keeps_the_complete_records(block_size):
+    text = json.dumps(RECORDS)
+    cut = text.index('{"name": "Zed"') + 8
+    assert parse(text[:cut], block_size) == RECORDS[:3]
+    assert parse(text[:-1], block_size) == RECORDS
+
+
+@pytest.mark.parametrize("block_size", [1, 4, 64 * 1024])
+def test_invalid_input_stops_at_the_broken_record(block_size):
+    text = '[{"name": "Alien"}, {"name": oops}, {"name": "Heat"}]'
+    assert parse(text, block_size) == [{"name": "Alien"}]
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import pytest
+
+from library_scanner import LibraryScanner, parse_file_name
+
+
+@pytest.mark.parametrize(
+    "file_name, expected",
+    [
+        ("1917.2019.720p.mkv", ("1917", "2019")),
+        ("Alien (1979).mkv", ("Alien", "1979")),
+        ("Heat.1995.1080p.BluRay.x264.mkv", ("Heat", "1995")),
+        ("Blade Runner 2049 (2017).mkv", ("Blade Runner 2049", "2017")),
+        ("Ran [1985].avi", ("Ran", "1985")),
+        ("Arrival.2160p.WEB-DL.mkv", ("Arrival", "")),
+    ],
+)
+def test_parse_file_name(file_name, expected):
+    assert parse_file_name(file_name) == expected
+
+
+def test_index_is_only_updated_on_commit(tmp_path):
+    library = tmp_path / "movies"
+    library.mkdir()
+    (library / "Alien (1979).mkv").write_bytes(b"x")
+    index_file = str(tmp_path / "scan_index.json")
+
+    scanner = LibraryScanner(index_file, workers=2)
+    first = scanner.scan([str(library)])
+    assert [item.title for item in first.changed] == ["Alien"]
+    assert [item.title for item in LibraryScanner(index_file).scan([str(library)]).changed] == ["Alien"]
+
+    scanner.commit(first)
+    assert LibraryScanner(index_file).scan([str(library)]).changed == []
+
+    (library / "Alien (1979).mkv").unlink()
+    scanner = LibraryScanner(index_file)
+    gone = scanner.scan([str(library)])
+    assert len(gone.removed) == 1
+    scanner.commit(gone)
+    assert LibraryScanner(index_file).scan([str(library)]).removed == []
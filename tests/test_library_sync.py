@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+import library_sync
+from library_sync import FileLock, FileWatcher, diff_movies, file_signature, merge_external
+from models import Movie
+
+
+def test_file_lock_excludes_other_holders(tmp_path):
+    path = str(tmp_path / "movies.json.lock")
+    first, second = FileLock(path), FileLock(path, timeout=0.2)
+    with first:
+        with first:
+            with pytest.raises(TimeoutError):
+                with second:
+                    pass
+    with second:
+        pass
+
+
+def test_file_lock_waits_for_release(tmp_path):
+    path = str(tmp_path / "movies.json.lock")
+    holder = FileLock(path)
+    events = []
+
+    def contend() -> None:
+        with FileLock(path, timeout=5):
+            events.append("acquired")
+
+    with holder:
+        thread = threading.Thread(target=contend)
+        thread.start()
+        time.sleep(0.2)
+        assert events == []
+        events.append("released")
+    thread.join(5)
+    assert events == ["released", "acquired"]
+
+
+def test_diff_reports_added_changed_and_removed():
+    alien, heat, ran = Movie("Alien"), Movie("Heat"), Movie("Ran")
+    edited = Movie.from_dict({**heat.to_dict(), "watched": True})
+    added = Movie("Solaris")
+
+    diff = diff_movies([alien, heat, ran], [alien, edited, added])
+    assert [movie.uid for movie in diff.added] == [added.uid]
+    assert [movie.uid for movie in diff.changed] == [heat.uid]
+    assert diff.removed == [ran.uid]
+    assert not diff_movies([alien], [Movie.from_dict(alien.to_dict())])
+
+
+def test_merge_keeps_unsaved_local_edits_over_concurrent_changes():
+    alien, heat, ran, solaris = Movie("Alien"), Movie("Heat"), Movie("Ran"), Movie("Solaris")
+    local = [alien, heat, ran, solaris]
+    incoming = [
+        Movie.from_dict({**alien.to_dict(), "rating": 8.5}),
+        Movie.from_dict({**heat.to_dict(), "rating": 1.0}),
+        Movie("Stalker"),
+    ]
+    heat.rating = 9.0
+    unsaved = {heat.uid, ran.uid}
+
+    applied = merge_external(local, diff_movies(local, incoming), lambda uid: uid in unsaved)
+    assert applied.changed == [alien] and alien.rating == 8.5
+    assert heat.rating == 9.0
+    assert [movie.name for movie in applied.added] == ["Stalker"]
+    assert applied.removed == [solaris.uid]
+
+
+def test_merge_with_everything_kept_applies_nothing():
+    alien = Movie("Alien")
+    diff = diff_movies([alien], [Movie.from_dict({**alien.to_dict(), "watched": True}), Movie("Heat")])
+    applied = merge_external([alien], diff, lambda uid: True)
+    assert not applied and not alien.watched
+
+
+@pytest.mark.parametrize("native", [False, True])
+def test_watcher_reports_settled_changes(tmp_path, monkeypatch, native):
+    if native and library_sync.Observer is None:
+        pytest.skip("watchdog is not installed")
+    if not native:
+        monkeypatch.setattr(library_sync, "Observer", None)
+    path = tmp_path / "movies.json"
+    path.write_text("[]", encoding="utf-8")
+    changed = threading.Event()
+    watcher = FileWatcher([str(path)], changed.set, interval=0.05, settle=0.05).start()
+    try:
+        assert watcher.native is native
+        assert not changed.wait(0.3)
+        path.write_text('[{"name": "Alien"}]', encoding="utf-8")
+        assert changed.wait(5)
+        changed.clear()
+        (tmp_path / "other.json").write_text("{}", encoding="utf-8")
+        assert not changed.wait(0.3)
+    finally:
+        watcher.stop()
+
+
+def test_file_signature_tracks_missing_files(tmp_path):
+    path = tmp_path / "movies.json"
+    before = file_signature([str(path)])
+    path.write_text("[]", encoding="utf-8")
+    assert file_signature([str(path)]) != before
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import metrics
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = metrics._Registry()
+    monkeypatch.setattr(metrics, "_registry", registry)
+    return registry
+
+
+def test_disabled_metrics_are_no_ops(monkeypatch, registry):
+    monkeypatch.setattr(metrics, "ENABLED", False)
+
+    def work():
+        return 42
+
+    assert metrics.timed("work")(work) is work
+    assert metrics.span("ui.paint") is metrics.span("ui.other")
+    with metrics.span("ui.paint"):
+        pass
+    metrics.record("query", 0.5)
+    metrics.count("cache.hit")
+    metrics.gauge("queue", lambda: 3)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        submit = executor.submit
+        metrics.track_executor("queue.executor", executor)
+        assert executor.submit == submit
+
+    assert metrics.snapshot() == {"timings": {}, "counters": {}, "gauges": {}}
+
+
+def test_spans_aggregate_timings(monkeypatch, registry):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    ticks = iter([0.0, 0.010, 1.0, 1.030])
+    monkeypatch.setattr(metrics, "time", SimpleNamespace(perf_counter=lambda: next(ticks)))
+    for _ in range(2):
+        with metrics.span("ui.paint"):
+            pass
+
+    for seconds in (0.020, 0.040):
+        metrics.record("ui.paint", seconds)
+    metrics.count("cache.hit")
+    metrics.count("cache.hit", 2)
+
+    data = metrics.snapshot()
+    row = data["timings"]["ui.paint"]
+    assert row["count"] == 4
+    assert row["mean_ms"] == pytest.approx(25.0)
+    assert row["p50_ms"] == pytest.approx(30.0)
+    assert row["p95_ms"] == pytest.approx(40.0)
+    assert row["max_ms"] == pytest.approx(40.0)
+    assert data["counters"] == {"cache.hit": 3}
+    assert "ui.paint" in metrics.format_report(data)
+
+    metrics.reset()
+    assert metrics.snapshot()["timings"] == {}
+
+
+def test_timed_records_failures_too(monkeypatch, registry):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+
+    @metrics.timed("tmdb.fetch")
+    def fetch(fail):
+        if fail:
+            raise OSError("offline")
+        return "ok"
+
+    assert fetch(False) == "ok"
+    with pytest.raises(OSError):
+        fetch(True)
+    assert metrics.snapshot()["timings"]["tmdb.fetch"]["count"] == 2
+
+
+def test_tracked_executor_counts_work_in_flight(monkeypatch, registry):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    gate = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        metrics.track_executor("queue.executor", executor)
+        futures = [executor.submit(gate.wait, 5) for _ in range(3)]
+        assert metrics.snapshot()["gauges"]["queue.executor"] == 3
+        gate.set()
+    assert all(future.result() for future in futures)
+    assert metrics.snapshot()["gauges"]["queue.executor"] == 0
+
+
+def test_broken_gauges_are_left_out(monkeypatch, registry):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    metrics.gauge("ok", lambda: 1)
+    metrics.gauge("broken", lambda: 1 / 0)
+    assert metrics.snapshot()["gauges"] == {"ok": 1}
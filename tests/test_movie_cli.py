@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+
+import movie_cli
+from data_store import MovieRepository
+from models import Movie
+
+
+def run(tmp_path, capsys, *argv):
+    base = ["--storage", "json", "--data", str(tmp_path / "movies.json"), "--settings", str(tmp_path / "settings.json")]
+    assert movie_cli.main([*base, *argv]) == 0
+    return json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+
+
+def library(tmp_path):
+    return MovieRepository(str(tmp_path / "movies.json"), str(tmp_path / "settings.json")).load_movies()
+
+
+def test_reimporting_rows_without_uid_does_not_duplicate(tmp_path, capsys):
+    source = tmp_path / "movies.csv"
+    source.write_text("name,year,watched\nAlien,1979,yes\nHeat,1995,\nAlien,1979,\n", encoding="utf-8")
+
+    assert run(tmp_path, capsys, "import", str(source)) == {"added": 2, "updated": 0, "total": 2}
+    assert run(tmp_path, capsys, "import", str(source)) == {"added": 0, "updated": 2, "total": 2}
+    assert sorted((movie.name, movie.watched) for movie in library(tmp_path)) == [("Alien", True), ("Heat", False)]
+
+
+def test_import_matches_by_file_tmdb_id_and_title(tmp_path, capsys):
+    existing = [
+        Movie("Alien", "1979", poster_path="/alien.jpg", tmdb_id=348),
+        Movie("Heat", "1995", file_path="/movies/heat.mkv"),
+        Movie("The Matrix", "1999"),
+    ]
+    MovieRepository(str(tmp_path / "movies.json"), str(tmp_path / "settings.json")).save_movies(existing)
+    source = tmp_path / "incoming.json"
+    source.write_text(
+        json.dumps(
+            [
+                {"name": "Alien: Director's Cut", "tmdb_id": 348, "watched": True},
+                {"name": "Heat (1995)", "file_path": "/movies/heat.mkv", "favorite": True},
+                {"name": "Matrix, The", "year": "1999", "watchlist": True},
+                {"name": "Ran", "year": "1985"},
+            ]
+        ),
+        encoding="utf-8",
+    )
+
+    assert run(tmp_path, capsys, "import", str(source)) == {"added": 1, "updated": 3, "total": 4}
+    movies = {movie.uid: movie for movie in library(tmp_path)}
+    alien, heat, matrix = (movies[movie.uid] for movie in existing)
+    assert alien.watched and alien.poster_path == "/alien.jpg" and alien.year == "1979"
+    assert heat.favorite
+    assert matrix.watchlist
+
+
+def test_sparse_rows_only_overwrite_the_columns_they_carry(tmp_path, capsys):
+    alien = Movie("Alien", "1979", "Horror", 8.5, True, True, True, "/alien.jpg", tmdb_id=348)
+    heat = Movie("Heat", "1995", rating=8.3, watched=True)
+    MovieRepository(str(tmp_path / "movies.json"), str(tmp_path / "settings.json")).save_movies([alien, heat])
+    names = tmp_path / "names.csv"
+    names.write_text("name,year\nAlien,1979\n", encoding="utf-8")
+    ratings = tmp_path / "ratings.csv"
+    ratings.write_text("name,year,rating,watched,favorite\nHeat,1995,0,no,\n", encoding="utf-8")
+
+    assert run(tmp_path, capsys, "import", str(names)) == {"added": 0, "updated": 1, "total": 2}
+    assert run(tmp_path, capsys, "import", str(ratings)) == {"added": 0, "updated": 1, "total": 2}
+    movies = {movie.uid: movie for movie in library(tmp_path)}
+    assert movies[alien.uid] == alien
+    assert movies[heat.uid].rating == 0.0 and not movies[heat.uid].watched
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from models import Movie
+from movie_table import MovieTable
+from search_index import MovieSearchIndex
+
+
+def test_flags_and_removal():
+    movies = [Movie("Alien", "1979", watched=True), Movie("Heat", "1995", favorite=True), Movie("Ran", "1985")]
+    table = MovieTable(movies)
+    assert [table.names[i] for i in table.query(mode="Unwatched")] == ["Heat", "Ran"]
+    assert table.mode_uids("Favorites") == {movies[1].uid}
+
+    table.remove(movies[1].uid)
+    assert len(table) == 2
+    assert [row.name for row in table] == ["Alien", "Ran"]
+    assert table.mode_uids("Favorites") == set()
+
+
+def test_tmdb_id_zero_is_not_missing():
+    table = MovieTable([Movie("Zero", tmdb_id=0), Movie("Missing")])
+    assert [row.tmdb_id for row in table] == [0, None]
+    assert [movie.tmdb_id for movie in table.to_movies()] == [0, None]
+
+
+def test_search_index_filters_flags_from_the_table():
+    alien, heat = Movie("Alien", "1979"), Movie("Aliens", "1986", watched=True)
+    index = MovieSearchIndex([alien, heat])
+    assert [movie.name for movie in index.query("alien", "Watched")] == ["Aliens"]
+
+    alien.watched = True
+    index.add(alien)
+    assert [movie.name for movie in index.query("alien", "Watched", "Year")] == ["Aliens", "Alien"]
+    assert index.query("", "Unwatched") == []
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from poster_cache import PosterCache, PosterDiskCache
+
+
+def make_cache(tmp_path, **options) -> PosterDiskCache:
+    cache = PosterDiskCache(str(tmp_path / "posters"), **options)
+    cache.wait_for_reconcile()
+    return cache
+
+
+def test_memory_cache_evicts_by_bytes():
+    cache = PosterCache(max_bytes=10)
+    cache.put("a", "A", 4)
+    cache.put("b", "B", 4)
+    assert cache.get("a") == "A"
+    cache.put("c", "C", 4)
+    assert cache.get("b") is None and cache.get("a") == "A"
+    with pytest.raises(ValueError):
+        cache.put("d", "D", 0)
+
+
+def test_startup_trusts_the_index_without_scanning(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path)
+    cache.put_raw("/alien.jpg", b"alien")
+    cache.flush()
+
+    scans = []
+    monkeypatch.setattr(PosterDiskCache, "_scan_files", lambda self: scans.append(1) or {})
+    monkeypatch.setattr(PosterDiskCache, "_reconcile", lambda self: None)
+    reopened = PosterDiskCache(str(tmp_path / "posters"))
+    assert scans == []
+    assert reopened.total_bytes == 5
+    assert reopened.get_raw("/alien.jpg") == b"alien"
+
+
+def test_missing_file_is_a_miss(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put_raw("/alien.jpg", b"alien")
+    os.remove(cache._path(cache._key("/alien.jpg", "raw")))
+
+    assert cache.get_raw("/alien.jpg") is None
+    assert cache.total_bytes == 0
+
+
+def test_reconcile_adopts_orphans_and_drops_missing_entries(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put_raw("/alien.jpg", b"alien")
+    cache.put_raw("/heat.jpg", b"heat")
+    cache.flush()
+    cache.put_raw("/ran.jpg", b"ran!")
+    os.remove(cache._path(cache._key("/heat.jpg", "raw")))
+
+    reopened = make_cache(tmp_path)
+    assert reopened.get_raw("/ran.jpg") == b"ran!"
+    assert reopened.get_raw("/alien.jpg") == b"alien"
+    assert reopened.total_bytes == 9
+    with open(os.path.join(reopened.directory, reopened.INDEX_NAME), "r", encoding="utf-8") as handle:
+        indexed = dict(json.load(handle)["entries"])
+    assert set(indexed) == {reopened._key("/alien.jpg", "raw"), reopened._key("/ran.jpg", "raw")}
+
+
+def test_reconcile_enforces_a_smaller_budget(tmp_path):
+    cache = make_cache(tmp_path)
+    for name in ("a", "b", "c"):
+        cache.put_raw(f"/{name}.jpg", b"x" * 10)
+    cache.flush()
+
+    reopened = make_cache(tmp_path, max_bytes=20)
+    assert reopened.total_bytes == 20
+    assert reopened.get_raw("/a.jpg") is None
+    assert not os.path.exists(reopened._path(reopened._key("/a.jpg", "raw")))
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from poster_decode import decode_batch, decode_poster, to_image  # noqa: E402
+
+SIZE = (140, 200)
+
+
+def encoded(format: str, size=(300, 450), color=(200, 40, 40)) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format=format)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("format", ["JPEG", "PNG"])
+def test_raw_poster_round_trips_through_the_thumbnail(format):
+    mode, size, pixels, thumbnail = decode_poster("raw", encoded(format), SIZE)
+    assert mode == "RGB" and size[0] <= SIZE[0] and size[1] <= SIZE[1] and max(size) > 1
+    image = to_image((mode, size, pixels, thumbnail))
+    assert image.size == size
+    red, green, blue = image.getpixel((size[0] // 2, size[1] // 2))
+    assert red > 150 and green < 90 and blue < 90
+
+    again = decode_poster("thumbnail", thumbnail, SIZE)
+    assert again[:2] == (mode, size) and again[3] is None
+
+
+def test_batch_reports_failures_per_job():
+    results = decode_batch([("raw", encoded("PNG")), ("raw", b"not an image")], SIZE)
+    assert isinstance(results[0], tuple)
+    assert isinstance(results[1], str) and results[1].startswith("UnidentifiedImageError")
+
+
+def test_batch_runs_in_a_spawned_pool():
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = pool.submit(decode_batch, [("raw", encoded("JPEG"))], SIZE).result(timeout=60)
+    assert to_image(results[0]).size[1] == SIZE[1]
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import threading
+
+from poster_scheduler import PosterScheduler
+
+
+class Harness:
+    def __init__(self) -> None:
+        self.fetched = []
+        self.decoded = []
+        self.ready = {}
+        self.errors = {}
+        self.fetch_started = threading.Event()
+        self.fetch_gate = threading.Event()
+        self.decode_gate = threading.Event()
+        self.decode_gate.set()
+        self._changed = threading.Condition()
+        self.scheduler = PosterScheduler(self.fetch, self.decode, network_workers=1, decode_workers=1)
+
+    def fetch(self, poster_path):
+        with self._changed:
+            self.fetched.append(poster_path)
+            self._changed.notify_all()
+        self.fetch_started.set()
+        assert self.fetch_gate.wait(5)
+        if poster_path.startswith("/broken"):
+            raise OSError("not found")
+        return poster_path.encode()
+
+    def decode(self, items):
+        assert self.decode_gate.wait(5)
+        self.decoded.extend(path for path, _data in items)
+        return [data.decode().upper() for _path, data in items]
+
+    def submit(self, token, poster_path, priority=0.0):
+        def on_ready(image):
+            with self._changed:
+                self.ready[token] = image
+                self._changed.notify_all()
+
+        def on_error(message):
+            with self._changed:
+                self.errors[token] = message
+                self._changed.notify_all()
+
+        return self.scheduler.submit(token, poster_path, priority, on_ready, on_error)
+
+    def wait_for(self, *tokens):
+        with self._changed:
+            assert self._changed.wait_for(lambda: all(t in self.ready or t in self.errors for t in tokens), 5)
+
+    def block_network(self):
+        self.submit("blocker", "/blocker", -1)
+        assert self.fetch_started.wait(5)
+
+
+def test_viewport_changes_reorder_queued_fetches():
+    harness = Harness()
+    try:
+        harness.block_network()
+        for priority, token in enumerate("bcd", start=1):
+            harness.submit(token, f"/{token}", priority)
+
+        priorities = {"b": 5.0, "c": 2.0, "d": 0.0}
+        harness.scheduler.reprioritize(priorities.get)
+        harness.fetch_gate.set()
+        harness.wait_for("blocker", "b", "c", "d")
+        assert harness.fetched == ["/blocker", "/d", "/c", "/b"]
+    finally:
+        harness.scheduler.shutdown()
+
+
+def test_requests_that_leave_the_viewport_are_cancelled():
+    harness = Harness()
+    try:
+        harness.block_network()
+        for token in "bcd":
+            harness.submit(token, f"/{token}")
+        assert harness.scheduler.pending() == {"fetch": 3, "decode": 0}
+
+        harness.scheduler.cancel("b")
+        harness.scheduler.reprioritize(lambda token: None if token == "c" else 0.0)
+        assert harness.scheduler.pending() == {"fetch": 1, "decode": 0}
+
+        harness.fetch_gate.set()
+        harness.wait_for("blocker", "d")
+        assert harness.fetched == ["/blocker", "/d"]
+        assert "b" not in harness.ready and "c" not in harness.ready
+    finally:
+        harness.scheduler.shutdown()
+
+
+def test_resubmitting_a_token_replaces_its_request():
+    harness = Harness()
+    try:
+        harness.block_network()
+        harness.submit("card", "/old")
+        harness.submit("card", "/new")
+        harness.fetch_gate.set()
+        harness.wait_for("card")
+        assert harness.ready["card"] == "/NEW"
+        assert "/old" not in harness.fetched
+    finally:
+        harness.scheduler.shutdown()
+
+
+def test_concurrent_requests_for_one_poster_share_a_fetch():
+    harness = Harness()
+    try:
+        harness.submit("first", "/shared")
+        assert harness.fetch_started.wait(5)
+        harness.submit("second", "/shared")
+        harness.submit("third", "/shared")
+        harness.scheduler.cancel("first")
+
+        harness.fetch_gate.set()
+        harness.wait_for("second", "third")
+        assert harness.fetched == ["/shared"]
+        assert harness.decoded == ["/shared"]
+        assert harness.ready == {"second": "/SHARED", "third": "/SHARED"}
+    finally:
+        harness.scheduler.shutdown()
+
+
+def test_queued_duplicates_join_the_fetch_in_flight():
+    harness = Harness()
+    harness.decode_gate.clear()
+    try:
+        harness.block_network()
+        harness.submit("a", "/shared", 1)
+        harness.submit("b", "/shared", 2)
+        harness.fetch_gate.set()
+        with harness._changed:
+            assert harness._changed.wait_for(lambda: harness.fetched == ["/blocker", "/shared"], 5)
+        while harness.scheduler.pending()["fetch"]:
+            threading.Event().wait(0.01)
+        harness.decode_gate.set()
+        harness.wait_for("blocker", "a", "b")
+        assert harness.fetched == ["/blocker", "/shared"]
+        assert harness.ready["a"] == harness.ready["b"] == "/SHARED"
+    finally:
+        harness.scheduler.shutdown()
+
+
+def test_fetch_errors_reach_every_waiter():
+    harness = Harness()
+    try:
+        harness.submit("first", "/broken")
+        assert harness.fetch_started.wait(5)
+        harness.submit("second", "/broken")
+        harness.fetch_gate.set()
+        harness.wait_for("first", "second")
+        assert harness.errors == {"first": "not found", "second": "not found"}
+
+        harness.submit("retry", "/broken")
+        harness.wait_for("retry")
+        assert harness.fetched == ["/broken", "/broken"]
+    finally:
+        harness.scheduler.shutdown()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import pytest
+
+import recommender
+from models import Movie
+from recommender import SimilarityIndex, credit_features
+
+
+def library():
+    movies = [
+        Movie("Alien", "1979", "Horror, Sci-Fi", 8.5, tmdb_id=1),
+        Movie("Aliens", "1986", "Action, Sci-Fi", 8.4, tmdb_id=2),
+        Movie("The Terminator", "1984", "Action, Sci-Fi", 8.1, tmdb_id=3),
+        Movie("Blade Runner", "1982", "Sci-Fi, Drama", 8.1, tmdb_id=4),
+        Movie("Heat", "1995", "Crime, Drama", 8.3, tmdb_id=5),
+        Movie("Collateral", "2004", "Crime, Thriller", 7.5, tmdb_id=6),
+        Movie("Up", "2009", "Animation", 8.2, tmdb_id=7),
+        Movie("The Thing", "1982", "Horror, Sci-Fi", 8.2, tmdb_id=8),
+        Movie("Predator", "1987", "Action, Sci-Fi", 7.8, tmdb_id=9),
+    ]
+    people = {
+        1: ([10, 11], [100]),
+        2: ([10, 12], [101]),
+        3: ([13, 12], [101]),
+        4: ([14], [100]),
+        5: ([15, 16], [102]),
+        6: ([16], [102]),
+        7: ([17], [103]),
+        8: ([18], [104]),
+        9: ([19, 12], [105]),
+    }
+    credits = {
+        tmdb_id: credit_features(
+            {
+                "cast": [{"id": person, "order": order} for order, person in enumerate(cast)],
+                "crew": [{"id": person, "job": "Director"} for person in directors],
+            }
+        )
+        for tmdb_id, (cast, directors) in people.items()
+    }
+    return movies, credits.get
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        monkeypatch.setattr(recommender, "_numpy", pytest.importorskip("numpy"))
+    else:
+        monkeypatch.setattr(recommender, "_numpy", False)
+    return request.param
+
+
+def names(movies, scored):
+    by_uid = {movie.uid: movie.name for movie in movies}
+    return [by_uid[uid] for uid, _score in scored]
+
+
+def test_more_like_ranks_shared_credits_first(backend):
+    movies, credits = library()
+    index = SimilarityIndex(movies, credits)
+    ranked = names(movies, index.more_like(movies[0].uid, limit=20))
+    assert ranked[:3] == ["Blade Runner", "Aliens", "The Thing"]
+    assert "Alien" not in ranked
+    assert ranked.index("Up") > ranked.index("Predator")
+
+    excluded = names(movies, index.more_like(movies[0].uid, limit=20, exclude=[movies[1].uid]))
+    assert "Aliens" not in excluded
+
+
+def test_watch_next_only_suggests_candidates(backend):
+    movies, credits = library()
+    index = SimilarityIndex(movies, credits)
+    liked = [movies[1].uid, movies[2].uid]
+    candidates = [movies[4].uid, movies[6].uid, movies[8].uid]
+    ranked = names(movies, index.watch_next(liked, candidates))
+    assert ranked[0] == "Predator"
+    assert set(ranked) <= {"Heat", "Up", "Predator"}
+    assert index.watch_next(liked, []) == []
+    assert index.watch_next([], candidates) == []
+
+
+def test_updates_are_incremental(backend):
+    movies, credits = library()
+    index = SimilarityIndex(movies, credits)
+    heat = movies[4]
+    assert names(movies, index.more_like(heat.uid, limit=1)) == ["Collateral"]
+
+    index.remove(movies[5].uid)
+    assert "Collateral" not in names(movies, index.more_like(heat.uid, limit=20))
+
+    movies[6].genre = "Crime, Drama"
+    movies[6].year = "1995"
+    index.add(movies[6])
+    assert names(movies, index.more_like(heat.uid, limit=1)) == ["Up"]
+
+
+def test_backends_agree_on_ranking(monkeypatch):
+    np = pytest.importorskip("numpy")
+    movies, credits = library()
+    liked = [movies[0].uid, movies[4].uid]
+    candidates = [movie.uid for movie in movies[5:]] + [movies[1].uid, movies[3].uid]
+
+    results = {}
+    for name, module in (("python", False), ("numpy", np)):
+        monkeypatch.setattr(recommender, "_numpy", module)
+        index = SimilarityIndex(movies, credits)
+        results[name] = (
+            [index.more_like(movie.uid, limit=5) for movie in movies],
+            index.watch_next(liked, candidates, limit=5),
+        )
+
+    python_runs = results["python"][0] + [results["python"][1]]
+    numpy_runs = results["numpy"][0] + [results["numpy"][1]]
+    for python, vectorized in zip(python_runs, numpy_runs):
+        assert [uid for uid, _ in python] == [uid for uid, _ in vectorized]
+        assert [score for _, score in python] == pytest.approx([score for _, score in vectorized])
+
+
+def test_python_fallback_caps_long_postings(monkeypatch):
+    monkeypatch.setattr(recommender, "_numpy", False)
+    monkeypatch.setattr(recommender, "MAX_POSTING_SCAN", 3)
+    movies = [Movie(f"Drama {i}", "1990", "Drama", 6.0) for i in range(50)]
+    target = Movie("Target", "1990", "Drama", 6.0, tmdb_id=1)
+    match = Movie("Match", "1990", "Drama", 6.0, tmdb_id=2)
+    shared = ((7,), (8,))
+    index = SimilarityIndex(movies + [target, match], lambda tmdb_id: shared if tmdb_id else None)
+
+    scored = index.more_like(target.uid, limit=100)
+    assert scored[0][0] == match.uid and scored[0][1] == pytest.approx(1.0)
+    # The long genre/decade postings contribute only their first entries.
+    assert len(scored) == 1 + recommender.MAX_POSTING_SCAN
+
+    monkeypatch.setattr(recommender, "MAX_POSTING_SCAN", 1000)
+    assert len(index.more_like(target.uid, limit=100)) == 51
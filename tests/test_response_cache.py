@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import pytest
+
+from response_cache import CachePolicy, ResponseCache
+
+POLICY = CachePolicy(ttl=100, stale=1000)
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Server:
+    def __init__(self) -> None:
+        self.body = {"results": [1]}
+        self.etag = '"v1"'
+        self.requests = []
+
+    def fetch(self, etag):
+        self.requests.append(etag)
+        if etag is not None and etag == self.etag:
+            return None, etag
+        return dict(self.body), self.etag
+
+
+@pytest.fixture
+def setup(tmp_path):
+    clock, server = Clock(), Server()
+    cache = ResponseCache(str(tmp_path / "cache.db"), clock=clock)
+    revalidations = []
+    key = cache.make_key("search/movie", {"query": "Alien", "api_key": "secret"})
+
+    def get():
+        return cache.get_or_fetch(key, "search/movie", POLICY, server.fetch, lambda key, refresh: revalidations.append(refresh))
+
+    yield cache, clock, server, revalidations, key, get
+    cache.close()
+
+
+def test_keys_ignore_api_key_and_query_case():
+    assert ResponseCache.make_key("/search/movie", {"query": " The  Thing ", "api_key": "a"}) == ResponseCache.make_key(
+        "search/movie", {"query": "the thing", "year": None}
+    )
+
+
+def test_fresh_hit_does_not_fetch(setup):
+    cache, clock, server, revalidations, key, get = setup
+    assert get() == {"results": [1]}
+    clock.now += 99
+    server.body = {"results": [2]}
+    assert get() == {"results": [1]}
+    assert server.requests == [None] and revalidations == []
+
+
+def test_expired_entry_is_served_stale_while_revalidating(setup):
+    cache, clock, server, revalidations, key, get = setup
+    get()
+    clock.now += 150
+    server.body, server.etag = {"results": [2]}, '"v2"'
+
+    assert get() == {"results": [1]}
+    assert len(revalidations) == 1 and server.requests == [None]
+    assert revalidations[0]() == {"results": [2]}
+    assert server.requests == [None, '"v1"']
+    entry = cache.get(key)
+    assert entry.etag == '"v2"' and entry.body == {"results": [2]} and entry.age == 0
+    assert get() == {"results": [2]}
+
+
+def test_not_modified_refreshes_the_ttl(setup):
+    cache, clock, server, revalidations, key, get = setup
+    get()
+    clock.now += 150
+    get()
+    assert revalidations[0]() == {"results": [1]}
+    assert server.requests == [None, '"v1"']
+    assert cache.get(key).age == 0
+    clock.now += 99
+    assert get() == {"results": [1]}
+    assert len(revalidations) == 1
+
+
+def test_entry_past_the_stale_window_is_fetched_conditionally(setup):
+    cache, clock, server, revalidations, key, get = setup
+    get()
+    clock.now += 2000
+    assert get() == {"results": [1]}
+    assert server.requests == [None, '"v1"'] and revalidations == []
+    assert cache.get(key).age == 0
+
+
+def test_purge_drops_old_entries(setup):
+    cache, clock, server, revalidations, key, get = setup
+    get()
+    clock.now += 500
+    assert cache.purge(older_than=1000) == 0
+    assert cache.purge(older_than=100) == 1
+    assert cache.get(key) is None
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, etag=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = {"ETag": etag} if etag else {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def json(self):
+        return self._body
+
+
+def test_tmdb_service_sends_the_stored_etag(tmp_path):
+    pytest.importorskip("requests")
+    from tmdb_service import TMDBService
+
+    service = TMDBService("key", cache_file=str(tmp_path / "cache.db"))
+    sent = []
+    responses = [FakeResponse(200, {"genres": []}, '"g1"'), FakeResponse(304)]
+
+    def get(url, params, headers, timeout):
+        sent.append(headers.get("If-None-Match"))
+        return responses.pop(0)
+
+    service.session.get = get
+    try:
+        assert service.get_genres() == {"genres": []}
+        service.cache._clock = lambda: 10 ** 12
+        assert service._request_json("genre/movie/list") == {"genres": []}
+        service._revalidator.shutdown(wait=True)
+        assert sent == [None, '"g1"']
+    finally:
+        service.close()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.synthetic import make_library
+from facet_index import FacetIndex
+from models import Movie
+from search_index import MovieSearchIndex, QueryCancelled, filter_and_sort
+
+PREDICATES = {
+    "All": lambda movie: True,
+    "Watched": lambda movie: movie.watched,
+    "Unwatched": lambda movie: not movie.watched,
+    "Favorites": lambda movie: movie.favorite,
+    "Watchlist": lambda movie: movie.watchlist,
+}
+
+
+def brute_force(movies, search, mode, sort):
+    items = [m for m in movies if search in m.name.lower() and PREDICATES[mode](m)]
+    if sort == "Title":
+        return sorted(m.name.lower() for m in items)
+    if sort == "Year":
+        return sorted((m.year or "0" for m in items), reverse=True)
+    return sorted((m.rating for m in items), reverse=True)
+
+
+@pytest.fixture(scope="module")
+def library():
+    movies = make_library(2000)
+    return movies, MovieSearchIndex(movies), FacetIndex(movies)
+
+
+def projection(items, sort):
+    if sort == "Title":
+        return [m.name.lower() for m in items]
+    if sort == "Year":
+        return [m.year or "0" for m in items]
+    return [m.rating for m in items]
+
+
+@pytest.mark.parametrize("search", ["", "the", "star w", "qqqq"])
+@pytest.mark.parametrize("mode", list(PREDICATES))
+@pytest.mark.parametrize("sort", ["Title", "Year", "Rating"])
+def test_query_matches_brute_force(library, search, mode, sort):
+    movies, index, _facets = library
+    assert projection(index.query(search, mode, sort), sort) == brute_force(movies, search, mode, sort)
+
+
+def test_facet_selection_narrows_the_query(library):
+    movies, index, facets = library
+    items = filter_and_sort(index, facets, "", "Unwatched", "Title", {"decade": ["1990s"]})
+    expected = [m for m in movies if not m.watched and m.year[:3] == "199"]
+    assert sorted(m.uid for m in items) == sorted(m.uid for m in expected)
+
+
+def test_movie_edited_in_place_is_listed_once():
+    alien, aliens = Movie("Alien", "1979", rating=8.5), Movie("Aliens", "1986", rating=8.4)
+    index = MovieSearchIndex([alien, aliens])
+    aliens.year, aliens.rating = "1990", 9.0
+    index.add(aliens)
+    assert [m.name for m in index.query("", "All", "Year")] == ["Aliens", "Alien"]
+    assert [m.name for m in index.query("", "All", "Rating")] == ["Aliens", "Alien"]
+    index.remove(aliens.uid)
+    assert [m.name for m in index.query("", "All", "Year")] == ["Alien"]
+
+
+def test_cancelled_query_raises():
+    index = MovieSearchIndex([Movie("Alien")])
+    with pytest.raises(QueryCancelled):
+        index.query("alien", cancelled=lambda: True)
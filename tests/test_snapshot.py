@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import os
+
+from data_store import MovieRepository, SnapshotError, SnapshotReader
+from models import Movie
+
+
+def make_repo(tmp_path) -> MovieRepository:
+    return MovieRepository(str(tmp_path / "movies.json"), str(tmp_path / "settings.json"))
+
+
+def test_snapshot_is_written_on_close_and_used_on_load(tmp_path):
+    repo = make_repo(tmp_path)
+    repo.save_movies([Movie("Alien", "1979", tmdb_id=348), Movie("Heat")])
+    assert not os.path.exists(repo.snapshot_file)
+    repo.close()
+
+    repo = make_repo(tmp_path)
+    assert repo.open_snapshot() is not None
+    assert [(movie.name, movie.tmdb_id) for movie in repo.load_movies()] == [("Alien", 348), ("Heat", None)]
+
+
+def test_replaced_json_with_older_mtime_invalidates_snapshot(tmp_path):
+    repo = make_repo(tmp_path)
+    repo.save_movies([Movie("Alien")])
+    repo.close()
+    stat = os.stat(repo.data_file)
+
+    with open(repo.data_file, "w", encoding="utf-8") as handle:
+        json.dump([Movie("Replaced").to_dict()], handle)
+    os.utime(repo.data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10_000_000_000))
+
+    repo = make_repo(tmp_path)
+    assert repo.open_snapshot() is None
+    assert [movie.name for movie in repo.load_movies()] == ["Replaced"]
+    assert [movie.name for chunk in repo.iter_movies() for movie in chunk] == ["Replaced"]
+
+
+def test_snapshot_is_skipped_when_json_changed_before_close(tmp_path):
+    repo = make_repo(tmp_path)
+    repo.save_movies([Movie("Alien")])
+    with open(repo.data_file, "w", encoding="utf-8") as handle:
+        json.dump([Movie("External").to_dict()], handle)
+    repo.close()
+
+    assert not os.path.exists(repo.snapshot_file)
+    assert [movie.name for movie in make_repo(tmp_path).load_movies()] == ["External"]
+
+
+def test_corrupt_snapshot_falls_back_to_json(tmp_path):
+    repo = make_repo(tmp_path)
+    repo.save_movies([Movie("Alien")])
+    repo.close()
+    with open(repo.snapshot_file, "r+b") as handle:
+        handle.seek(-1, os.SEEK_END)
+        handle.write(b"\xff")
+
+    repo = make_repo(tmp_path)
+    assert repo.open_snapshot() is None
+    assert [movie.name for movie in repo.load_movies()] == ["Alien"]
+
+
+def test_snapshot_header_records_its_source(tmp_path):
+    repo = make_repo(tmp_path)
+    repo.save_movies([Movie("Alien")])
+    repo.close()
+    stat = os.stat(repo.data_file)
+    with SnapshotReader(repo.snapshot_file) as reader:
+        assert reader.source == (stat.st_size, stat.st_mtime_ns)
+
+
+class FailingSnapshot:
+    def __init__(self, movies):
+        self.movies = movies
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_chunks(self, chunk_size):
+        yield self.movies[:1]
+        raise SnapshotError("truncated")
+
+
+def test_failed_snapshot_resumes_from_json_by_uid(tmp_path, monkeypatch):
+    movies = [Movie("Alien"), Movie("Heat"), Movie("Ran")]
+    repo = make_repo(tmp_path)
+    with open(repo.data_file, "w", encoding="utf-8") as handle:
+        json.dump([{"name": ""}, "junk", *(movie.to_dict() for movie in movies)], handle)
+    monkeypatch.setattr(repo, "open_snapshot", lambda: FailingSnapshot(movies))
+
+    streamed = [movie for chunk in repo.iter_movies(chunk_size=2) for movie in chunk]
+    assert [movie.name for movie in streamed] == ["Alien", "Heat", "Ran"]
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+
+from models import Movie
+from search_index import MovieSearchIndex
+from sqlite_store import SQLiteMovieRepository
+
+NAMES = ["The Matrix", "Matilda", "Alien", "Amélie", "Léon: The Professional", "Das Boot", "Ōkami", "Smile"]
+SEARCHES = ["m", "ma", "i", "al", "ie", "mat", "matrix", "the", "é", "él", "éli", "léon", "ō", "ōka", "zz", "zzz", ""]
+
+
+@pytest.fixture(params=[True, False], ids=["fts", "instr"])
+def repo(tmp_path, request):
+    repo = SQLiteMovieRepository(str(tmp_path / "movies.db"), str(tmp_path / "settings.json"), str(tmp_path / "movies.json"))
+    if not request.param:
+        repo._fts = False
+    elif not repo._fts:
+        pytest.skip("SQLite build has no FTS5 trigram tokenizer")
+    movies = [Movie(name=name, year=str(1980 + i), uid=f"u{i}", watched=i % 2 == 0) for i, name in enumerate(NAMES)]
+    repo.save_movies(movies)
+    yield repo, movies
+    repo.close()
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_search_matches_substrings_like_the_index(repo, search):
+    repo, movies = repo
+    index = MovieSearchIndex(movies)
+    for mode in ("All", "Watched"):
+        expected = [movie.uid for movie in index.query(search, mode, "Title")]
+        result = repo.query_movies(search, mode, "Title")
+        assert [movie.uid for movie in result[:]] == expected
+        assert len(result) == len(expected)
+
+
+def test_short_search_is_not_a_prefix_match(repo):
+    repo, _movies = repo
+    assert sorted(movie.name for movie in repo.query_movies("ma")[:]) == ["Matilda", "The Matrix"]
+    assert {movie.name for movie in repo.query_movies("i")[:]} >= {"The Matrix", "Matilda", "Alien", "Smile"}
+
+
+def test_edits_and_deletes_reach_the_search(repo):
+    repo, movies = repo
+    movies[0].name = "Reloaded"
+    repo.save_movies(movies[1:] + [movies[0]], dirty=[movies[0].uid])
+    assert [movie.uid for movie in repo.query_movies("reload")[:]] == [movies[0].uid]
+    assert repo.query_movies("matrix")[:] == []
+    repo.save_movies(movies[1:])
+    assert repo.query_movies("reload")[:] == []
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("requests")
+
+from tmdb_service import TMDBService  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, content: bytes) -> None:
+        self.status_code = 200
+        self.content = content
+
+    def raise_for_status(self) -> None:
+        pass
+
+
+def test_poster_bytes_are_cached_within_a_byte_budget(tmp_path):
+    service = TMDBService("key", cache_file=None, poster_cache_bytes=10)
+    requested = []
+
+    def get(url, timeout):
+        requested.append(url.rsplit("/", 1)[-1])
+        return FakeResponse(b"x" * 6)
+
+    service.session.get = get
+    try:
+        assert service.fetch_poster_bytes("/a.jpg") == b"x" * 6
+        assert service.fetch_poster_bytes("/a.jpg") == b"x" * 6
+        assert requested == ["a.jpg"]
+        service.fetch_poster_bytes("/b.jpg")
+        service.fetch_poster_bytes("/a.jpg")
+        assert requested == ["a.jpg", "b.jpg", "a.jpg"]
+        assert service.posters.stats()["bytes"] <= 10
+        assert service.fetch_poster_bytes("") == b""
+    finally:
+        service.close()
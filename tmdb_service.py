@@ -1,29 +1,102 @@
 from __future__ import annotations
 
-from functools import lru_cache
-from typing import Any, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Tuple
 
 import requests
 
+import metrics
+from poster_cache import PosterCache
+from response_cache import CachePolicy, ResponseCache
+
+DEFAULT_API_KEY = "ea33b23284657d2f1881ac56474f943e"
+DAY = 24 * 60 * 60
+
+CACHE_POLICIES: Dict[str, CachePolicy] = {
+    "search/movie": CachePolicy(ttl=7 * DAY, stale=30 * DAY),
+    "credits": CachePolicy(ttl=30 * DAY, stale=180 * DAY),
+    "genre/movie/list": CachePolicy(ttl=30 * DAY, stale=365 * DAY),
+}
+DEFAULT_POLICY = CachePolicy(ttl=DAY, stale=7 * DAY)
+
 
 class TMDBService:
-    def __init__(self, api_key: str, base_url: str = "https://api.themoviedb.org/3") -> None:
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.themoviedb.org/3",
+        cache_file: str | None = "tmdb_cache.db",
+        poster_cache_bytes: int = 16 * 1024 * 1024,
+    ) -> None:
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
         self.image_base_url = "https://image.tmdb.org/t/p/w300"
         self.session = requests.Session()
         self._timeout = (4, 10)
+        self.cache = ResponseCache(cache_file) if cache_file else None
+        self.posters = PosterCache(max_bytes=poster_cache_bytes)
+        self._revalidator = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tmdb-revalidate")
+        self._revalidating: set[str] = set()
+        self._revalidating_lock = threading.Lock()
+
+    @staticmethod
+    def cache_policy(path: str) -> CachePolicy:
+        path = path.strip("/")
+        if path.endswith("/credits"):
+            return CACHE_POLICIES["credits"]
+        return CACHE_POLICIES.get(path, DEFAULT_POLICY)
 
+    @metrics.timed("tmdb.request_json")
     def _request_json(self, path: str, **params: Any) -> Dict[str, Any]:
+        if self.cache is None:
+            return self._fetch_json(path, params)[0] or {}
+        return self.cache.get_or_fetch(
+            self.cache.make_key(path, params),
+            path,
+            self.cache_policy(path),
+            lambda etag: self._fetch_json(path, params, etag),
+            self._revalidate,
+        )
+
+    def cached_json(self, path: str, **params: Any) -> Dict[str, Any] | None:
+        if self.cache is None:
+            return None
+        entry = self.cache.get(self.cache.make_key(path, params))
+        return entry.body if entry is not None else None
+
+    @metrics.timed("tmdb.fetch_json")
+    def _fetch_json(self, path: str, params: Dict[str, Any], etag: str | None = None) -> Tuple[Dict[str, Any] | None, str | None]:
+        headers = {"If-None-Match": etag} if etag else {}
         all_params = {"api_key": self.api_key, **params}
-        response = self.session.get(f"{self.base_url}/{path.lstrip('/')}", params=all_params, timeout=self._timeout)
+        response = self.session.get(
+            f"{self.base_url}/{path.lstrip('/')}", params=all_params, headers=headers, timeout=self._timeout
+        )
+        if response.status_code == 304 and etag:
+            return None, etag
         response.raise_for_status()
         payload = response.json()
         if not isinstance(payload, dict):
             raise ValueError("Unexpected API response format")
-        return payload
+        return payload, response.headers.get("ETag")
+
+    def _revalidate(self, key: str, refresh: Callable[[], object]) -> None:
+        with self._revalidating_lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def task() -> None:
+            try:
+                refresh()
+            except Exception:
+                pass
+            finally:
+                with self._revalidating_lock:
+                    self._revalidating.discard(key)
+
+        self._revalidator.submit(task)
 
-    @lru_cache(maxsize=256)
     def search_movie(self, query: str, year: str = "") -> Dict[str, Any]:
         query = query.strip()
         if not query:
@@ -37,14 +110,52 @@ class TMDBService:
             data = self._request_json("search/movie", query=query)
         return data
 
-    @lru_cache(maxsize=512)
     def get_credits(self, tmdb_id: int) -> Dict[str, Any]:
         return self._request_json(f"movie/{tmdb_id}/credits")
 
-    @lru_cache(maxsize=1024)
+    def get_genres(self) -> Dict[str, Any]:
+        return self._request_json("genre/movie/list")
+
+    def warm_cache(self, titles: Iterable[str | Tuple[str, str]], workers: int = 4) -> int:
+        if self.cache is None:
+            return 0
+        pending = []
+        for title in titles:
+            query, year = (title, "") if isinstance(title, str) else (title[0], title[1])
+            query = query.strip()
+            if not query:
+                continue
+            params: Dict[str, Any] = {"query": query}
+            if year:
+                params["primary_release_year"] = year
+            entry = self.cache.get(self.cache.make_key("search/movie", params))
+            if entry is None or entry.age >= self.cache_policy("search/movie").ttl:
+                pending.append((query, year))
+
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tmdb-warm") as pool:
+            for future in [pool.submit(self.search_movie, query, year) for query, year in pending]:
+                try:
+                    future.result()
+                    fetched += 1
+                except Exception:
+                    continue
+        return fetched
+
+    def close(self) -> None:
+        self._revalidator.shutdown(wait=False, cancel_futures=True)
+        if self.cache is not None:
+            self.cache.close()
+
     def fetch_poster_bytes(self, poster_path: str) -> bytes:
         if not poster_path:
             return b""
+        cached = self.posters.get(poster_path)
+        if cached is not None:
+            return cached
         response = self.session.get(f"{self.image_base_url}{poster_path}", timeout=self._timeout)
         response.raise_for_status()
-        return response.content
+        data = response.content
+        if data:
+            self.posters.put(poster_path, data, len(data))
+        return data